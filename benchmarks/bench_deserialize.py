@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+"""
+Show that ``Playbook.deserialize`` load time grows linearly with state size.
+The time per object should stay roughly constant.
+
+The ``trusted (s)`` column is the fast path used to load the deployed
+playbook file, it skips the per object validation.
+"""
+
+import time
+
+from lakeformation.pb.playbook import Playbook
+from synthetic import make_playbook
+
+
+def main():
+    print(f"{'n_grant':>10} {'total (s)':>12} {'per object (us)':>16} {'trusted (s)':>12}")
+    for n_grant in [10_000, 20_000, 40_000, 80_000, 160_000]:
+        data = make_playbook(n_grant).serialize()
+        n_object = len(data["datalake_permissions"]) + len(data["lf_tag_attachments"])
+        start = time.perf_counter()
+        Playbook.deserialize(data)
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        Playbook.deserialize(data, _skip_validation=True)
+        trusted_elapsed = time.perf_counter() - start
+        print(
+            f"{n_grant:>10} {elapsed:>12.3f} "
+            f"{elapsed / n_object * 1_000_000:>16.2f} {trusted_elapsed:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
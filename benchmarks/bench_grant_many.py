@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare building a roles x tables x permissions matrix playbook with
+``Playbook.grant`` in a loop and with ``Playbook.grant_many``.
+"""
+
+import sys
+import time
+
+from lakeformation.principal import IamRole
+from lakeformation.resource import Database, Table
+from lakeformation.permission import PermissionEnum
+from lakeformation.pb.playbook import Playbook
+from synthetic import aws_account_id, aws_region
+
+permissions = [
+    PermissionEnum.Select.value,
+    PermissionEnum.DescribeTable.value,
+]
+
+
+def main(n_role: int, n_table: int):
+    db = Database(catalog_id=aws_account_id, region=aws_region, name="db")
+    roles = [
+        IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/role_{i}")
+        for i in range(n_role)
+    ]
+    tables = [Table(name=f"tb_{i}", database=db) for i in range(n_table)]
+    n_grant = n_role * n_table * len(permissions)
+
+    pb = Playbook(_skip_validation=True)
+    start = time.perf_counter()
+    for role in roles:
+        for tb in tables:
+            pb.grant(role, tb, permissions)
+    print(f"{f'grant x {n_grant}':<40} {time.perf_counter() - start:>8.3f} s")
+
+    pb = Playbook(_skip_validation=True)
+    start = time.perf_counter()
+    pb.grant_many(roles, tables, permissions)
+    print(f"{f'grant_many x {n_grant}':<40} {time.perf_counter() - start:>8.3f} s")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+    )
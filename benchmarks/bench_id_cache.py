@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measure the cost of ``id`` / ``__hash__`` on a synthetic 1M grant playbook.
+The first access computes the id, the later ones hit the memoized value.
+"""
+
+import sys
+import time
+
+from synthetic import make_playbook
+
+
+def timeit(title: str, func):
+    start = time.perf_counter()
+    func()
+    print(f"{title:<40} {time.perf_counter() - start:>8.3f} s")
+
+
+def main(n_grant: int):
+    start = time.perf_counter()
+    pb = make_playbook(n_grant)
+    print(f"{'build playbook':<40} {time.perf_counter() - start:>8.3f} s")
+
+    dl_permission_list = list(pb.datalake_permissions.values())
+    timeit("access id (memoized)", lambda: [p.id for p in dl_permission_list])
+    timeit("build set of DataLakePermission", lambda: set(dl_permission_list))
+
+    def recompute():
+        for p in dl_permission_list:
+            p._get_id()
+
+    timeit("recompute id without cache", recompute)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measure the memory per object of the classes created in large number,
+with ``tracemalloc``. The ``id`` of each object is accessed once, so the
+memoized id string is included.
+"""
+
+import tracemalloc
+
+from lakeformation.principal import IamRole
+from lakeformation.resource import Database, Table, Column, LfTag
+from lakeformation.permission import PermissionEnum
+from lakeformation.pb.asso import DataLakePermission, LfTagAttachment
+
+aws_account_id = "111122223333"
+aws_region = "us-east-1"
+
+N = 100_000
+
+db = Database(catalog_id=aws_account_id, region=aws_region, name="db")
+tb = Table(name="tb", database=db)
+tag = LfTag(catalog_id=aws_account_id, key="pii", value="y")
+role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/role")
+permission = PermissionEnum.Select.value
+
+# the names are created before the measurement, only the objects are counted
+names = [f"name_{i}" for i in range(N)]
+arns = [f"arn:aws:iam::{aws_account_id}:role/role_{i}" for i in range(N)]
+
+factories = [
+    ("Database", lambda i: Database(catalog_id=aws_account_id, region=aws_region, name=names[i])),
+    ("Table", lambda i: Table(name=names[i], database=db)),
+    ("Column", lambda i: Column(name=names[i], table=tb)),
+    ("LfTag", lambda i: LfTag(catalog_id=aws_account_id, key="pii", value=names[i])),
+    ("IamRole", lambda i: IamRole(arn=arns[i])),
+    ("DataLakePermission", lambda i: DataLakePermission(
+        principal=role, resource=Column(name=names[i], table=tb), permission=permission)),
+    ("LfTagAttachment", lambda i: LfTagAttachment(
+        resource=Column(name=names[i], table=tb), tag=tag)),
+]
+
+
+def measure(factory) -> float:
+    tracemalloc.start()
+    objects = [factory(i) for i in range(N)]
+    for obj in objects:
+        obj.id
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / N
+
+
+def main():
+    print(f"{'class':<20} {'bytes per object':>18}")
+    for name, factory in factories:
+        print(f"{name:<20} {measure(factory):>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
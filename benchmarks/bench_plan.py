@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measure the planning time of ``Playbook.apply_dl_permission`` (dry run) for
+wide grants, many permissions on the same (principal, resource) pair.
+"""
+
+import sys
+import time
+
+from lakeformation.principal import IamRole
+from lakeformation.resource import Database, Table, Column
+from lakeformation.permission import PermissionEnum
+from lakeformation.pb.playbook import Playbook
+from lakeformation.tests import FakeLfClient
+from synthetic import aws_account_id, aws_region
+
+permissions = [
+    PermissionEnum.Select.value,
+    PermissionEnum.Insert.value,
+    PermissionEnum.Delete.value,
+    PermissionEnum.DescribeTable.value,
+    PermissionEnum.AlterTable.value,
+    PermissionEnum.DropTable.value,
+]
+
+
+def make_playbook(n_pair: int, permission_list: list) -> Playbook:
+    pb = Playbook(_skip_validation=True)
+    pb.account_id = aws_account_id
+    pb.region = aws_region
+    pb.lf_client = FakeLfClient()
+    db = Database(catalog_id=aws_account_id, region=aws_region, name="db")
+    for i in range(n_pair):
+        tb = Table(name=f"tb_{i}", database=db)
+        role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/role_{i % 100}")
+        pb.grant(role, tb, permission_list)
+    return pb
+
+
+def make_column_playbook(n_pair: int, n_column: int) -> Playbook:
+    pb = make_playbook(0, permissions)
+    db = Database(catalog_id=aws_account_id, region=aws_region, name="db")
+    role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+    for i in range(n_pair // n_column):
+        tb = Table(name=f"tb_{i}", database=db)
+        for j in range(n_column):
+            pb.grant(role, Column(name=f"col_{j}", table=tb), [PermissionEnum.Select.value, ])
+    return pb
+
+
+def plan(pb: Playbook, deployed_pb: Playbook) -> float:
+    pb.deployed_pb = deployed_pb
+    start = time.perf_counter()
+    pb.apply_dl_permission(verbose=False, dry_run=True)
+    return time.perf_counter() - start
+
+
+def main(n_pair: int):
+    pb = make_playbook(n_pair, permissions)
+    empty_pb = make_playbook(0, permissions)
+    print(f"{'initial grant':<40} {plan(pb, empty_pb):>8.3f} s")
+    # every pair drops one permission and adds another one
+    deployed_pb = make_playbook(n_pair, permissions[1:] + [PermissionEnum.SelectGrantable.value, ])
+    print(f"{'change one permission per pair':<40} {plan(pb, deployed_pb):>8.3f} s")
+    # 300 columns per table, Select on each column
+    pb = make_column_playbook(n_pair, 300)
+    print(f"{'column grant':<40} {plan(pb, empty_pb):>8.3f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+"""
+Build synthetic large playbook for benchmark.
+"""
+
+from lakeformation.principal import IamRole
+from lakeformation.resource import Database, Table, Column, LfTag
+from lakeformation.permission import PermissionEnum
+from lakeformation.pb.playbook import Playbook
+
+aws_account_id = "111122223333"
+aws_region = "us-east-1"
+
+
+def make_playbook(n_grant: int, n_column: int = 10) -> Playbook:
+    """
+    Create a playbook with ``n_grant`` column level ``Select`` grants,
+    each role is granted on one table and ``n_column`` columns of it,
+    plus one LF tag attachment for each table.
+    """
+    pb = Playbook(_skip_validation=True)
+    pb.account_id = aws_account_id
+    pb.region = aws_region
+
+    tag = LfTag(catalog_id=aws_account_id, key="pii", value="y", pb=pb)
+    db = Database(catalog_id=aws_account_id, region=aws_region, name="db")
+    n_table = max(1, n_grant // n_column)
+    for i in range(n_table):
+        tb = Table(name=f"tb_{i}", database=db)
+        role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/role_{i}")
+        pb.attach(tb, tag)
+        for j in range(n_column):
+            col = Column(name=f"col_{j}", table=tb)
+            pb.grant(role, col, [PermissionEnum.Select.value, ])
+    return pb
@@ -1,13 +1,21 @@
 # -*- coding: utf-8 -*-
 
 import abc
-from typing import Optional
+import operator
+from typing import Tuple, Optional
 
 
 class LFObject(abc.ABC):
     """
     LakeFormation Object
+
+    All the abstract classes define an empty ``__slots__``, so the concrete
+    classes that are created in large number (database, table, column,
+    LF tag, IAM role, data lake permission, LF tag attachment) can use
+    ``__slots__`` to avoid the per instance ``__dict__``.
     """
+    __slots__ = ()
+
     object_type: str = "LFObject"
 
 
@@ -15,14 +23,40 @@ class HashableAbc(LFObject):
     """
     Abstract class that can be hashed and support ``==`` and ``!=`` comparison.
 
-    It has to have a ``id`` property method, returns a unique identifier in str.
+    It has to have a ``_get_id`` method, returns a unique identifier in str.
+    The ``id`` property calls it only once and memoizes the result, because
+    ``__hash__`` and ``__eq__`` use the ``id`` very often.
+
+    Invalidation rule: the attributes listed in ``_id_fields`` are the
+    identifying fields. Each of them is stored in the ``_<name>`` attribute
+    and exposed by a property, re-assigning it resets the memoized id.
+    ``__init__`` writes the ``_<name>`` attribute directly, so creating an
+    object doesn't go through the setter. Mutating an object referenced by
+    an identifying field, for example renaming the ``Database`` of a
+    ``Table`` after the ``Table.id`` is computed, is not detected, those
+    objects should be treated as immutable.
     """
+    __slots__ = ("_id",)
+
+    _id_fields: Tuple[str, ...] = tuple()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.__dict__.get("_id_fields", tuple()):
+            setattr(cls, name, _get_id_field_property(name))
 
-    @property
     @abc.abstractmethod
-    def id(self) -> str:
+    def _get_id(self) -> str:
         raise NotImplementedError
 
+    @property
+    def id(self) -> str:
+        try:
+            return self._id
+        except AttributeError:
+            self._id = self._get_id()
+            return self._id
+
     def __hash__(self):
         return hash(self.id)
 
@@ -33,10 +67,29 @@ class HashableAbc(LFObject):
         return not self.__eq__(other)
 
 
+def _get_id_field_property(name: str) -> property:
+    """
+    Create the property of an identifying field of :class:`HashableAbc`,
+    the value is stored in the ``_<name>`` attribute. The getter is
+    implemented in C, only the assignment runs Python code.
+    """
+    private_name = f"_{name}"
+
+    def fset(self: HashableAbc, value):
+        setattr(self, private_name, value)
+        try:
+            del self._id
+        except AttributeError:
+            pass
+
+    return property(operator.attrgetter(private_name), fset)
+
+
 class SerializableAbc(LFObject):
     """
     Abstract class can serialize to dict and deserialize from the dict
     """
+    __slots__ = ()
 
     @abc.abstractmethod
     def serialize(self) -> dict:
@@ -53,6 +106,7 @@ class RenderableAbc(LFObject):
     Abstract class that will be rendered by Jinja2 template to create
     resource / principal declaration scripts to support playbook.
     """
+    __slots__ = ()
 
     @property
     @abc.abstractmethod
@@ -77,6 +131,8 @@ class PlaybookManaged(LFObject):
     :param _playbook_id: internal parameter for implementation. If None,
         it means that this resource is not playbook managed. Otherwise it is.
     """
+    __slots__ = ()
+
     _playbook_id: Optional[str]
 
     @property
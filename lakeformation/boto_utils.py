@@ -1,6 +1,239 @@
 # -*- coding: utf-8 -*-
 
-from typing import Callable, List
+import time
+import random
+import threading
+from typing import Callable, List, Dict, Iterable, Optional
+
+from botocore.config import Config
+from botocore.exceptions import (
+    ConnectionError as BotoConnectionError,
+    HTTPClientError,
+)
+
+#: AWS error code that means the request is rejected by rate limit
+THROTTLING_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "SlowDown",
+}
+
+#: AWS error code that means a temporary server side failure, safe to retry
+TRANSIENT_ERROR_CODES = {
+    "InternalServiceException",
+    "InternalFailure",
+    "ServiceUnavailable",
+    "ServiceUnavailableException",
+    "ConcurrentModificationException",
+    "ServiceFailure",
+}
+
+
+def get_error_code(e: Exception) -> Optional[str]:
+    """
+    Get the AWS error code from a ``botocore.exceptions.ClientError``,
+    returns None if it is not an AWS API error.
+    """
+    try:
+        return e.response["Error"]["Code"]
+    except (AttributeError, KeyError, TypeError):
+        return None
+
+
+def is_throttling_error(e: Exception) -> bool:
+    return get_error_code(e) in THROTTLING_ERROR_CODES
+
+
+def get_http_status_code(e: Exception) -> Optional[int]:
+    """
+    Get the HTTP status code from a ``botocore.exceptions.ClientError``,
+    returns None if it is not an AWS API error.
+    """
+    try:
+        return e.response["ResponseMetadata"]["HTTPStatusCode"]
+    except (AttributeError, KeyError, TypeError):
+        return None
+
+
+def is_retryable_error(e: Exception) -> bool:
+    """
+    Throttling, transient error code, HTTP 5xx, and the connection errors
+    (``EndpointConnectionError``, ``ReadTimeoutError``,
+    ``ConnectionClosedError``, ...) are retryable. The botocore built-in
+    retry is disabled by :data:`no_retry_config`, they are retried here.
+    """
+    if isinstance(e, (BotoConnectionError, HTTPClientError)):
+        return True
+    code = get_error_code(e)
+    if (code in THROTTLING_ERROR_CODES) or (code in TRANSIENT_ERROR_CODES):
+        return True
+    status_code = get_http_status_code(e)
+    return (status_code is not None) and (status_code >= 500)
+
+
+def get_service_name(method: Callable) -> Optional[str]:
+    """
+    Get the AWS service name of a boto3 client method, for example
+    ``"glue"`` for ``glue_client.get_tables``. Returns None if it is not a
+    boto3 client method.
+    """
+    try:
+        return method.__self__.meta.service_model.service_name
+    except AttributeError:
+        return None
+
+
+class AdaptiveLimiter:
+    """
+    A concurrency limiter shared by all threads that call the same AWS service.
+
+    It follows the additive increase / multiplicative decrease strategy.
+    The number of in-flight calls is cut by half whenever a call is throttled,
+    and increased by one after ``limit`` consecutive successful calls. So the
+    sustained throughput stays near the service rate limit.
+
+    Usage::
+
+        with limiter:
+            response = client.some_api(...)
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+    ):
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._in_flight = 0
+        self._n_success = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def on_success(self):
+        with self._cond:
+            self._n_success += 1
+            if self._n_success >= self.limit:
+                self._n_success = 0
+                if self.limit < self.max_limit:
+                    self.limit += 1
+                    self._cond.notify()
+
+    def on_throttle(self):
+        with self._cond:
+            self._n_success = 0
+            self.limit = max(self.min_limit, self.limit // 2)
+
+
+class BotoCaller:
+    """
+    The shared wrapper for all boto3 client method calls.
+
+    It retries throttled and transient failed calls with jittered
+    exponential backoff, and reports every call result to the
+    :class:`AdaptiveLimiter` of the AWS service to adjust the concurrency.
+    Each service has its own limiter, throttling on Glue does not slow down
+    Lake Formation.
+
+    botocore also retries on its own, the attempts multiply. Create the
+    client with :data:`no_retry_config` to leave the retry to this caller.
+
+    Usage::
+
+        caller = BotoCaller()
+        response = caller.call(lf_client.create_lf_tag, TagKey="k", TagValues=["v"])
+
+    :param max_attempts: give up and raise the error after this many attempts.
+    :param base_delay: the backoff delay in seconds before the first retry.
+        the upper bound of delay doubles on each retry.
+    :param max_delay: the upper bound of backoff delay in seconds.
+    :param limiter: the :class:`AdaptiveLimiter` shared by all services.
+        If not specified, create one per service, see :meth:`get_limiter`.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 8,
+        base_delay: float = 0.2,
+        max_delay: float = 20.0,
+        limiter: Optional[AdaptiveLimiter] = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limiter = limiter
+        # service name -> limiter
+        self.limiters: Dict[Optional[str], AdaptiveLimiter] = dict()
+        self._lock = threading.Lock()
+
+    def get_limiter(self, method: Callable) -> AdaptiveLimiter:
+        """
+        Get the limiter of the AWS service of the boto3 client method.
+        """
+        if self.limiter is not None:
+            return self.limiter
+        service_name = get_service_name(method)
+        try:
+            return self.limiters[service_name]
+        except KeyError:
+            with self._lock:
+                return self.limiters.setdefault(service_name, AdaptiveLimiter())
+
+    def get_backoff_delay(self, attempt: int) -> float:
+        """
+        Full jitter exponential backoff, ``attempt`` starts from 0.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, method: Callable, **kwargs) -> dict:
+        limiter = self.get_limiter(method)
+        attempt = 0
+        while 1:
+            with limiter:
+                try:
+                    response = method(**kwargs)
+                except Exception as e:
+                    if (not is_retryable_error(e)) or (attempt + 1 >= self.max_attempts):
+                        raise e
+                    if is_throttling_error(e):
+                        limiter.on_throttle()
+                else:
+                    limiter.on_success()
+                    return response
+            time.sleep(self.get_backoff_delay(attempt))
+            attempt += 1
+
+
+#: the default caller shared by all AWS API calls in this library
+default_caller = BotoCaller()
+
+#: botocore client config that disables the botocore built-in retry, for
+#: the clients whose calls are sent by :class:`BotoCaller`
+no_retry_config = Config(retries=dict(total_max_attempts=1))
 
 
 def list_recursively(
@@ -9,6 +242,7 @@ def list_recursively(
     next_token_arg_name: str,
     next_token_value_field: str,
     collection_value_field: str,
+    caller: Optional[BotoCaller] = None,
 ):
     """
     Given an paginator API like this::
@@ -50,17 +284,53 @@ def list_recursively(
     :param next_token_arg_name:
     :param next_token_value_field:
     :param collection_value_field:
+    :param caller: the :class:`BotoCaller` to send the API call, it retries
+        throttled calls. If not specified, use the :data:`default_caller`.
+    :return:
+    """
+    return list(iter_recursively(
+        method=method,
+        default_kwargs=default_kwargs,
+        next_token_arg_name=next_token_arg_name,
+        next_token_value_field=next_token_value_field,
+        collection_value_field=collection_value_field,
+        caller=caller,
+    ))
+
+
+def iter_recursively(
+    method: Callable,
+    default_kwargs: dict,
+    next_token_arg_name: str,
+    next_token_value_field: str,
+    collection_value_field: str,
+    caller: Optional[BotoCaller] = None,
+) -> Iterable[dict]:
+    """
+    The generator version of :func:`list_recursively`, takes the same arguments.
+
+    It yields item one by one and only sends the next paginator API call
+    when the current page is exhausted. Only one page of raw response is held
+    in memory at a time, and the caller can start working on the first page
+    before the later pages are fetched.
+
+    :param method:
+    :param default_kwargs:
+    :param next_token_arg_name:
+    :param next_token_value_field:
+    :param collection_value_field:
+    :param caller:
     :return:
     """
+    if caller is None:
+        caller = default_caller
     next_token = None
-    lst: List[dict] = list()
     while 1:
         kwargs = default_kwargs.copy()
         if next_token is not None:
             kwargs[next_token_arg_name] = next_token
-        response = method(**kwargs)
+        response = caller.call(method, **kwargs)
         next_token = response.get(next_token_value_field)
-        lst.extend(response.get(collection_value_field, list()))
+        yield from response.get(collection_value_field, list())
         if next_token is None:
             break
-    return lst
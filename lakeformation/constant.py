@@ -1,3 +1,7 @@
 # -*- coding: utf-8 -*-
 
 DELIMITER = "____"
+
+# max number of values in ``TagValues`` of ``create_lf_tag``, and in
+# ``TagValuesToAdd`` / ``TagValuesToDelete`` of ``update_lf_tag``
+LF_TAG_VALUES_LIMIT = 1000
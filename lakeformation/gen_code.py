@@ -1,80 +1,123 @@
 # -*- coding: utf-8 -*-
 
 from pathlib import Path
-from typing import List
+from typing import List, Dict, Iterable
 
 from jinja2 import Template
 
 from .resource import Resource, Database, Table, Column
 from .principal import Principal, IamRole, IamUser, IamGroup
-from .boto_utils import list_recursively
+from .boto_utils import iter_recursively, no_retry_config
+from .pb.deployed import iter_db_and_tb_dct
 
 
 dir_here = Path(__file__).absolute().parent
 tpl_resource = Path(dir_here, "tpl", "resource.tpl")
 tpl_principal = Path(dir_here, "tpl", "principal.tpl")
 
-
-def gen_resource(boto_ses, workspace_dir: str):
-    sts_client = boto_ses.client("sts")
-    glue_client = boto_ses.client("glue")
-
-    account_id = sts_client.get_caller_identity()["Account"]
-    region_name = boto_ses.region_name
-
-    database_list: List[Database] = list()
-    for db_dct in list_recursively(
-        method = glue_client.get_databases,
-        default_kwargs=dict(
-            CatalogId=account_id,
-            MaxResults=1000,
-            ResourceShareType="ALL",
-        ),
-        next_token_arg_name="NextToken",
-        next_token_value_field="NextToken",
-        collection_value_field="DatabaseList"
+# template path -> compiled template
+_template_cache: Dict[Path, Template] = dict()
+
+
+def get_template(path: Path) -> Template:
+    """
+    Returns the compiled template, each template file is only read and
+    compiled once per process.
+    """
+    try:
+        return _template_cache[path]
+    except KeyError:
+        template = Template(source=path.read_text(encoding="utf-8"))
+        _template_cache[path] = template
+        return template
+
+
+def render_to_file(template: Template, output_path: Path, **kwargs):
+    """
+    Render the template chunk by chunk straight to the output file, the
+    whole content is never held in memory. The content is written to a
+    temp file first, so the existing output is kept if rendering fails.
+    """
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        for chunk in template.generate(**kwargs):
+            f.write(chunk)
+    tmp_path.replace(output_path)
+
+
+def iter_database(
+    glue_client,
+    account_id: str,
+    region_name: str,
+    max_workers: int = 1,
+) -> Iterable[Database]:
+    """
+    Yield the database with its tables and columns one by one, only the
+    database being rendered is kept in memory.
+
+    Database, table and column reference each other, the tables and columns
+    of a database are cleared when the next one is requested, to break the
+    reference cycle and free them without waiting for the garbage collector.
+    """
+    for db_dct, tb_dct_list in iter_db_and_tb_dct(
+        glue_client,
+        aws_account_id=account_id,
+        max_workers=max_workers,
     ):
         database = Database(
             catalog_id=db_dct["CatalogId"],
             region=region_name,
             name=db_dct["Name"],
+            _skip_validation=True,
         )
 
-        for tb_dct in list_recursively(
-            method = glue_client.get_tables,
-            default_kwargs=dict(
-                CatalogId=db_dct["CatalogId"],
-                DatabaseName=db_dct["Name"],
-                MaxResults=1000,
-            ),
-            next_token_arg_name="NextToken",
-            next_token_value_field="NextToken",
-            collection_value_field="TableList"
-        ):
+        for tb_dct in tb_dct_list:
             table = Table(
                 name=tb_dct["Name"],
                 database=database,
+                _skip_validation=True,
             )
 
-            for col_dct in tb_dct["StorageDescriptor"].get("Columns", []):
-                column = Column(name=col_dct["Name"], table=table)
+            for col_dct in tb_dct.get("StorageDescriptor", dict()).get("Columns", []):
+                column = Column(name=col_dct["Name"], table=table, _skip_validation=True)
                 table.c[column.name] = column
 
             database.t[table.name] = table
 
-        database_list.append(database)
+        yield database
 
-    tpl = Template(source=tpl_resource.read_text(encoding="utf-8"))
-    content = tpl.render(database_list=database_list)
+        for table in database.t.values():
+            table.c.clear()
+        database.t.clear()
+
+
+def gen_resource(boto_ses, workspace_dir: str, max_workers: int = 1):
+    """
+    :param max_workers: number of worker threads to fetch tables of
+        multiple databases concurrently.
+    """
+    sts_client = boto_ses.client("sts")
+    glue_client = boto_ses.client("glue", config=no_retry_config)
+
+    account_id = sts_client.get_caller_identity()["Account"]
+    region_name = boto_ses.region_name
 
     filename = f"resource_{account_id}_{region_name.replace('-', '_')}.py"
-    output_path = Path(workspace_dir, filename)
-    output_path.write_text(content, encoding="utf-8")
+    render_to_file(
+        get_template(tpl_resource),
+        Path(workspace_dir, filename),
+        database_list=iter_database(
+            glue_client,
+            account_id=account_id,
+            region_name=region_name,
+            max_workers=max_workers,
+        ),
+    )
 
 
 def gen_principal(boto_ses, workspace_dir: str):
     sts_client = boto_ses.client("sts")
-    iam_client = boto_ses.client("iam")
+    iam_client = boto_ses.client("iam", config=no_retry_config)
 
     account_id = sts_client.get_caller_identity()["Account"]
 
@@ -82,7 +125,7 @@ def gen_principal(boto_ses, workspace_dir: str):
     iam_group_list: List[IamGroup] = list()
     iam_role_list: List[IamRole] = list()
 
-    for role_dct in list_recursively(
+    for role_dct in iter_recursively(
         method = iam_client.list_roles,
         default_kwargs=dict(
             MaxItems=1000,
@@ -91,10 +134,10 @@ def gen_principal(boto_ses, workspace_dir: str):
         next_token_value_field="Marker",
         collection_value_field="Roles"
     ):
-        iam_role = IamRole(arn=role_dct["Arn"])
+        iam_role = IamRole(arn=role_dct["Arn"], _skip_validation=True)
         iam_role_list.append(iam_role)
 
-    for user_dct in list_recursively(
+    for user_dct in iter_recursively(
         method = iam_client.list_users,
         default_kwargs=dict(
             MaxItems=1000,
@@ -103,10 +146,10 @@ def gen_principal(boto_ses, workspace_dir: str):
         next_token_value_field="Marker",
         collection_value_field="Users"
     ):
-        iam_user = IamUser(arn=user_dct["Arn"])
+        iam_user = IamUser(arn=user_dct["Arn"], _skip_validation=True)
         iam_user_list.append(iam_user)
 
-    for group_dct in list_recursively(
+    for group_dct in iter_recursively(
         method = iam_client.list_groups,
         default_kwargs=dict(
             MaxItems=1000,
@@ -115,16 +158,14 @@ def gen_principal(boto_ses, workspace_dir: str):
         next_token_value_field="Marker",
         collection_value_field="Groups"
     ):
-        iam_group = IamGroup(arn=group_dct["Arn"])
+        iam_group = IamGroup(arn=group_dct["Arn"], _skip_validation=True)
         iam_group_list.append(iam_group)
 
-    tpl = Template(source=tpl_principal.read_text(encoding="utf-8"))
-    content = tpl.render(
+    filename = f"principal_{account_id}.py"
+    render_to_file(
+        get_template(tpl_principal),
+        Path(workspace_dir, filename),
         iam_user_list=iam_user_list,
         iam_group_list=iam_group_list,
         iam_role_list=iam_role_list,
     )
-
-    filename = f"principal_{account_id}.py"
-    output_path = Path(workspace_dir, filename)
-    output_path.write_text(content, encoding="utf-8")
@@ -4,39 +4,57 @@
 Association Class
 """
 
+from typing import Optional, TYPE_CHECKING
+
 from ..abstract import HashableAbc, SerializableAbc
 from ..principal import Principal, deserialize_principal
-from ..resource import Resource, NonLfTagResource, LfTag, deserialize_resource
+from ..resource import (
+    Resource, NonLfTagResource, Table, Column, LfTag, deserialize_resource,
+)
 from ..permission import Permission
 from ..constant import DELIMITER
 from ..validator import validate_attr_type
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..registry import Registry
+
 
 class DataLakePermission(HashableAbc, SerializableAbc):
+    __slots__ = ("_principal", "_resource", "_permission")
+
     object_type = "DataLakePermission"
+    _id_fields = ("principal", "resource", "permission")
 
     def __init__(
         self,
         principal: Principal,
         resource: Resource,
         permission: Permission,
+        _skip_validation: bool = False,
     ):
-        self.principal = principal
-        self.resource = resource
-        self.permission = permission
-        self.validate()
+        self._principal = principal
+        self._resource = resource
+        self._permission = permission
+        if _skip_validation is not True:
+            self.validate()
 
     def validate(self):
         validate_attr_type(self, "principal", self.principal, Principal)
         validate_attr_type(self, "resource", self.resource, Resource)
         validate_attr_type(self, "permission", self.permission, Permission)
 
-    @property
-    def id(self):
+    def _get_id(self) -> str:
         return DELIMITER.join([
             self.principal.id, self.resource.id, self.permission.id,
         ])
 
+    @property
+    def partition_key(self) -> str:
+        """
+        Data lake permissions are partitioned by principal for diffing.
+        """
+        return self.principal.id
+
     def serialize(self) -> dict:
         return dict(
             principal=self.principal.serialize(),
@@ -45,36 +63,68 @@ class DataLakePermission(HashableAbc, SerializableAbc):
         )
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'DataLakePermission':
+    def deserialize(
+        cls,
+        data: dict,
+        registry: Optional['Registry'] = None,
+    ) -> 'DataLakePermission':
+        """
+        :param registry: if given, equal principal, resource and permission
+            resolve to the shared instance in this registry.
+        """
+        if registry is None:
+            return cls(
+                principal=deserialize_principal(data["principal"]),
+                resource=deserialize_resource(data["resource"]),
+                permission=Permission.deserialize(data["permission"]),
+            )
         return cls(
-            principal=deserialize_principal(data["principal"]),
-            resource=deserialize_resource(data["resource"]),
-            permission=Permission.deserialize(data["permission"]),
+            principal=registry.principal(data["principal"]),
+            resource=registry.resource(data["resource"]),
+            permission=registry.permission(data["permission"]),
+            _skip_validation=registry.skip_validation,
         )
 
 
 class LfTagAttachment(HashableAbc, SerializableAbc):
+    __slots__ = ("_resource", "_tag")
+
     object_type = "LfTagAttachment"
+    _id_fields = ("resource", "tag")
 
     def __init__(
         self,
         resource: NonLfTagResource,
         tag: LfTag,
+        _skip_validation: bool = False,
     ):
-        self.resource = resource
-        self.tag = tag
-        self.validate()
+        self._resource = resource
+        self._tag = tag
+        if _skip_validation is not True:
+            self.validate()
 
     def validate(self):
         validate_attr_type(self, "resource", self.resource, NonLfTagResource)
         validate_attr_type(self, "tag", self.tag, LfTag)
 
-    @property
-    def id(self):
+    def _get_id(self) -> str:
         return DELIMITER.join([
             self.resource.id, self.tag.id
         ])
 
+    @property
+    def partition_key(self) -> str:
+        """
+        LF tag attachments are partitioned by database for diffing.
+        Attachments on other resource are partitioned by resource.
+        """
+        res = self.resource
+        if res.object_type == Column.object_type:
+            res = res.table
+        if res.object_type == Table.object_type:
+            res = res.database
+        return res.id
+
     def serialize(self) -> dict:
         return dict(
             resource=self.resource.serialize(),
@@ -82,8 +132,22 @@ class LfTagAttachment(HashableAbc, SerializableAbc):
         )
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'LfTagAttachment':
+    def deserialize(
+        cls,
+        data: dict,
+        registry: Optional['Registry'] = None,
+    ) -> 'LfTagAttachment':
+        """
+        :param registry: if given, equal resource and tag resolve to the
+            shared instance in this registry.
+        """
+        if registry is None:
+            return cls(
+                resource=deserialize_resource(data["resource"]),
+                tag=LfTag.deserialize(data["tag"]),
+            )
         return cls(
-            resource=deserialize_resource(data["resource"]),
-            tag=LfTag.deserialize(data["tag"]),
+            resource=registry.resource(data["resource"]),
+            tag=registry.resource(data["tag"]),
+            _skip_validation=registry.skip_validation,
         )
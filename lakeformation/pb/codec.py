@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""
+Codec for the deployed playbook state file.
+
+The codec is selected by the file extension, for example:
+
+- ``.json``: stdlib json, the default
+- ``.orjson``: `orjson <https://pypi.org/project/orjson/>`_, a fast json library
+- ``.msgpack``: `msgpack <https://pypi.org/project/msgpack/>`_, a compact binary format
+- ``.json.gz``, ``.msgpack.zst``, ...: any of above plus gzip or
+  `zstandard <https://pypi.org/project/zstandard/>`_ compression
+
+orjson, msgpack and zstandard are optional dependencies, they are only
+imported when the codec is used. Install them by the extras, for example
+``pip install lakeformation[codec]``, or ``[orjson]``, ``[msgpack]``,
+``[zstd]``.
+"""
+
+import abc
+import gzip
+import json
+from pathlib import Path
+from typing import Dict, Union
+
+
+class Codec(abc.ABC):
+    """
+    Convert the serialized playbook dict to bytes and back.
+
+    :param ext: the file extension of this codec, starts with ``.``.
+    """
+    ext: str = None
+
+    @abc.abstractmethod
+    def dumps(self, data: dict) -> bytes:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def loads(self, b: bytes) -> dict:
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    ext = ".json"
+
+    def __init__(self, indent: int = 4):
+        self.indent = indent
+
+    def dumps(self, data: dict) -> bytes:
+        return json.dumps(data, indent=self.indent).encode("utf-8")
+
+    def loads(self, b: bytes) -> dict:
+        return json.loads(b)
+
+
+class OrjsonCodec(Codec):
+    ext = ".orjson"
+
+    def dumps(self, data: dict) -> bytes:
+        import orjson
+        return orjson.dumps(data)
+
+    def loads(self, b: bytes) -> dict:
+        import orjson
+        return orjson.loads(b)
+
+
+class MsgpackCodec(Codec):
+    ext = ".msgpack"
+
+    def dumps(self, data: dict) -> bytes:
+        import msgpack
+        return msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, b: bytes) -> dict:
+        import msgpack
+        return msgpack.unpackb(b, raw=False, strict_map_key=False)
+
+
+class Compressor(abc.ABC):
+    ext: str = None
+
+    @abc.abstractmethod
+    def compress(self, b: bytes) -> bytes:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def decompress(self, b: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class GzipCompressor(Compressor):
+    ext = ".gz"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, b: bytes) -> bytes:
+        return gzip.compress(b, compresslevel=self.level)
+
+    def decompress(self, b: bytes) -> bytes:
+        return gzip.decompress(b)
+
+
+class ZstdCompressor(Compressor):
+    ext = ".zst"
+
+    def __init__(self, level: int = 3):
+        self.level = level
+
+    def compress(self, b: bytes) -> bytes:
+        import zstandard
+        return zstandard.ZstdCompressor(level=self.level).compress(b)
+
+    def decompress(self, b: bytes) -> bytes:
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(b)
+
+
+class CompressedCodec(Codec):
+    """
+    Apply a :class:`Compressor` on top of a :class:`Codec`.
+    """
+
+    def __init__(self, codec: Codec, compressor: Compressor):
+        self.codec = codec
+        self.compressor = compressor
+
+    @property
+    def ext(self) -> str:
+        return self.codec.ext + self.compressor.ext
+
+    def dumps(self, data: dict) -> bytes:
+        return self.compressor.compress(self.codec.dumps(data))
+
+    def loads(self, b: bytes) -> dict:
+        return self.codec.loads(self.compressor.decompress(b))
+
+
+_codec_mapper: Dict[str, Codec] = {
+    JsonCodec.ext: JsonCodec(),
+    OrjsonCodec.ext: OrjsonCodec(),
+    MsgpackCodec.ext: MsgpackCodec(),
+}
+
+_compressor_mapper: Dict[str, Compressor] = {
+    GzipCompressor.ext: GzipCompressor(),
+    ZstdCompressor.ext: ZstdCompressor(),
+}
+
+
+def get_codec(ext: str) -> Codec:
+    """
+    Get codec by file extension, for example ``.json``, ``.msgpack.zst``.
+    """
+    if not ext.startswith("."):
+        ext = f".{ext}"
+    for compressor_ext, compressor in _compressor_mapper.items():
+        if ext.endswith(compressor_ext):
+            return CompressedCodec(
+                codec=get_codec(ext[:-len(compressor_ext)]),
+                compressor=compressor,
+            )
+    try:
+        return _codec_mapper[ext]
+    except KeyError:
+        raise ValueError(f"unknown deployed playbook file extension {ext!r}!")
+
+
+def get_codec_by_path(path: Union[str, Path]) -> Codec:
+    """
+    Get codec by the file extension of the path, for example
+    ``deployed-111122223333-us-east-1.json.gz``.
+    """
+    path = Path(path)
+    if path.suffix in _compressor_mapper:
+        ext = "".join(path.suffixes[-2:])
+    else:
+        ext = path.suffix
+    return get_codec(ext)
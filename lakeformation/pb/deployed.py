@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 
 import boto3
-from typing import List, Union
+from typing import List, Tuple, Union, Iterable, Optional
 
 from .asso import LfTagAttachment, DataLakePermission
-from ..boto_utils import list_recursively
+from ..boto_utils import iter_recursively
+from ..utils import imap_concurrently
+from ..registry import Registry
 from ..principal import (
     Principal, IamRole, IamUser, IamGroup, ExternalAccount
 )
@@ -16,7 +18,7 @@ from ..resource import (
 
 def list_all_iam_role(iam_client) -> List[IamRole]:
     iam_role_list = list()
-    for role_dct in list_recursively(
+    for role_dct in iter_recursively(
         method=iam_client.list_roles,
         default_kwargs=dict(
             MaxItems=1000,
@@ -25,14 +27,14 @@ def list_all_iam_role(iam_client) -> List[IamRole]:
         next_token_value_field="Marker",
         collection_value_field="Roles"
     ):
-        role = IamRole(arn=role_dct["Arn"])
+        role = IamRole(arn=role_dct["Arn"], _skip_validation=True)
         iam_role_list.append(role)
     return iam_role_list
 
 
 def list_all_iam_user(iam_client) -> List[IamUser]:
     iam_user_list = list()
-    for user_dct in list_recursively(
+    for user_dct in iter_recursively(
         method=iam_client.list_users,
         default_kwargs=dict(
             MaxItems=1000,
@@ -41,14 +43,14 @@ def list_all_iam_user(iam_client) -> List[IamUser]:
         next_token_value_field="Marker",
         collection_value_field="Users"
     ):
-        user = IamUser(arn=user_dct["Arn"])
+        user = IamUser(arn=user_dct["Arn"], _skip_validation=True)
         iam_user_list.append(user)
     return iam_user_list
 
 
 def list_all_iam_group(iam_client) -> List[IamGroup]:
     iam_group_list = list()
-    for group_dct in list_recursively(
+    for group_dct in iter_recursively(
         method=iam_client.list_groups,
         default_kwargs=dict(
             MaxItems=1000,
@@ -57,7 +59,7 @@ def list_all_iam_group(iam_client) -> List[IamGroup]:
         next_token_value_field="Marker",
         collection_value_field="Groups",
     ):
-        group = IamGroup(arn=group_dct["Arn"])
+        group = IamGroup(arn=group_dct["Arn"], _skip_validation=True)
         iam_group_list.append(group)
     return iam_group_list
 
@@ -76,49 +78,106 @@ def list_all_iam_group(iam_client) -> List[IamGroup]:
 #     ):
 
 
-def list_all_db_tb_col(
+def list_all_table_dct(
     glue_client,
-    aws_account_id: str,
-    aws_region: str,
-) -> List[Union[Database, Table, Column]]:
-    res_list = list()
-
-    for db_dct in list_recursively(
-        method=glue_client.get_databases,
+    catalog_id: str,
+    database_name: str,
+) -> List[dict]:
+    """
+    List all table of a Glue database, returns the raw ``TableList`` dict.
+    """
+    return list(iter_recursively(
+        method=glue_client.get_tables,
         default_kwargs=dict(
-            CatalogId=aws_account_id,
+            CatalogId=catalog_id,
+            DatabaseName=database_name,
             MaxResults=1000,
-            ResourceShareType="ALL",
         ),
         next_token_arg_name="NextToken",
         next_token_value_field="NextToken",
-        collection_value_field="DatabaseList"
-    ):
-        db = Database(
+        collection_value_field="TableList"
+    ))
+
+
+def iter_db_and_tb_dct(
+    glue_client,
+    aws_account_id: str,
+    max_workers: int = 1,
+) -> Iterable[Tuple[dict, List[dict]]]:
+    """
+    Iterate all Glue database, yield a tuple of raw database dict and the list
+    of raw table dict in this database.
+
+    The order is always the same as the ``get_databases`` API returns.
+    If ``max_workers`` > 1, tables of multiple databases are fetched
+    concurrently with a thread pool.
+    """
+
+    def get_tb_dct_list(db_dct: dict) -> Tuple[dict, List[dict]]:
+        return db_dct, list_all_table_dct(
+            glue_client,
             catalog_id=db_dct["CatalogId"],
-            region=aws_region,
-            name=db_dct["Name"],
+            database_name=db_dct["Name"],
         )
-        res_list.append(db)
-        for tb_dct in list_recursively(
-            method=glue_client.get_tables,
+
+    yield from imap_concurrently(
+        get_tb_dct_list,
+        iter_recursively(
+            method=glue_client.get_databases,
             default_kwargs=dict(
-                CatalogId=db.catalog_id,
-                DatabaseName=db.name,
+                CatalogId=aws_account_id,
                 MaxResults=1000,
+                ResourceShareType="ALL",
             ),
             next_token_arg_name="NextToken",
             next_token_value_field="NextToken",
-            collection_value_field="TableList"
-        ):
-            tb = Table(
+            collection_value_field="DatabaseList"
+        ),
+        max_workers=max_workers,
+    )
+
+
+def list_all_db_tb_col(
+    glue_client,
+    aws_account_id: str,
+    aws_region: str,
+    max_workers: int = 1,
+    registry: Optional[Registry] = None,
+) -> List[Union[Database, Table, Column]]:
+    """
+    :param max_workers: number of worker threads to fetch tables of
+        multiple databases concurrently. The output is identical and in the
+        same order regardless of this value.
+    :param registry: the flyweight registry to create the objects, the
+        repeated catalog id, region and column names share one str object.
+        Pass the same registry used for deserialization to share the
+        instances with the deployed playbook. The objects are returned by
+        the AWS API, so the default registry skips the validation.
+    """
+    if registry is None:
+        registry = Registry(skip_validation=True)
+    res_list = list()
+
+    for db_dct, tb_dct_list in iter_db_and_tb_dct(
+        glue_client,
+        aws_account_id=aws_account_id,
+        max_workers=max_workers,
+    ):
+        db = registry.database(
+            catalog_id=db_dct["CatalogId"],
+            region=aws_region,
+            name=db_dct["Name"],
+        )
+        res_list.append(db)
+        for tb_dct in tb_dct_list:
+            tb = registry.table(
                 name=tb_dct["Name"],
                 database=db,
             )
             res_list.append(tb)
 
             for col_dct in tb_dct.get("StorageDescriptor", dict()).get("Columns", []):
-                column = Column(name=col_dct["Name"], table=tb)
+                column = registry.column(name=col_dct["Name"], table=tb)
                 res_list.append(column)
 
     return res_list
@@ -129,7 +188,7 @@ def list_all_datalake_location(
     aws_account_id: str,
 ) -> List[DataLakeLocation]:
     dl_loc_list = list()
-    for dl_loc_dct in list_recursively(
+    for dl_loc_dct in iter_recursively(
         method=lf_client.list_resources,
         default_kwargs=dict(
             MaxResults=1000,
@@ -145,6 +204,7 @@ def list_all_datalake_location(
             catalog_id=aws_account_id,
             resource_arn=dl_loc_dct["ResourceArn"],
             role_arn=role_arn,
+            _skip_validation=True,
         )
         dl_loc_list.append(dl_loc)
     return dl_loc_list
@@ -154,7 +214,7 @@ def list_all_data_cell_filter(
     lf_client,
 ) -> List[DataCellsFilter]:
     data_filter_list = list()
-    for data_filter_dct in list_recursively(
+    for data_filter_dct in iter_recursively(
         method=lf_client.list_data_cells_filter,
         default_kwargs=dict(
             MaxResults=1000,
@@ -178,7 +238,7 @@ def list_all_data_cell_filter(
     return data_filter_list
 
 
-    # for lf_dct in list_recursively(
+    # for lf_dct in iter_recursively(
     #     method=lf_client.list_lf_tags,
     #     default_kwargs=dict(
     #         CatalogId=aws_account_id,
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+"""
+Bitmask permission set for the (principal, resource) pairs.
+
+A playbook may have millions of :class:`~lakeformation.pb.asso.DataLakePermission`,
+but the grant / revoke API works on a (principal, resource) pair with a set
+of permissions. :class:`PermissionMaskIndex` keeps one int bitmask over
+:class:`~lakeformation.permission.PermissionEnum` per pair, so the diff and
+the entry building are bitwise operations instead of string keys grouping.
+"""
+
+from typing import List, Dict, Tuple, Iterable
+
+from ..principal import Principal
+from ..resource import Resource
+from ..permission import PermissionEnum, get_permission_bit
+from .asso import DataLakePermission
+
+
+class PermissionMaskIndex:
+    """
+    Group the data lake permissions by principal id (the partition key of
+    :class:`~lakeformation.pb.asso.DataLakePermission`), then by resource id.
+
+    It is a planning index next to
+    :attr:`~lakeformation.pb.playbook.Playbook.datalake_permissions`,
+    not a replacement of it. It costs one ``[principal, resource, mask]``
+    entry per pair, the principal and resource are shared with the
+    :class:`~lakeformation.pb.asso.DataLakePermission`.
+    """
+
+    def __init__(self):
+        # principal id -> resource id -> [principal, resource, mask]
+        self.pairs: Dict[str, Dict[str, list]] = dict()
+
+    def add(self, dl_permission: DataLakePermission):
+        bit = get_permission_bit(dl_permission.permission)
+        principal = dl_permission.principal
+        resource = dl_permission.resource
+        try:
+            by_resource = self.pairs[principal.id]
+        except KeyError:
+            by_resource = dict()
+            self.pairs[principal.id] = by_resource
+        try:
+            by_resource[resource.id][2] |= bit
+        except KeyError:
+            by_resource[resource.id] = [principal, resource, bit]
+
+    def add_mask(self, principal: Principal, resource: Resource, mask: int):
+        """
+        Add many permissions on the same pair at once.
+        """
+        try:
+            by_resource = self.pairs[principal.id]
+        except KeyError:
+            by_resource = dict()
+            self.pairs[principal.id] = by_resource
+        try:
+            by_resource[resource.id][2] |= mask
+        except KeyError:
+            by_resource[resource.id] = [principal, resource, mask]
+
+    def remove(self, dl_permission: DataLakePermission):
+        by_resource = self.pairs[dl_permission.principal.id]
+        pair = by_resource[dl_permission.resource.id]
+        pair[2] &= ~get_permission_bit(dl_permission.permission)
+        if pair[2] == 0:
+            del by_resource[dl_permission.resource.id]
+            if len(by_resource) == 0:
+                del self.pairs[dl_permission.principal.id]
+
+    def get_mask(self, principal_id: str, resource_id: str) -> int:
+        try:
+            return self.pairs[principal_id][resource_id][2]
+        except KeyError:
+            return 0
+
+
+# (bit of X, bit of XGrantable, whether they are the same in the API call)
+_grant_option_twin_list: List[Tuple[int, int, bool]] = [
+    (
+        get_permission_bit(permission.value),
+        get_permission_bit(PermissionEnum[f"{permission.name}Grantable"].value),
+        (
+            permission.value.permission,
+            permission.value.grantable,
+        ) == (
+            PermissionEnum[f"{permission.name}Grantable"].value.permission,
+            PermissionEnum[f"{permission.name}Grantable"].value.grantable,
+        ),
+    )
+    for permission in PermissionEnum
+    if not permission.name.endswith("Grantable")
+]
+
+
+def get_grant_option_change(
+    to_grant: int,
+    to_revoke: int,
+    mask: int = 0,
+) -> Tuple[int, int, int, int]:
+    """
+    Detect the permissions on a pair that only differ in ``grantable``.
+
+    - Upgrade, ``X`` -> ``XGrantable``: granting the grant option is done in
+      place, ``X`` is not revoked. The ``X`` grant is still in place, so it
+      is kept in the deployed playbook file as long as ``XGrantable`` is
+      wanted, then removing the pair revokes both of them.
+    - Downgrade, ``XGrantable`` -> ``X``: revoking the grant option keeps
+      ``X``, ``X`` is not granted.
+
+    If ``X`` and ``XGrantable`` are the same in the API call, for example
+    ``DataLocationAccess``, nothing is granted nor revoked.
+
+    :param mask: the new mask of the pair, an ``X`` kept by an earlier
+        upgrade is not revoked while ``XGrantable`` is in it.
+
+    Returns a tuple of (to grant mask, to revoke mask, upgrade mask,
+    downgrade mask). The upgrade / downgrade mask has the bits of ``X``
+    that are removed from the to revoke / to grant mask.
+    """
+    if not to_revoke:
+        return to_grant, to_revoke, 0, 0
+    upgrade = 0
+    downgrade = 0
+    for bit, grantable_bit, is_same in _grant_option_twin_list:
+        if (to_revoke & bit) and ((to_grant | mask) & grantable_bit):
+            if is_same:
+                to_grant &= ~grantable_bit
+                to_revoke &= ~bit
+            else:
+                upgrade |= bit
+        elif (to_grant & bit) and (to_revoke & grantable_bit):
+            if is_same:
+                to_grant &= ~bit
+                to_revoke &= ~grantable_bit
+            else:
+                downgrade |= bit
+    return to_grant & ~downgrade, to_revoke & ~upgrade, upgrade, downgrade
+
+
+def _get_implication_list() -> List[Tuple[int, int]]:
+    """
+    Returns a list of (bit, mask of the permissions implied by this bit).
+
+    - ``ALL`` (``SuperDatabase`` / ``SuperTable``) implies the other
+      permissions of the same resource type on the same grant option level,
+      except ``CreateDatabase``, it is a catalog level permission.
+    - ``XGrantable`` implies ``X`` if they are the same in the API call,
+      for example ``DataLocationAccess``.
+    """
+    implication_list = list()
+    for permission in PermissionEnum:
+        value = permission.value
+        is_grantable = permission.name.endswith("Grantable")
+        if value.permission == "ALL":
+            implied = [
+                other.value
+                for other in PermissionEnum
+                if (
+                    other.value.resource_type == value.resource_type
+                    and other.name.endswith("Grantable") is is_grantable
+                    and other.value.permission not in ["ALL", "CREATE_DATABASE"]
+                )
+            ]
+        elif is_grantable:
+            twin = PermissionEnum[permission.name[:-len("Grantable")]].value
+            if (twin.permission, twin.grantable) != (value.permission, value.grantable):
+                continue
+            implied = [twin, ]
+        else:
+            continue
+        mask = 0
+        for implied_permission in implied:
+            mask |= get_permission_bit(implied_permission)
+        implication_list.append((get_permission_bit(value), mask))
+    return implication_list
+
+
+_implication_list: List[Tuple[int, int]] = _get_implication_list()
+
+
+def get_implied_by_mask(mask: int) -> int:
+    """
+    Returns all the bits implied by the bits in ``mask``, no matter they are
+    in ``mask`` or not.
+    """
+    implied = 0
+    for bit, implied_mask in _implication_list:
+        if mask & bit:
+            implied |= implied_mask
+    return implied
+
+
+def get_implied_mask(mask: int) -> int:
+    """
+    Returns the bits in ``mask`` that are implied by other bits in ``mask``,
+    they can be removed without changing the effective permissions.
+    """
+    return mask & get_implied_by_mask(mask)
+
+
+def get_implying_mask(mask: int) -> int:
+    """
+    Returns the bits in ``mask`` that imply other bits in ``mask``.
+    """
+    implying = 0
+    for bit, implied_mask in _implication_list:
+        if (mask & bit) and (mask & implied_mask):
+            implying |= bit
+    return implying
+
+
+def get_mask_diff(
+    idx1: PermissionMaskIndex,
+    idx2: PermissionMaskIndex,
+    principal_ids: Iterable[str],
+) -> List[Tuple[Principal, Resource, int, int]]:
+    """
+    Compare the pairs of the given principals.
+
+    Returns a list of (principal, resource, to grant mask, to revoke mask),
+    only the pairs that has anything to grant or revoke are included.
+    """
+    diff = list()
+    for principal_id in principal_ids:
+        pairs1 = idx1.pairs.get(principal_id, dict())
+        pairs2 = idx2.pairs.get(principal_id, dict())
+        for resource_id, (principal, resource, mask1) in pairs1.items():
+            try:
+                mask2 = pairs2[resource_id][2]
+            except KeyError:
+                mask2 = 0
+            to_grant = mask1 & ~mask2
+            to_revoke = mask2 & ~mask1
+            if to_grant or to_revoke:
+                diff.append((principal, resource, to_grant, to_revoke))
+        for resource_id, (principal, resource, mask2) in pairs2.items():
+            if resource_id not in pairs1:
+                diff.append((principal, resource, 0, mask2))
+    return diff
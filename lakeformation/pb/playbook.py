@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
 import json
+import time
+import itertools
 import uuid
+import hashlib
 import boto3
 from pathlib import Path
 from colorama import Fore, Back, Style
@@ -9,7 +12,7 @@ from ordered_set import OrderedSet
 
 from typing import (
     List, Tuple, Set, Dict, Iterable, Sequence, Mapping,
-    Union, Any, Optional, Type,
+    Union, Any, Optional, Type, Callable,
 )
 
 from ..logger import logger
@@ -19,17 +22,29 @@ from ..principal import (
     IamRole, IamUser, IamGroup, ExternalAccount,
     deserialize_principal,
 )
-from ..permission import Permission
+from ..permission import Permission, to_mask, from_mask
 from ..resource import (
     Resource, NonLfTagResource,
     Database, Table, Column,
     DataLakeLocation, DataCellsFilter, LfTag,
     deserialize_resource,
 )
-from ..validator import validate_attr_type
-from ..utils import get_local_and_utc_now, get_diff_and_inter, grouper_list
-from ..boto_utils import list_recursively
+from ..validator import validate_attr_type, validate_items_type
+from ..constant import DELIMITER, LF_TAG_VALUES_LIMIT
+from ..utils import (
+    get_local_and_utc_now, get_diff_and_inter, grouper_list, imap_concurrently,
+    PartitionIndex, get_changed_partition_keys, get_partitioned_diff,
+)
+from ..boto_utils import BotoCaller, default_caller, no_retry_config
+from ..registry import Registry
 from .asso import DataLakePermission, LfTagAttachment
+from .mask import (
+    PermissionMaskIndex, get_mask_diff, get_grant_option_change,
+    get_implied_mask, get_implied_by_mask, get_implying_mask,
+)
+from .tag_policy import LfTagPolicyGrant, get_lf_tag_policy_grants
+from .codec import Codec, JsonCodec, get_codec, get_codec_by_path
+from .state import STATE_FORMAT_VERSION, RefEncoder, RefDecoder
 
 
 class Playbook:
@@ -42,6 +57,20 @@ class Playbook:
 
     每一个 Playbook 只能负责一个 AWS Account 的一个 Region.
 
+    :param caller: the :class:`~lakeformation.boto_utils.BotoCaller` to send
+        all AWS API calls. It retries throttled calls with backoff and adjusts
+        the concurrency. If not specified, use the shared
+        :data:`~lakeformation.boto_utils.default_caller`.
+    :param deployed_pb_ext: file extension of the deployed playbook file,
+        it decides the codec and compression, for example ``.json``,
+        ``.orjson``, ``.msgpack``, ``.json.gz``, ``.msgpack.zst``.
+        See :mod:`lakeformation.pb.codec`.
+    :param max_workers: max number of concurrent in-flight API requests
+        when applying changes. Default 1 means sending requests one by one.
+    :param batch_size: number of entries per batch API request, for example
+        ``batch_grant_permissions``. The service limit is 20.
+    :param max_retries: how many times to retry the entries reported in
+        the ``Failures`` of a batch API response.
     :param _skip_validation: internal parameter for testing. If true,
         skip validation for boto session and workspace directory.
     """
@@ -50,6 +79,11 @@ class Playbook:
         self,
         boto_ses: boto3.session.Session = None,
         workspace_dir: Optional[Union[Path, str]] = None,
+        caller: Optional[BotoCaller] = None,
+        deployed_pb_ext: str = JsonCodec.ext,
+        max_workers: int = 1,
+        batch_size: int = 20,
+        max_retries: int = 3,
         _skip_validation: bool = False
     ):
         self.boto_ses = boto_ses
@@ -63,6 +97,15 @@ class Playbook:
         self.glue_client = None
         self.lf_client = None
         self.sts_client = None
+        if caller is None:
+            caller = default_caller
+        self.caller: BotoCaller = caller
+        self.codec: Codec = get_codec(deployed_pb_ext)
+        self.max_workers = max_workers
+        if not (1 <= batch_size <= 20):
+            raise ValueError(f"batch_size has to be between 1 and 20, got {batch_size}!")
+        self.batch_size = batch_size
+        self.max_retries = max_retries
 
         self.account_id: Optional[str] = None
         self.region: Optional[str] = None
@@ -72,8 +115,29 @@ class Playbook:
 
         self.principals: Dict[str, Principal] = dict()
         self.resources: Dict[str, Resource] = dict()
+        # type partitioned view of the resources and the tag key -> values
+        # index, they are maintained incrementally when resource is added,
+        # see :meth:`Playbook._put_resource`
+        self._tags: Dict[str, LfTag] = dict()
+        self._dl_locations: Dict[str, DataLakeLocation] = dict()
+        self._data_filters: Dict[str, DataCellsFilter] = dict()
+        self._tag_mapper: Dict[str, OrderedSet] = dict()
         self.datalake_permissions: Dict[str, DataLakePermission] = dict()
         self.lf_tag_attachments: Dict[str, LfTagAttachment] = dict()
+        # partitioned id index for diffing,
+        # see :meth:`DataLakePermission.partition_key`
+        self.dl_permission_partitions = PartitionIndex()
+        self.lf_tag_attachment_partitions = PartitionIndex()
+        # (principal, resource) pair -> permission bitmask for planning,
+        # see :mod:`lakeformation.pb.mask`
+        self.dl_permission_masks = PermissionMaskIndex()
+        # principal id -> grant id -> the multi-value LF tag expression
+        # grant that is actually sent, only for the deployed playbook.
+        # None means it is not recorded, one grant per tag value is assumed,
+        # see :mod:`lakeformation.pb.tag_policy`
+        self.lf_tag_policy_grants: Optional[
+            Dict[str, Dict[str, LfTagPolicyGrant]]
+        ] = None
 
         if _skip_validation is not True:
             self.validate()
@@ -87,9 +151,10 @@ class Playbook:
         assert self.workspace_dir.exists()
 
         # create boto client
-        self.iam_client = self.boto_ses.client("iam")
-        self.glue_client = self.boto_ses.client("glue")
-        self.lf_client = self.boto_ses.client("lakeformation")
+        # retry is done by the BotoCaller
+        self.iam_client = self.boto_ses.client("iam", config=no_retry_config)
+        self.glue_client = self.boto_ses.client("glue", config=no_retry_config)
+        self.lf_client = self.boto_ses.client("lakeformation", config=no_retry_config)
         self.sts_client = self.boto_ses.client("sts")
 
         # get aws account id and aws region
@@ -97,6 +162,17 @@ class Playbook:
         self.region: Optional[str] = self.boto_ses.region_name
         self.playbook_id = f"{self.account_id}_{self.region}"
 
+    @property
+    def deployed_pb_file(self) -> Path:
+        """
+        Return the path of the deployed playbook file, the file extension
+        is decided by :attr:`Playbook.codec`.
+        """
+        return Path(
+            self.workspace_dir,
+            f"deployed-{self.account_id}-{self.region}{self.codec.ext}",
+        )
+
     @property
     def deployed_pb_json(self) -> Path:
         """
@@ -107,6 +183,36 @@ class Playbook:
             f"deployed-{self.account_id}-{self.region}.json",
         )
 
+    def _get_other_deployed_pb_files(self) -> List[Path]:
+        """
+        The deployed playbook files of this account and region that are
+        written by other codecs, for example the legacy ``.json`` file,
+        the newest first.
+        """
+        path_list = list()
+        for path in Path(self.workspace_dir).glob(
+            f"deployed-{self.account_id}-{self.region}.*"
+        ):
+            if path == self.deployed_pb_file:
+                continue
+            try:
+                get_codec_by_path(path)
+            except ValueError:  # not a deployed playbook file, the fingerprint file
+                continue
+            path_list.append(path)
+        return sorted(path_list, key=lambda path: path.stat().st_mtime, reverse=True)
+
+    def write_deployed_playbook(self, pb: 'Playbook'):
+        """
+        Write the playbook to the :attr:`Playbook.deployed_pb_file`.
+
+        Then remove the deployed playbook files written by other codecs,
+        so switching the codec back and forth never loads a stale one.
+        """
+        self.deployed_pb_file.write_bytes(self.codec.dumps(pb.serialize()))
+        for path in self._get_other_deployed_pb_files():
+            path.unlink()
+
     def serialize(self) -> dict:
         local_now, utc_now = get_local_and_utc_now()
         try:
@@ -121,27 +227,52 @@ class Playbook:
             "account_id": self.account_id,
             "region": self.region,
             "playbook_id": self.playbook_id,
-            "principals": {
-                id_: principal.serialize()
-                for id_, principal in self.principals.items()
-            },
-            "resources": {
-                id_: res.serialize()
-                for id_, res in self.resources.items()
-            },
-            "datalake_permissions": {
-                id_: dl_permission.serialize()
-                for id_, dl_permission in self.datalake_permissions.items()
-            },
-            "lf_tag_attachments": {
-                id_: lf_tag_attachment.serialize()
-                for id_, lf_tag_attachment in self.lf_tag_attachments.items()
-            },
+            "format_version": STATE_FORMAT_VERSION,
+        }
+        encoder = RefEncoder()
+        data["principals"] = [
+            encoder.principal(principal)
+            for principal in self.principals.values()
+        ]
+        data["resources"] = [
+            encoder.resource(res)
+            for res in self.resources.values()
+        ]
+        data["datalake_permissions"] = [
+            [
+                encoder.principal(dl_permission.principal),
+                encoder.resource(dl_permission.resource),
+                encoder.permission(dl_permission.permission),
+            ]
+            for dl_permission in self.datalake_permissions.values()
+        ]
+        data["lf_tag_attachments"] = [
+            [
+                encoder.resource(lf_tag_attachment.resource),
+                encoder.resource(lf_tag_attachment.tag),
+            ]
+            for lf_tag_attachment in self.lf_tag_attachments.values()
+        ]
+        if self.lf_tag_policy_grants is not None:
+            data["lf_tag_policy_grants"] = [
+                [
+                    encoder.principal(grant.principal),
+                    grant.resource_type,
+                    [encoder.permission(permission) for permission in grant.permissions],
+                    [encoder.resource(tag) for tag in grant.tags],
+                ]
+                for grants in self.lf_tag_policy_grants.values()
+                for grant in grants.values()
+            ]
+        data["objects"] = encoder.to_dict()
+        data["partition_digests"] = {
+            "datalake_permissions": self.dl_permission_partitions.digests(),
+            "lf_tag_attachments": self.lf_tag_attachment_partitions.digests(),
         }
         return data
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'Playbook':
+    def deserialize(cls, data: dict, _skip_validation: bool = False) -> 'Playbook':
         """
         .. note::
 
@@ -150,40 +281,100 @@ class Playbook:
             with playbook
 
         :param data:
+        :param _skip_validation: internal parameter for the trusted data
+            written by this library, for example the deployed playbook file.
+            If true, skip the validation of each principal, resource and
+            association object, and use the stored partition digests instead
+            of hashing all the ids.
         :return:
         """
         pb = cls(_skip_validation=True)
         pb.account_id = data.get("account_id")
         pb.region = data.get("region")
+        if data.get("format_version", 1) == 1:
+            pb._deserialize_v1(data, _skip_validation=_skip_validation)
+            return pb
+
+        decoder = RefDecoder(
+            data.get("objects", dict()),
+            registry=Registry(skip_validation=_skip_validation),
+        )
+        for principal_id in data.get("principals", list()):
+            pb.principals[principal_id] = decoder.principal(principal_id)
+
+        for resource_id in data.get("resources", list()):
+            pb._put_resource(decoder.resource(resource_id))
+
+        for principal_id, resource_id, permission_id in data.get("datalake_permissions", list()):
+            dl_permission = DataLakePermission(
+                principal=decoder.principal(principal_id),
+                resource=decoder.resource(resource_id),
+                permission=decoder.permission(permission_id),
+                _skip_validation=_skip_validation,
+            )
+            pb._put_dl_permission(dl_permission)
+
+        for resource_id, tag_id in data.get("lf_tag_attachments", list()):
+            lf_tag_attachment = LfTagAttachment(
+                resource=decoder.resource(resource_id),
+                tag=decoder.resource(tag_id),
+                _skip_validation=_skip_validation,
+            )
+            pb._put_lf_tag_attachment(lf_tag_attachment)
+
+        if "lf_tag_policy_grants" in data:
+            pb.lf_tag_policy_grants = dict()
+            for principal_id, resource_type, permission_ids, tag_ids in data["lf_tag_policy_grants"]:
+                grant = LfTagPolicyGrant(
+                    principal=decoder.principal(principal_id),
+                    resource_type=resource_type,
+                    permissions=[decoder.permission(id_) for id_ in permission_ids],
+                    tags=[decoder.resource(id_) for id_ in tag_ids],
+                )
+                pb.lf_tag_policy_grants.setdefault(principal_id, dict())[grant.id] = grant
+
+        if _skip_validation:
+            partition_digests = data.get("partition_digests", dict())
+            pb.dl_permission_partitions.seed_digests(
+                partition_digests.get("datalake_permissions", dict())
+            )
+            pb.lf_tag_attachment_partitions.seed_digests(
+                partition_digests.get("lf_tag_attachments", dict())
+            )
+
+        # all LF tag instances are shared, link each of them once
+        for res in decoder.resources.values():
+            if res.object_type == LfTag.object_type:
+                res.pb = pb
 
-        # for id_, principal_dct in data.get("principals", dict()).items():
-        #     principal = Principal.deserialize(principal_dct)
-        #     if principal_dct.get("_playbook_managed", False):
-        #         principal.pb = pb
-        #     pb.resources[id_] =
-        #     for res in pb.resources.values():
-        #         if res.res_type == LfTag.res_type:
-        #             res.pb = pb
+        return pb
 
+    def _deserialize_v1(self, data: dict, _skip_validation: bool = False):
+        """
+        Load the legacy format version 1 data, in which every association
+        embeds the full principal and resource dict. The embedded copies
+        are resolved to shared instances by a :class:`Registry`.
+        """
+        pb = self
+        registry = Registry(skip_validation=_skip_validation)
+        # each object is visited exactly once, and the LF tag is linked to
+        # the playbook right after it is created
         for id_, resource_dct in data.get("resources", dict()).items():
-            pb.resources[id_] = deserialize_resource(resource_dct)
-            for res in pb.resources.values():
-                if res.object_type == LfTag.object_type:
-                    res.pb = pb
+            res = registry.resource(resource_dct)
+            if res.object_type == LfTag.object_type:
+                res.pb = pb
+            pb._put_resource(res)
 
         for id_, dl_permission_dct in data.get("datalake_permissions", dict()).items():
-            pb.datalake_permissions[id_] = DataLakePermission.deserialize(dl_permission_dct)
-            for dl_permission in pb.datalake_permissions.values():
-                res = dl_permission.resource
-                if res.object_type == LfTag.object_type:
-                    res.pb = pb
+            dl_permission = DataLakePermission.deserialize(dl_permission_dct, registry=registry)
+            if dl_permission.resource.object_type == LfTag.object_type:
+                dl_permission.resource.pb = pb
+            pb._put_dl_permission(dl_permission)
 
         for id_, lf_tag_attachment_dct in data.get("lf_tag_attachments", dict()).items():
-            pb.lf_tag_attachments[id_] = LfTagAttachment.deserialize(lf_tag_attachment_dct)
-            for lf_tag_attachment in pb.lf_tag_attachments.values():
-                lf_tag_attachment.tag.pb = pb
-
-        return pb
+            lf_tag_attachment = LfTagAttachment.deserialize(lf_tag_attachment_dct, registry=registry)
+            lf_tag_attachment.tag.pb = pb
+            pb._put_lf_tag_attachment(lf_tag_attachment)
 
     def _add(
         self,
@@ -198,28 +389,104 @@ class Playbook:
         else:
             collection[obj.id] = obj
 
+    def _put_resource(self, resource: Resource):
+        """
+        Put resource into collection, the type partitioned collections and
+        the tag key -> values index, without validation.
+        """
+        self.resources[resource.id] = resource
+        object_type = resource.object_type
+        if object_type == LfTag.object_type:
+            self._tags[resource.id] = resource
+            try:
+                self._tag_mapper[resource.key].add(resource.value)
+            except KeyError:
+                self._tag_mapper[resource.key] = OrderedSet([resource.value, ])
+        elif object_type == DataLakeLocation.object_type:
+            self._dl_locations[resource.id] = resource
+        elif object_type == DataCellsFilter.object_type:
+            self._data_filters[resource.id] = resource
+
+    def _add_resource(
+        self,
+        resource: Resource,
+        type_: Type[Resource],
+    ):
+        if not isinstance(resource, type_):  # pragma: no cover
+            raise TypeError
+        if resource.id in self.resources:  # pragma: no cover
+            raise ValueError(f"{resource!r} already exists in this playbook!")
+        self._put_resource(resource)
+
     def add_external_account(self, external_account: ExternalAccount):
         self._add(external_account, self.principals, ExternalAccount)
 
     def add_tag(self, lf_tag: LfTag):
-        self._add(lf_tag, self.resources, LfTag)
+        self._add_resource(lf_tag, LfTag)
         lf_tag.pb = self
 
     def add_dl_location(self, dl_loc: DataLakeLocation):
-        self._add(dl_loc, self.resources, DataLakeLocation)
+        self._add_resource(dl_loc, DataLakeLocation)
         dl_loc.pb = self
 
     def add_data_filter(self, data_filter: DataCellsFilter):
-        self._add(data_filter, self.resources, DataCellsFilter)
+        self._add_resource(data_filter, DataCellsFilter)
         data_filter.pb = self
 
+    def _put_dl_permission(self, dl_permission: DataLakePermission):
+        """
+        Put data lake permission into collection and partition index,
+        without validation.
+        """
+        self.datalake_permissions[dl_permission.id] = dl_permission
+        self.dl_permission_partitions.add(dl_permission.partition_key, dl_permission.id)
+        self.dl_permission_masks.add(dl_permission)
+
+    def _put_dl_permission_pair(
+        self,
+        dl_permissions: List[DataLakePermission],
+        mask: int,
+    ):
+        """
+        Put the data lake permissions of the same (principal, resource) pair
+        into collection and indexes at once, without validation. ``mask`` is
+        the mask of their permissions, ``dl_permissions`` is not empty.
+        """
+        datalake_permissions = self.datalake_permissions
+        permit_ids = list()
+        for dl_permission in dl_permissions:
+            datalake_permissions[dl_permission.id] = dl_permission
+            permit_ids.append(dl_permission.id)
+        dl_permission = dl_permissions[0]
+        self.dl_permission_partitions.add_many(dl_permission.partition_key, permit_ids)
+        self.dl_permission_masks.add_mask(dl_permission.principal, dl_permission.resource, mask)
+
+    def _put_lf_tag_attachment(self, lf_tag_attachment: LfTagAttachment):
+        """
+        Put LF tag attachment into collection and partition index,
+        without validation.
+        """
+        self.lf_tag_attachments[lf_tag_attachment.id] = lf_tag_attachment
+        self.lf_tag_attachment_partitions.add(lf_tag_attachment.partition_key, lf_tag_attachment.id)
+
     def add_dl_permission(self, dl_permission: DataLakePermission):
         self._add(dl_permission, self.datalake_permissions, DataLakePermission)
+        self.dl_permission_partitions.add(dl_permission.partition_key, dl_permission.id)
+        self.dl_permission_masks.add(dl_permission)
         if dl_permission.resource.object_type == LfTag.object_type:
             dl_permission.resource.pb = self
 
+    def remove_dl_permission(self, dl_permission: DataLakePermission):
+        """
+        Remove data lake permission from collection and indexes.
+        """
+        del self.datalake_permissions[dl_permission.id]
+        self.dl_permission_partitions.remove(dl_permission.partition_key, dl_permission.id)
+        self.dl_permission_masks.remove(dl_permission)
+
     def add_lf_tag_attachment(self, lf_tag_attachment: LfTagAttachment):
         self._add(lf_tag_attachment, self.lf_tag_attachments, LfTagAttachment)
+        self.lf_tag_attachment_partitions.add(lf_tag_attachment.partition_key, lf_tag_attachment.id)
         lf_tag_attachment.tag.pb = self
 
     def grant(
@@ -247,65 +514,403 @@ class Playbook:
         )
         self.add_lf_tag_attachment(lf_tag_attachment)
 
+    def grant_many(
+        self,
+        principals: Iterable[Principal],
+        resources: Iterable[Resource],
+        permissions: Iterable[Permission],
+    ):
+        """
+        Bulk version of :meth:`Playbook.grant`, grant every permission on
+        every resource to every principal (the cartesian product).
+
+        The type of each principal, resource and permission is validated
+        once per input collection, instead of once per data lake permission.
+        All ids are checked before anything is added, if any of them already
+        exists in this playbook or is repeated in the inputs, ``ValueError``
+        is raised and this playbook is not changed. If any input is empty,
+        nothing is granted.
+        """
+        principals = validate_items_type(self, "principals", principals, Principal)
+        resources = validate_items_type(self, "resources", resources, Resource)
+        permissions = validate_items_type(self, "permissions", permissions, Permission)
+        mask = to_mask(permissions)
+        if (len(principals) == 0) or (len(resources) == 0) or (mask == 0):
+            return
+        datalake_permissions = self.datalake_permissions
+
+        # principal -> list of (resource, permit ids of this pair)
+        principal_pair_list: List[Tuple[Principal, List[Tuple[Resource, List[str]]]]] = list()
+        new_permit_ids = set()
+        for principal in principals:
+            # same as DataLakePermission.id, the prefix is computed once
+            principal_prefix = principal.id + DELIMITER
+            pair_list = list()
+            for resource in resources:
+                pair_prefix = principal_prefix + resource.id + DELIMITER
+                permit_ids = [pair_prefix + permission.id for permission in permissions]
+                for permit_id in permit_ids:
+                    if (permit_id in datalake_permissions) or (permit_id in new_permit_ids):
+                        raise ValueError(f"{permit_id!r} already exists in this playbook!")
+                    new_permit_ids.add(permit_id)
+                pair_list.append((resource, permit_ids))
+            principal_pair_list.append((principal, pair_list))
+
+        for principal, pair_list in principal_pair_list:
+            for resource, permit_ids in pair_list:
+                dl_permissions = list()
+                for permission, permit_id in zip(permissions, permit_ids):
+                    dl_permission = DataLakePermission(
+                        principal=principal,
+                        resource=resource,
+                        permission=permission,
+                        _skip_validation=True,
+                    )
+                    dl_permission._id = permit_id
+                    dl_permissions.append(dl_permission)
+                self._put_dl_permission_pair(dl_permissions, mask)
+        for resource in resources:
+            if resource.object_type == LfTag.object_type:
+                resource.pb = self
+
+    def attach_many(
+        self,
+        resources: Iterable[NonLfTagResource],
+        tags: Iterable[LfTag],
+    ):
+        """
+        Bulk version of :meth:`Playbook.attach`, attach every tag to every
+        resource (the cartesian product).
+
+        The type of each resource and tag is validated once per input
+        collection, instead of once per LF tag attachment. Same as
+        :meth:`Playbook.grant_many`, this playbook is not changed if any
+        attachment already exists or is repeated in the inputs.
+        """
+        resources = validate_items_type(self, "resources", resources, NonLfTagResource)
+        tags = validate_items_type(self, "tags", tags, LfTag)
+        lf_tag_attachment_mapper: Dict[str, LfTagAttachment] = dict()
+        for resource in resources:
+            for tag in tags:
+                lf_tag_attachment = LfTagAttachment(
+                    resource=resource,
+                    tag=tag,
+                    _skip_validation=True,
+                )
+                if (
+                    (lf_tag_attachment.id in self.lf_tag_attachments)
+                    or (lf_tag_attachment.id in lf_tag_attachment_mapper)
+                ):
+                    raise ValueError(f"{lf_tag_attachment!r} already exists in this playbook!")
+                lf_tag_attachment_mapper[lf_tag_attachment.id] = lf_tag_attachment
+        for lf_tag_attachment in lf_tag_attachment_mapper.values():
+            self._put_lf_tag_attachment(lf_tag_attachment)
+        for tag in tags:
+            tag.pb = self
+
+    def get_implied_permissions(self) -> List[DataLakePermission]:
+        """
+        Find the data lake permissions that are implied by other permissions
+        on the same (principal, resource) pair, for example ``Select`` is
+        implied by ``SuperTable``. See
+        :func:`~lakeformation.pb.mask.get_implied_mask`.
+
+        This playbook is not changed. :meth:`Playbook.apply_dl_permission`
+        doesn't grant them, and doesn't revoke the deployed ones that are
+        still implied by the new permissions.
+
+        :return: the implied :class:`DataLakePermission`.
+        """
+        implied_list = list()
+        for by_resource in self.dl_permission_masks.pairs.values():
+            for principal, resource, mask in by_resource.values():
+                for permission in from_mask(get_implied_mask(mask)):
+                    permit_id = DELIMITER.join([principal.id, resource.id, permission.id])
+                    implied_list.append(self.datalake_permissions[permit_id])
+        return implied_list
+
     def load_deployed_playbook(self):
         """
         Load deployed LakeFormation object from the
-        :attr:`Playbook.deployed_pb_json` file.
-
-        If it is not exists, then initiate an empty :class:`Playbook` and
-        serialize it to :attr:`Playbook.deployed_pb_json`` file
+        :attr:`Playbook.deployed_pb_file` file. If it is not exists but a
+        file written by another codec exists, for example the legacy
+        :attr:`Playbook.deployed_pb_json` file, load that one. It is
+        removed the next time :meth:`Playbook.write_deployed_playbook`
+        succeeds.
+
+        If neither exists, then initiate an empty :class:`Playbook` and
+        serialize it to :attr:`Playbook.deployed_pb_file` file
         """
-        if self.deployed_pb_json.exists():
-            self.deployed_pb = Playbook.deserialize(
-                json.loads(self.deployed_pb_json.read_text())
-            )
-        else:
-            self.deployed_pb = Playbook(_skip_validation=True)
-            self.deployed_pb_json.write_text(
-                json.dumps(self.deployed_pb.serialize(), indent=4)
-            )
+        for path in [self.deployed_pb_file, ] + self._get_other_deployed_pb_files():
+            if path.exists():
+                codec = get_codec_by_path(path)
+                self.deployed_pb = Playbook.deserialize(
+                    codec.loads(path.read_bytes()),
+                    _skip_validation=True,
+                )
+                return
+
+        self.deployed_pb = Playbook(_skip_validation=True)
+        self.write_deployed_playbook(self.deployed_pb)
 
     @property
     def tags(self) -> Dict[str, 'LfTag']:
-        return {
-            res: res
-            for res_id, res in self.resources.items()
-            if res.object_type == LfTag.object_type
-        }
+        """
+        All LF tags in this playbook, tag id -> tag.
+        """
+        return self._tags
+
+    @property
+    def dl_locations(self) -> Dict[str, 'DataLakeLocation']:
+        """
+        All data lake locations in this playbook, location id -> location.
+        """
+        return self._dl_locations
+
+    @property
+    def data_filters(self) -> Dict[str, 'DataCellsFilter']:
+        """
+        All data cells filters in this playbook, filter id -> filter.
+        """
+        return self._data_filters
 
     @property
     def tag_mapper(self) -> Dict[str, OrderedSet]:
         """
         Aggregate tag by key, and put values for the same key into a set.
+        It is maintained incrementally when tag is added, don't modify it.
         """
-        mapper = dict()
-        for tag_id, tag in self.tags.items():
-            try:
-                mapper[tag.key].add(tag.value)
-            except KeyError:
-                mapper[tag.key] = OrderedSet([tag.value, ])
-        return mapper
+        return self._tag_mapper
+
+    @property
+    def deployed_pb_fingerprint_file(self) -> Path:
+        """
+        Return the path of the fingerprint file of the deployed playbook.
+        It is stored next to the :attr:`Playbook.deployed_pb_file`.
+        """
+        return Path(
+            self.workspace_dir,
+            f"deployed-{self.account_id}-{self.region}.fingerprint",
+        )
+
+    def get_fingerprint(self) -> str:
+        """
+        Compute a stable content fingerprint of this playbook. It does not
+        depend on the insertion order of the objects. Two playbooks
+        have the same fingerprint if and only if they manage the same
+        LakeFormation objects.
+        """
+        m = hashlib.sha256()
+        m.update(f"{self.account_id}{DELIMITER}{self.region}\n".encode("utf-8"))
+        for mapper in [self.principals, self.resources]:
+            for id_ in sorted(mapper):
+                m.update(json.dumps(mapper[id_].serialize(), sort_keys=True).encode("utf-8"))
+                m.update(b"\n")
+        # reuse the cached partition digests instead of hashing all ids
+        for partitions in [self.dl_permission_partitions, self.lf_tag_attachment_partitions]:
+            m.update(b"\n")
+            for key, digest in sorted(partitions.digests().items()):
+                m.update(f"{key}{DELIMITER}{digest}\n".encode("utf-8"))
+        return m.hexdigest()
 
     def apply(
         self,
         verbose=True,
         dry_run=False,
+        force=False,
     ):  # pragma: no cover
         """
 
         :param verbose:
         :param dry_run:
+        :param force: by default, if the fingerprint of this playbook is the
+            same as the one stored in
+            :attr:`Playbook.deployed_pb_fingerprint_file`,
+            nothing changed since the last successful apply, then it returns
+            immediately. If True, always diff and apply.
         :return:
         **
         """
+        fingerprint = self.get_fingerprint()
+        if (
+            (force is False)
+            and self.deployed_pb_file.exists()
+            and self.deployed_pb_fingerprint_file.exists()
+            and self.deployed_pb_fingerprint_file.read_text() == fingerprint
+        ):
+            if verbose:
+                msg = f"{Fore.CYAN}[Info] {Style.RESET_ALL}No change, fingerprint {fingerprint}"
+                logger.show(msg)
+            return
+
         self.load_deployed_playbook()
         self.apply_tags(verbose=verbose, dry_run=dry_run)
-        self.apply_tag_attachment(verbose=verbose, dry_run=dry_run)
-        self.apply_dl_permission(verbose=verbose, dry_run=dry_run)
+        (
+            failed_add_attach_ids,
+            failed_remove_attach_ids,
+        ) = self.apply_tag_attachment(verbose=verbose, dry_run=dry_run)
+        kept_permit_ids = OrderedSet()
+        (
+            failed_grant_permit_ids,
+            failed_revoke_permit_ids,
+        ) = self.apply_dl_permission(
+            verbose=verbose,
+            dry_run=dry_run,
+            kept_permit_ids=kept_permit_ids,
+        )
 
-        # pb = self.from
         if dry_run is False:
-            self.deployed_pb_json.write_text(json.dumps(self.serialize(), indent=4))
+            applied_pb = self.get_applied_playbook(
+                failed_grant_permit_ids=failed_grant_permit_ids,
+                failed_revoke_permit_ids=failed_revoke_permit_ids,
+                failed_add_attach_ids=failed_add_attach_ids,
+                failed_remove_attach_ids=failed_remove_attach_ids,
+            )
+            self.write_deployed_playbook(applied_pb)
+            # only store the fingerprint when everything is applied,
+            # otherwise the next run should retry the failed ones
+            if (
+                len((failed_grant_permit_ids | failed_revoke_permit_ids) - kept_permit_ids)
+                + len(failed_add_attach_ids)
+                + len(failed_remove_attach_ids)
+            ):
+                self.deployed_pb_fingerprint_file.unlink(missing_ok=True)
+            else:
+                self.deployed_pb_fingerprint_file.write_text(fingerprint)
+
+    def get_applied_playbook(
+        self,
+        failed_grant_permit_ids: Iterable[str] = tuple(),
+        failed_revoke_permit_ids: Iterable[str] = tuple(),
+        failed_add_attach_ids: Iterable[str] = tuple(),
+        failed_remove_attach_ids: Iterable[str] = tuple(),
+    ) -> 'Playbook':
+        """
+        Create a new :class:`Playbook` that reflects what is actually deployed
+        after :meth:`Playbook.apply`. It is this playbook, except that
+        the failed to grant permissions and failed to attach LF tags are
+        excluded, and the failed to revoke permissions and failed to detach
+        LF tags are kept from the :attr:`Playbook.deployed_pb`.
+
+        ``failed_revoke_permit_ids`` from :meth:`Playbook.apply_dl_permission`
+        also has the ``X`` of the in place ``X`` -> ``XGrantable`` upgrades
+        and the deployed permissions still implied by the new ones, they are
+        not revoked and kept the same way. ``failed_grant_permit_ids`` also
+        has the implied permissions that are not granted.
+        """
+        pb = Playbook(_skip_validation=True)
+        pb.account_id = self.account_id
+        pb.region = self.region
+        pb.playbook_id = self.playbook_id
+        pb.principals = dict(self.principals)
+        for resource in self.resources.values():
+            pb._put_resource(resource)
+        failed_add_attach_ids = set(failed_add_attach_ids)
+        for attach_id, lf_tag_attachment in self.lf_tag_attachments.items():
+            if attach_id not in failed_add_attach_ids:
+                pb._put_lf_tag_attachment(lf_tag_attachment)
+        for attach_id in failed_remove_attach_ids:
+            pb._put_lf_tag_attachment(self.deployed_pb.lf_tag_attachments[attach_id])
+        failed_grant_permit_ids = set(failed_grant_permit_ids)
+        failed_revoke_permit_ids = OrderedSet(failed_revoke_permit_ids)
+        for permit_id, dl_permission in self.datalake_permissions.items():
+            if permit_id not in failed_grant_permit_ids:
+                pb._put_dl_permission(dl_permission)
+        for permit_id in failed_revoke_permit_ids:
+            pb._put_dl_permission(self.deployed_pb.datalake_permissions[permit_id])
+
+        # record the LF tag policy grants, a grant is applied if none of
+        # its permissions failed
+        if self.deployed_pb is None:
+            pb.lf_tag_policy_grants = get_lf_tag_policy_grants(
+                self.dl_permission_masks,
+                list(self.dl_permission_masks.pairs),
+            )
+        else:
+            to_grant_list, to_revoke_list = self._get_lf_tag_policy_grant_diff(
+                get_changed_partition_keys(
+                    self.dl_permission_partitions,
+                    self.deployed_pb.dl_permission_partitions,
+                )
+            )
+            lf_tag_policy_grants = {
+                principal_id: dict(grants)
+                for principal_id, grants in self.deployed_pb._get_recorded_lf_tag_policy_grants().items()
+            }
+            for grant in to_revoke_list:
+                if not any([
+                    permit_id in failed_revoke_permit_ids
+                    for permit_id in grant.permit_ids
+                ]):
+                    grants = lf_tag_policy_grants[grant.principal.id]
+                    del grants[grant.id]
+                    if len(grants) == 0:
+                        del lf_tag_policy_grants[grant.principal.id]
+            for grant in to_grant_list:
+                if not any([
+                    permit_id in failed_grant_permit_ids
+                    for permit_id in grant.permit_ids
+                ]):
+                    lf_tag_policy_grants.setdefault(grant.principal.id, dict())[grant.id] = grant
+            pb.lf_tag_policy_grants = lf_tag_policy_grants
+        return pb
+
+    def _create_lf_tag(self, kwargs: dict):
+        """
+        Create a tag key. If it has more than :data:`LF_TAG_VALUES_LIMIT`
+        values, the rest of them are added by ``update_lf_tag`` in chunks.
+        """
+        chunks = list(grouper_list(kwargs["TagValues"], LF_TAG_VALUES_LIMIT))
+        self.caller.call(
+            self.lf_client.create_lf_tag,
+            CatalogId=kwargs["CatalogId"],
+            TagKey=kwargs["TagKey"],
+            TagValues=chunks[0],
+        )
+        for chunk in chunks[1:]:
+            self.caller.call(
+                self.lf_client.update_lf_tag,
+                CatalogId=kwargs["CatalogId"],
+                TagKey=kwargs["TagKey"],
+                TagValuesToAdd=chunk,
+            )
+
+    def _update_lf_tag(self, kwargs: dict):
+        """
+        Update the values of a tag key, ``TagValuesToAdd`` and
+        ``TagValuesToDelete`` are split into chunks of
+        :data:`LF_TAG_VALUES_LIMIT`, the chunks are sent one by one.
+        """
+        for chunk_to_add, chunk_to_delete in itertools.zip_longest(
+            grouper_list(kwargs.get("TagValuesToAdd", list()), LF_TAG_VALUES_LIMIT),
+            grouper_list(kwargs.get("TagValuesToDelete", list()), LF_TAG_VALUES_LIMIT),
+        ):
+            chunk_kwargs = dict(
+                CatalogId=kwargs["CatalogId"],
+                TagKey=kwargs["TagKey"],
+            )
+            if chunk_to_add:
+                chunk_kwargs["TagValuesToAdd"] = chunk_to_add
+            if chunk_to_delete:
+                chunk_kwargs["TagValuesToDelete"] = chunk_to_delete
+            self.caller.call(self.lf_client.update_lf_tag, **chunk_kwargs)
+
+    def _delete_lf_tag(self, kwargs: dict):
+        self.caller.call(self.lf_client.delete_lf_tag, **kwargs)
+
+    def _tag_call(
+        self,
+        func: Callable,
+        kwargs_list: List[dict],
+    ):
+        """
+        Apply ``func`` on the kwargs of each tag key with at most
+        :attr:`Playbook.max_workers` keys in flight. Tag keys are independent,
+        the calls of the same key are sent in order by the same worker.
+        Returns when all of them are finished.
+        """
+        for _ in imap_concurrently(func, kwargs_list, max_workers=self.max_workers):
+            pass
 
     def apply_tags(
         self,
@@ -313,6 +918,11 @@ class Playbook:
         dry_run=False,
     ):  # pragma: no cover
         """
+        Create, update and delete LF tags in three phases. In each phase the
+        tag keys are sent concurrently with :attr:`Playbook.max_workers`,
+        a phase finishes before the next one starts, so all tags are ready
+        before :meth:`Playbook.apply_tag_attachment`.
+
         Ref:
 
         - Create: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/lakeformation.html#LakeFormation.Client.create_lf_tag
@@ -378,8 +988,9 @@ class Playbook:
             msg = f"- values: {kwargs['TagValues']!r}"
             logger.show(msg, indent=1)
 
-            if dry_run is False:
-                self.lf_client.create_lf_tag(**kwargs)
+
+        if dry_run is False:
+            self._tag_call(self._create_lf_tag, to_create_tag_kwargs)
 
         if len(to_update_tag_kwargs):
             msg = f"{Fore.CYAN}[Info] {Style.RESET_ALL}Update tags ..."
@@ -397,8 +1008,9 @@ class Playbook:
                 msg = f"{Fore.RED}- values to delete{Fore.RESET}: {kwargs['TagValuesToDelete']!r}"
                 logger.show(msg, indent=1)
 
-            if dry_run is False:
-                self.lf_client.update_lf_tag(**kwargs)
+
+        if dry_run is False:
+            self._tag_call(self._update_lf_tag, to_update_tag_kwargs)
 
         if len(to_delete_tag_kwargs):
             msg = f"{Fore.CYAN}[Info] {Style.RESET_ALL}Delete tags ..."
@@ -407,17 +1019,192 @@ class Playbook:
         for kwargs in to_delete_tag_kwargs:
             msg = f"{Fore.RED}- [Delete Tag] {Style.RESET_ALL}{kwargs['TagKey']!r}"
             logger.show(msg)
-            if dry_run is False:
-                self.lf_client.delete_lf_tag(**kwargs)
+
+        if dry_run is False:
+            self._tag_call(self._delete_lf_tag, to_delete_tag_kwargs)
 
         logger.enable_verbose = True
 
+    def _get_tag_attachment_kwargs_list(
+        self,
+        attach_list: Iterable[LfTagAttachment],
+    ) -> List[dict]:
+        """
+        Coalesce LF tag attachments into the arguments of
+        ``add_lf_tags_to_resource`` / ``remove_lf_tags_from_resource``.
+
+        Attachments are grouped by resource, then by tag key, so each
+        resource needs only one call. Columns of the same table that have
+        exactly the same tags are further merged into one
+        ``TableWithColumns`` call with many ``ColumnNames``.
+
+        Each kwargs has an extra ``_attachments`` field, the list of
+        :class:`LfTagAttachment` covered by this call, it has to be
+        popped before sending.
+        """
+        # resource id -> (resource, tag key -> list of attachment)
+        by_resource: Dict[str, Tuple[Resource, Dict[str, List[LfTagAttachment]]]] = dict()
+        for attach in attach_list:
+            try:
+                by_tag_key = by_resource[attach.resource.id][1]
+            except KeyError:
+                by_tag_key = dict()
+                by_resource[attach.resource.id] = (attach.resource, by_tag_key)
+            by_tag_key.setdefault(attach.tag.key, list()).append(attach)
+
+        kwargs_list: List[dict] = list()
+        # (table id, tags) -> kwargs of the merged TableWithColumns call
+        column_kwargs_mapper: Dict[Tuple[str, tuple], dict] = dict()
+        for resource, by_tag_key in by_resource.values():
+            attachments = [
+                attach
+                for tag_attach_list in by_tag_key.values()
+                for attach in tag_attach_list
+            ]
+            lf_tags = self._get_lf_tags(attachments)
+            if resource.object_type == Column.object_type:
+                key = (
+                    resource.table.id,
+                    tuple(sorted(
+                        (lf_tag["TagKey"], tuple(lf_tag["TagValues"]))
+                        for lf_tag in lf_tags
+                    )),
+                )
+                if key in column_kwargs_mapper:
+                    kwargs = column_kwargs_mapper[key]
+                    kwargs["Resource"]["TableWithColumns"]["ColumnNames"].append(resource.name)
+                    kwargs["_attachments"].extend(attachments)
+                    continue
+            else:
+                key = None
+
+            kwargs = dict(
+                CatalogId=self.account_id,
+                Resource={
+                    resource.get_add_remove_lf_tags_arg_name: \
+                        resource.get_add_remove_lf_tags_arg_value
+                },
+                LFTags=lf_tags,
+                _attachments=attachments,
+            )
+            if key is not None:
+                column_kwargs_mapper[key] = kwargs
+            kwargs_list.append(kwargs)
+        return kwargs_list
+
+    def _get_lf_tags(self, attachments: Iterable[LfTagAttachment]) -> List[dict]:
+        """
+        Group the tag of attachments by tag key, into the ``LFTags`` argument.
+        """
+        by_tag_key: Dict[str, List[str]] = dict()
+        for attach in attachments:
+            by_tag_key.setdefault(attach.tag.key, list()).append(attach.tag.value)
+        return [
+            dict(
+                CatalogId=self.account_id,
+                TagKey=tag_key,
+                TagValues=tag_values,
+            )
+            for tag_key, tag_values in by_tag_key.items()
+        ]
+
+    @staticmethod
+    def _format_lf_tags(lf_tags: List[dict]) -> str:
+        return "{{{}}}".format(", ".join([
+            f"{lf_tag['TagKey']!r}: {', '.join(lf_tag['TagValues'])}"
+            for lf_tag in lf_tags
+        ]))
+
+    def _tag_attachment_call(
+        self,
+        method: Callable,
+        kwargs_list: List[dict],
+    ) -> List[dict]:
+        """
+        Send the coalesced ``add_lf_tags_to_resource`` /
+        ``remove_lf_tags_from_resource`` calls with at most
+        :attr:`Playbook.max_workers` requests in flight.
+        Returns the list of responses in the same order.
+        """
+
+        def send(kwargs: dict) -> dict:
+            kwargs = dict(kwargs)
+            kwargs.pop("_attachments")
+            return self.caller.call(method, **kwargs)
+
+        return list(imap_concurrently(
+            send,
+            kwargs_list,
+            max_workers=self.max_workers,
+        ))
+
+    def _tag_attachment_call_with_retry(
+        self,
+        method: Callable,
+        kwargs_list: List[dict],
+    ) -> OrderedSet:
+        """
+        Send the coalesced calls by :meth:`Playbook._tag_attachment_call`.
+        The API reports per tag ``Failures`` in the response, each failure is
+        mapped back to the :class:`LfTagAttachment` of this call that has the
+        failed tag key and value. Only the failed attachments are retried
+        with backoff, up to :attr:`Playbook.max_retries` times.
+
+        Returns the set of :class:`LfTagAttachment` id that still fail
+        after retry.
+        """
+        pending_kwargs_list = kwargs_list
+        failures: Dict[str, dict] = dict()
+        failed_attachments: Dict[str, LfTagAttachment] = dict()
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.caller.get_backoff_delay(attempt - 1))
+            failures = dict()
+            failed_attachments = dict()
+            retry_kwargs_list = list()
+            for kwargs, response in zip(
+                pending_kwargs_list,
+                self._tag_attachment_call(method, pending_kwargs_list),
+            ):
+                failed_attachments_of_this_call: Dict[str, LfTagAttachment] = dict()
+                for failure in response.get("Failures", list()):
+                    lf_tag = failure.get("LFTag", dict())
+                    tag_values = set(lf_tag.get("TagValues", list()))
+                    for attach in kwargs["_attachments"]:
+                        if (attach.tag.key == lf_tag.get("TagKey")) and (attach.tag.value in tag_values):
+                            failures[attach.id] = failure.get("Error", dict())
+                            failed_attachments_of_this_call[attach.id] = attach
+                if len(failed_attachments_of_this_call):
+                    failed_attachments.update(failed_attachments_of_this_call)
+                    retry_kwargs_list.append(dict(
+                        CatalogId=kwargs["CatalogId"],
+                        Resource=kwargs["Resource"],
+                        LFTags=self._get_lf_tags(failed_attachments_of_this_call.values()),
+                        _attachments=list(failed_attachments_of_this_call.values()),
+                    ))
+            pending_kwargs_list = retry_kwargs_list
+            if len(pending_kwargs_list) == 0:
+                break
+
+        for attach_id, attach in failed_attachments.items():
+            error = failures[attach_id]
+            msg = (
+                f"{Fore.RED}x [Failed] {Style.RESET_ALL}"
+                f"{{{attach.tag.key!r}: {attach.tag.value}}} {attach.resource.id} "
+                f"{error.get('ErrorCode')}: {error.get('ErrorMessage')}"
+            )
+            logger.show(msg)
+        return OrderedSet(failed_attachments)
+
     def apply_tag_attachment(
         self,
         verbose=True,
         dry_run=False,
-    ):  # pragma: no cover
+    ) -> Tuple[OrderedSet, OrderedSet]:  # pragma: no cover
         """
+        :return: the set of :class:`LfTagAttachment` id failed to attach, and
+            the set of :class:`LfTagAttachment` id failed to detach.
+
         Ref:
 
         - Add: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/lakeformation.html#LakeFormation.Client.add_lf_tags_to_resource
@@ -432,130 +1219,215 @@ class Playbook:
         (
             to_add_attach_id_set,
             to_remove_attach_id_set,
-            _,
-        ) = get_diff_and_inter(new_attach_mapper, deployed_attach_mapper)
-
-        to_add_kwargs_list: List[dict] = list()
-        to_remove_kwargs_list: List[dict] = list()
-
-        for attach_id in to_add_attach_id_set:
-            attach = new_attach_mapper[attach_id]
-            kwargs = dict(
-                CatalogId=self.account_id,
-                LFTags=[
-                    dict(
-                        CatalogId=self.account_id,
-                        TagKey=attach.tag.key,
-                        TagValues=[attach.tag.value, ],
-                    )
-                ]
-            )
-            kwargs["Resource"] = {
-                attach.resource.get_add_remove_lf_tags_arg_name: \
-                    attach.resource.get_add_remove_lf_tags_arg_value
-            }
-            to_add_kwargs_list.append(kwargs)
+        ) = get_partitioned_diff(
+            self.lf_tag_attachment_partitions,
+            self.deployed_pb.lf_tag_attachment_partitions,
+        )
 
-        for attach_id in to_remove_attach_id_set:
-            attach = deployed_attach_mapper[attach_id]
-            kwargs = dict(
-                CatalogId=self.account_id,
-                LFTags=[
-                    dict(
-                        CatalogId=self.account_id,
-                        TagKey=attach.tag.key,
-                        TagValues=[attach.tag.value, ],
-                    )
-                ]
-            )
-            kwargs["Resource"] = {
-                attach.resource.get_add_remove_lf_tags_arg_name: \
-                    attach.resource.get_add_remove_lf_tags_arg_value
-            }
-            to_remove_kwargs_list.append(kwargs)
+        to_add_kwargs_list = self._get_tag_attachment_kwargs_list([
+            new_attach_mapper[attach_id]
+            for attach_id in to_add_attach_id_set
+        ])
+        to_remove_kwargs_list = self._get_tag_attachment_kwargs_list([
+            deployed_attach_mapper[attach_id]
+            for attach_id in to_remove_attach_id_set
+        ])
 
         if len(to_add_kwargs_list):
             msg = f"{Fore.CYAN}[Info] {Style.RESET_ALL}Attach tags ..."
             logger.show(msg)
 
         for kwargs in to_add_kwargs_list:
-            msg = f"{Fore.GREEN}+ [Attach Tag] {Style.RESET_ALL}{{{kwargs['LFTags'][0]['TagKey']!r}: {kwargs['LFTags'][0]['TagValues'][0]}}} to {kwargs['Resource']}"
+            msg = f"{Fore.GREEN}+ [Attach Tag] {Style.RESET_ALL}{self._format_lf_tags(kwargs['LFTags'])} to {kwargs['Resource']}"
             logger.show(msg)
 
-            if dry_run is False:
-                self.lf_client.add_lf_tags_to_resource(**kwargs)
+        failed_add_attach_ids = OrderedSet()
+        if dry_run is False:
+            failed_add_attach_ids = self._tag_attachment_call_with_retry(
+                self.lf_client.add_lf_tags_to_resource,
+                to_add_kwargs_list,
+            )
 
         if len(to_remove_kwargs_list):
             msg = f"{Fore.CYAN}[Info] {Style.RESET_ALL}Detach tags ..."
             logger.show(msg)
 
         for kwargs in to_remove_kwargs_list:
-            msg = f"{Fore.RED}- [Detach Tag] {Style.RESET_ALL}{{{kwargs['LFTags'][0]['TagKey']!r}: {kwargs['LFTags'][0]['TagValues'][0]}}} from {kwargs['Resource']}"
+            msg = f"{Fore.RED}- [Detach Tag] {Style.RESET_ALL}{self._format_lf_tags(kwargs['LFTags'])} from {kwargs['Resource']}"
             logger.show(msg)
 
-            if dry_run is False:
-                self.lf_client.remove_lf_tags_from_resource(**kwargs)
+        failed_remove_attach_ids = OrderedSet()
+        if dry_run is False:
+            failed_remove_attach_ids = self._tag_attachment_call_with_retry(
+                self.lf_client.remove_lf_tags_from_resource,
+                to_remove_kwargs_list,
+            )
 
         logger.enable_verbose = True
+        return failed_add_attach_ids, failed_remove_attach_ids
 
-    def apply_dl_permission(
+    def _batch_call(
         self,
-        verbose=True,
-        dry_run=False,
-    ):  # pragma: no cover
+        method: Callable,
+        entry_list: List[dict],
+    ) -> List[dict]:
         """
-
-        :param verbose:
-        :param dry_run:
-        :return:
+        Split entries into chunks of :attr:`Playbook.batch_size` and send them
+        to the batch API ``method`` with at most :attr:`Playbook.max_workers`
+        requests in flight. Returns the list of responses in chunk order.
         """
-        if not verbose:
-            logger.enable_verbose = False
 
-        new_permit_mapper = self.datalake_permissions
-        deployed_permit_mapper = self.deployed_pb.datalake_permissions
+        def send(entries: List[dict]) -> dict:
+            return self.caller.call(
+                method,
+                CatalogId=self.account_id,
+                Entries=entries,
+            )
 
-        (
-            to_grant_permit_id_set,
-            to_revoke_permit_id_set,
-            _,
-        ) = get_diff_and_inter(new_permit_mapper, deployed_permit_mapper)
+        return list(imap_concurrently(
+            send,
+            grouper_list(entry_list, self.batch_size),
+            max_workers=self.max_workers,
+        ))
 
-        # we use batch grant / revoke API
-        to_grant_entry_list: List[dict] = list()
-        to_revoke_entry_list: List[dict] = list()
+    def _batch_call_with_retry(
+        self,
+        method: Callable,
+        entry_list: List[dict],
+    ) -> OrderedSet:
+        """
+        Send entries to the batch API ``method`` by :meth:`Playbook._batch_call`.
+        The batch API reports per-entry ``Failures`` in the response,
+        only the failed entries are re-batched and retried with backoff,
+        up to :attr:`Playbook.max_retries` times.
 
-        # aggregate by principal and tag and resource type
-        to_grant_permit_by_principal_and_tag_and_resource_type: Dict[str, List[DataLakePermission]] = dict()
-        for permit_id in to_grant_permit_id_set:
-            permit = new_permit_mapper[permit_id]
-            key = f"{permit.principal.id}_{permit.resource.id}_{permit.permission.resource_type}"
+        Returns the set of ``Id`` of entries that still fail after retry.
+        """
+        pending_entry_list = entry_list
+        failures: Dict[str, dict] = dict()
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.caller.get_backoff_delay(attempt - 1))
+            failures = {
+                failure["RequestEntry"]["Id"]: failure.get("Error", dict())
+                for response in self._batch_call(method, pending_entry_list)
+                for failure in response.get("Failures", list())
+            }
+            pending_entry_list = [
+                entry
+                for entry in pending_entry_list
+                if entry["Id"] in failures
+            ]
+            if len(pending_entry_list) == 0:
+                break
+
+        for entry in pending_entry_list:
+            error = failures[entry["Id"]]
+            msg = (
+                f"{Fore.RED}x [Failed] {Style.RESET_ALL}"
+                f"{entry['Principal']['DataLakePrincipalIdentifier']} {entry['Resource']} "
+                f"{error.get('ErrorCode')}: {error.get('ErrorMessage')}"
+            )
+            logger.show(msg)
+        return OrderedSet([entry["Id"] for entry in pending_entry_list])
+
+    def _get_dl_permission_entry_list(
+        self,
+        principal: Principal,
+        resources: List[Resource],
+        mask: int,
+        dl_permission_mapper: Dict[str, DataLakePermission],
+        msg_prefix: str,
+        swap_mask: int = 0,
+        swap_msg: str = "",
+        table: Optional[Table] = None,
+    ) -> List[dict]:
+        """
+        Build the batch grant / revoke entries for the permissions in the
+        ``mask`` on (principal, resource) pairs, one entry per permission
+        resource type. ``dl_permission_mapper`` is the collection that has
+        these permissions.
+
+        If ``table`` is given, ``resources`` are the columns of this table,
+        they are merged into one ``TableWithColumns`` entry, see
+        :meth:`~lakeformation.resource.Table.batch_grant_remove_permission_columns_arg_value`.
+        Otherwise ``resources`` has only one resource.
+
+        ``swap_mask`` is the upgrade / downgrade mask from
+        :func:`~lakeformation.pb.mask.get_grant_option_change`, the
+        permissions that are not sent in the opposite direction because
+        this entry changes their grant option in place.
+
+        Each entry has three extra fields, they have to be popped before
+        sending:
+
+        - ``_msgs``: the log messages.
+        - ``_permit_ids``: the list of :class:`DataLakePermission` id
+          covered by this entry.
+        - ``_swap_permit_ids``: the list of :class:`DataLakePermission` id
+          in the ``swap_mask`` covered by this entry. If this entry fails,
+          they also fail in the opposite direction.
+        """
+        by_resource_type: Dict[str, List[Permission]] = dict()
+        for permission in from_mask(mask):
             try:
-                to_grant_permit_by_principal_and_tag_and_resource_type[key].append(permit)
+                by_resource_type[permission.resource_type].append(permission)
             except KeyError:
-                to_grant_permit_by_principal_and_tag_and_resource_type[key] = [permit, ]
-
-        for _, permit_list in to_grant_permit_by_principal_and_tag_and_resource_type.items():
-            permit = permit_list[0]
+                by_resource_type[permission.resource_type] = [permission, ]
+        swap_by_resource_type: Dict[str, List[Permission]] = dict()
+        for permission in from_mask(swap_mask):
+            try:
+                swap_by_resource_type[permission.resource_type].append(permission)
+            except KeyError:
+                swap_by_resource_type[permission.resource_type] = [permission, ]
+
+        entry_list = list()
+        for resource_type, permission_list in by_resource_type.items():
+            permit_ids = [
+                DELIMITER.join([principal.id, resource.id, permission.id])
+                for resource in resources
+                for permission in permission_list
+            ]
+            # only the ``X`` whose ``XGrantable`` is in this entry
+            grantable_names = {
+                permission.permission
+                for permission in permission_list
+                if permission.grantable is True
+            }
+            swap_permission_list = [
+                permission
+                for permission in swap_by_resource_type.get(resource_type, [])
+                if permission.permission in grantable_names
+            ]
+            if table is None:
+                resource = resources[0]
+                permit = dl_permission_mapper[permit_ids[0]]
+                resource_arg = {
+                    resource.batch_grant_remove_permission_arg_name: \
+                        resource.batch_grant_remove_permission_arg_value(permit)
+                }
+            else:
+                resource_arg = dict(
+                    TableWithColumns=table.batch_grant_remove_permission_columns_arg_value(
+                        [column.name for column in resources]
+                    )
+                )
             entry = dict(
                 Id=str(uuid.uuid4()),
                 Principal=dict(
-                    DataLakePrincipalIdentifier=permit.principal.id,
+                    DataLakePrincipalIdentifier=principal.id,
                 ),
-                Resource={
-                    permit.resource.batch_grant_remove_permission_arg_name: \
-                        permit.resource.batch_grant_remove_permission_arg_value(permit)
-                },
+                Resource=resource_arg,
             )
             permissions = [
-                pa.permission.permission
-                for pa in permit_list
-                if pa.permission.grantable is False
+                permission.permission
+                for permission in permission_list
+                if permission.grantable is False
             ]
             permissions_with_grant_option = [
-                pa.permission.permission
-                for pa in permit_list
-                if pa.permission.grantable is True
+                permission.permission
+                for permission in permission_list
+                if permission.grantable is True
             ]
             if len(permissions):
                 entry["Permissions"] = permissions
@@ -563,92 +1435,335 @@ class Playbook:
                 entry["PermissionsWithGrantOption"] = permissions_with_grant_option
 
             permissions_in_message = ", ".join([
-                pa.permission.id
-                for pa in permit_list
+                permission.id
+                for permission in permission_list
             ])
-            msgs = [
-                f"{Fore.GREEN}- [Grant Permission] {Style.RESET_ALL}{permit.principal.id} {permit.resource.id} {permissions_in_message}"
+            if len(swap_permission_list):
+                permissions_in_message += " ({} {})".format(
+                    swap_msg,
+                    ", ".join([permission.id for permission in swap_permission_list]),
+                )
+            entry["_msgs"] = [
+                f"{msg_prefix}{principal.id} {resource.id} {permissions_in_message}"
+                for resource in resources
             ]
-            entry["_msgs"] = msgs
-            to_grant_entry_list.append(entry)
-
-        # aggregate by principal and tag and resource type
-        to_revoke_permit_by_principal_and_tag_and_resource_type: Dict[str, List[DataLakePermission]] = dict()
-        for permit_id in to_revoke_permit_id_set:
-            permit = deployed_permit_mapper[permit_id]
-            key = f"{permit.principal.id}_{permit.resource.id}_{permit.permission.resource_type}"
-            try:
-                to_revoke_permit_by_principal_and_tag_and_resource_type[key].append(permit)
-            except KeyError:
-                to_revoke_permit_by_principal_and_tag_and_resource_type[key] = [permit, ]
+            entry["_permit_ids"] = permit_ids
+            entry["_swap_permit_ids"] = [
+                DELIMITER.join([principal.id, resource.id, permission.id])
+                for resource in resources
+                for permission in swap_permission_list
+            ]
+            entry_list.append(entry)
+        return entry_list
 
-        for _, permit_list in to_revoke_permit_by_principal_and_tag_and_resource_type.items():
-            permit = permit_list[0]
-            entry = dict(
-                Id=str(uuid.uuid4()),
-                Principal=dict(
-                    DataLakePrincipalIdentifier=permit.principal.id,
-                ),
-                Resource={
-                    permit.resource.batch_grant_remove_permission_arg_name: \
-                        permit.resource.batch_grant_remove_permission_arg_value(permit)
-                },
+    def _get_recorded_lf_tag_policy_grants(
+        self,
+        principal_ids: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Dict[str, LfTagPolicyGrant]]:
+        """
+        The LF tag policy grants recorded in this deployed playbook, of the
+        given principals, or all principals if not specified. If they are
+        not recorded, one grant per tag value is assumed.
+        """
+        if self.lf_tag_policy_grants is None:
+            if principal_ids is None:
+                principal_ids = list(self.dl_permission_masks.pairs)
+            return get_lf_tag_policy_grants(
+                self.dl_permission_masks, principal_ids, merge=False,
             )
-            permissions = [
-                pa.permission.permission
-                for pa in permit_list
-                if pa.permission.grantable is False
-            ]
-            permissions_with_grant_option = [
-                pa.permission.permission
-                for pa in permit_list
-                if pa.permission.grantable is True
-            ]
-            if len(permissions):
-                entry["Permissions"] = permissions
-            if len(permissions_with_grant_option):
-                entry["PermissionsWithGrantOption"] = permissions_with_grant_option
+        if principal_ids is None:
+            return self.lf_tag_policy_grants
+        return {
+            principal_id: self.lf_tag_policy_grants[principal_id]
+            for principal_id in principal_ids
+            if principal_id in self.lf_tag_policy_grants
+        }
 
-            permissions_in_message = ", ".join([
-                pa.permission.id
-                for pa in permit_list
-            ])
-            msgs = [
-                f"{Fore.RED}- [Revoke Permission] {Style.RESET_ALL}{permit.principal.id} {permit.resource.id} {permissions_in_message}"
-            ]
-            entry["_msgs"] = msgs
-            to_revoke_entry_list.append(entry)
+    def _get_lf_tag_policy_grant_diff(
+        self,
+        principal_ids: Iterable[str],
+    ) -> Tuple[List[LfTagPolicyGrant], List[LfTagPolicyGrant]]:
+        """
+        Compare the LF tag policy grants of the given principals with the
+        recorded ones in the :attr:`Playbook.deployed_pb`.
+
+        :return: the grants to grant and the grants to revoke.
+        """
+        principal_ids = list(principal_ids)
+        new_grants = get_lf_tag_policy_grants(self.dl_permission_masks, principal_ids)
+        old_grants = self.deployed_pb._get_recorded_lf_tag_policy_grants(principal_ids)
+        to_grant_list = list()
+        to_revoke_list = list()
+        for principal_id in principal_ids:
+            grants1 = new_grants.get(principal_id, dict())
+            grants2 = old_grants.get(principal_id, dict())
+            for grant_id, grant in grants1.items():
+                if grant_id not in grants2:
+                    to_grant_list.append(grant)
+            for grant_id, grant in grants2.items():
+                if grant_id not in grants1:
+                    to_revoke_list.append(grant)
+        return to_grant_list, to_revoke_list
+
+    def _get_lf_tag_policy_entry(
+        self,
+        grant: LfTagPolicyGrant,
+        msg_prefix: str,
+    ) -> dict:
+        """
+        Build the batch grant / revoke entry for a :class:`LfTagPolicyGrant`,
+        the extra fields are the same as
+        :meth:`Playbook._get_dl_permission_entry_list`.
+        """
+        entry = dict(
+            Id=str(uuid.uuid4()),
+            Principal=dict(
+                DataLakePrincipalIdentifier=grant.principal.id,
+            ),
+            Resource=dict(
+                LFTagPolicy=grant.batch_grant_remove_permission_arg_value(),
+            ),
+        )
+        permissions = [
+            permission.permission
+            for permission in grant.permissions
+            if permission.grantable is False
+        ]
+        permissions_with_grant_option = [
+            permission.permission
+            for permission in grant.permissions
+            if permission.grantable is True
+        ]
+        if len(permissions):
+            entry["Permissions"] = permissions
+        if len(permissions_with_grant_option):
+            entry["PermissionsWithGrantOption"] = permissions_with_grant_option
+        permissions_in_message = ", ".join([
+            permission.id
+            for permission in grant.permissions
+        ])
+        values = ", ".join([tag.value for tag in grant.tags])
+        entry["_msgs"] = [
+            f"{msg_prefix}{grant.principal.id} {grant.resource_type} "
+            f"{grant.key} in [{values}] {permissions_in_message}"
+        ]
+        entry["_permit_ids"] = grant.permit_ids
+        entry["_swap_permit_ids"] = list()
+        return entry
+
+    def apply_dl_permission(
+        self,
+        verbose=True,
+        dry_run=False,
+        kept_permit_ids: Optional[OrderedSet] = None,
+    ) -> Tuple[OrderedSet, OrderedSet]:  # pragma: no cover
+        """
+        The permissions implied by the new permissions of the same
+        (principal, resource) pair are not granted, and the deployed ones
+        are not revoked, see :meth:`Playbook.get_implied_permissions`.
+
+        :param verbose:
+        :param dry_run:
+        :param kept_permit_ids: if given, the ids that are not granted or not
+            revoked on purpose are added to it, they are also in the returned
+            sets but they are not failures.
+        :return: the set of :class:`DataLakePermission` id failed to grant, and
+            the set of :class:`DataLakePermission` id failed to revoke.
+        """
+        if not verbose:
+            logger.enable_verbose = False
+
+        # only the principals whose partition digest changed are compared
+        principal_ids = get_changed_partition_keys(
+            self.dl_permission_partitions,
+            self.deployed_pb.dl_permission_partitions,
+        )
+        diff = get_mask_diff(
+            self.dl_permission_masks,
+            self.deployed_pb.dl_permission_masks,
+            principal_ids,
+        )
+
+        # (principal, resources, mask, swap mask, table) to grant / revoke,
+        # the column pairs of the same table with the same permissions are
+        # merged into one ``TableWithColumns`` entry
+        to_grant_list: List[tuple] = list()
+        to_revoke_list: List[tuple] = list()
+        to_grant_column_mapper: Dict[tuple, tuple] = dict()
+        to_revoke_column_mapper: Dict[tuple, tuple] = dict()
+        # ``X`` of an upgraded pair is still granted, it is never revoked
+        # alone, so it is kept in the applied playbook like a failed revoke.
+        # The deployed permissions implied by the new mask are kept the same
+        # way, the implied new permissions are excluded like a failed grant.
+        not_granted_permit_ids: List[str] = list()
+        not_revoked_permit_ids: List[str] = list()
+        for principal, resource, to_grant_mask, to_revoke_mask in diff:
+            # LF tag permissions are granted by multi-value expression, below
+            if resource.object_type == LfTag.object_type:
+                continue
+            new_mask = self.dl_permission_masks.get_mask(principal.id, resource.id)
+            # grant option change is done in place, instead of revoke + grant
+            (
+                to_grant_mask,
+                to_revoke_mask,
+                upgrade_mask,
+                downgrade_mask,
+            ) = get_grant_option_change(to_grant_mask, to_revoke_mask, new_mask)
+            for permission in from_mask(upgrade_mask):
+                not_revoked_permit_ids.append(
+                    DELIMITER.join([principal.id, resource.id, permission.id])
+                )
+            implied_mask = get_implied_by_mask(new_mask)
+            skip_grant_mask = to_grant_mask & implied_mask
+            skip_revoke_mask = to_revoke_mask & implied_mask
+            to_grant_mask ^= skip_grant_mask
+            to_revoke_mask ^= skip_revoke_mask
+            for skip_mask, permit_ids, action in [
+                (skip_grant_mask, not_granted_permit_ids, "not granted"),
+                (skip_revoke_mask, not_revoked_permit_ids, "not revoked"),
+            ]:
+                if skip_mask == 0:
+                    continue
+                skip_list = from_mask(skip_mask)
+                for permission in skip_list:
+                    permit_ids.append(
+                        DELIMITER.join([principal.id, resource.id, permission.id])
+                    )
+                implied_by = ", ".join([
+                    permission.id
+                    for permission in from_mask(get_implying_mask(new_mask | skip_mask))
+                ])
+                msg = (
+                    f"{Fore.YELLOW}- [Skip Implied Permission] {Style.RESET_ALL}"
+                    f"{principal.id} {resource.id} "
+                    f"{', '.join([permission.id for permission in skip_list])} "
+                    f"({action}, implied by {implied_by})"
+                )
+                logger.show(msg)
+            if resource.object_type == Column.object_type:
+                table = resource.table
+                for mask, swap_mask, column_mapper in [
+                    (to_grant_mask, upgrade_mask, to_grant_column_mapper),
+                    (to_revoke_mask, downgrade_mask, to_revoke_column_mapper),
+                ]:
+                    if mask:
+                        key = (principal.id, table.id, mask, swap_mask)
+                        try:
+                            column_mapper[key][1].append(resource)
+                        except KeyError:
+                            column_mapper[key] = (principal, [resource, ], mask, swap_mask, table)
+            else:
+                if to_grant_mask:
+                    to_grant_list.append((principal, [resource, ], to_grant_mask, upgrade_mask, None))
+                if to_revoke_mask:
+                    to_revoke_list.append((principal, [resource, ], to_revoke_mask, downgrade_mask, None))
+        for column_mapper, to_do_list in [
+            (to_grant_column_mapper, to_grant_list),
+            (to_revoke_column_mapper, to_revoke_list),
+        ]:
+            to_do_list.extend(column_mapper.values())
+
+        # we use batch grant / revoke API
+        to_grant_entry_list: List[dict] = list()
+        to_revoke_entry_list: List[dict] = list()
+        for principal, resources, mask, swap_mask, table in to_grant_list:
+            to_grant_entry_list.extend(self._get_dl_permission_entry_list(
+                principal, resources, mask,
+                dl_permission_mapper=self.datalake_permissions,
+                msg_prefix=f"{Fore.GREEN}- [Grant Permission] {Style.RESET_ALL}",
+                swap_mask=swap_mask,
+                swap_msg="upgrade from",
+                table=table,
+            ))
+        for principal, resources, mask, swap_mask, table in to_revoke_list:
+            to_revoke_entry_list.extend(self._get_dl_permission_entry_list(
+                principal, resources, mask,
+                dl_permission_mapper=self.deployed_pb.datalake_permissions,
+                msg_prefix=f"{Fore.RED}- [Revoke Permission] {Style.RESET_ALL}",
+                swap_mask=swap_mask,
+                swap_msg="downgrade to",
+                table=table,
+            ))
+        to_grant_policy_list, to_revoke_policy_list = \
+            self._get_lf_tag_policy_grant_diff(principal_ids)
+        for grant in to_grant_policy_list:
+            to_grant_entry_list.append(self._get_lf_tag_policy_entry(
+                grant,
+                msg_prefix=f"{Fore.GREEN}- [Grant Permission] {Style.RESET_ALL}",
+            ))
+        for grant in to_revoke_policy_list:
+            to_revoke_entry_list.append(self._get_lf_tag_policy_entry(
+                grant,
+                msg_prefix=f"{Fore.RED}- [Revoke Permission] {Style.RESET_ALL}",
+            ))
+
+        # grant and revoke are two separate ordered phases,
+        # chunks in the same phase are sent concurrently
+        failed_grant_permit_ids = OrderedSet(not_granted_permit_ids)
+        failed_revoke_permit_ids = OrderedSet(not_revoked_permit_ids)
+        if kept_permit_ids is not None:
+            kept_permit_ids.update(not_granted_permit_ids)
+            kept_permit_ids.update(not_revoked_permit_ids)
 
         if len(to_grant_entry_list):
             msg = f"{Fore.CYAN}[Info] {Style.RESET_ALL}Grant permissions ..."
             logger.show(msg)
 
-        for to_grant_entry_sub_list in grouper_list(to_grant_entry_list, 20):
-            for entry in to_grant_entry_sub_list:
-                msgs = entry.pop("_msgs")
-                for msg in msgs:
-                    logger.show(msg)
+        grant_entry_to_permit_ids = dict()
+        for entry in to_grant_entry_list:
+            for msg in entry.pop("_msgs"):
+                logger.show(msg)
+            grant_entry_to_permit_ids[entry["Id"]] = (
+                entry.pop("_permit_ids"), entry.pop("_swap_permit_ids"),
+            )
 
-            if dry_run is False:
-                self.lf_client.batch_grant_permissions(
-                    CatalogId=self.account_id,
-                    Entries=to_grant_entry_sub_list
-                )
+        if dry_run is False:
+            for entry_id in self._batch_call_with_retry(
+                self.lf_client.batch_grant_permissions,
+                to_grant_entry_list,
+            ):
+                # the permission without grant option of a failed upgrade
+                # is already kept
+                permit_ids, swap_permit_ids = grant_entry_to_permit_ids[entry_id]
+                failed_grant_permit_ids.update(permit_ids)
+
+        # an old LF tag expression is not revoked if the new expression
+        # that replaces it failed to grant, otherwise the access is lost
+        if len(failed_grant_permit_ids):
+            revoke_entry_list = list()
+            for entry in to_revoke_entry_list:
+                if any([
+                    permit_id in failed_grant_permit_ids
+                    for permit_id in entry["_permit_ids"]
+                ]):
+                    failed_revoke_permit_ids.update(entry["_permit_ids"])
+                    for msg in entry["_msgs"]:
+                        logger.show(f"{msg} (skipped, the replacing grant failed)")
+                else:
+                    revoke_entry_list.append(entry)
+            to_revoke_entry_list = revoke_entry_list
 
         if len(to_revoke_entry_list):
             msg = f"{Fore.CYAN}[Info] {Style.RESET_ALL}Revoke permissions ..."
             logger.show(msg)
 
-        for to_revoke_entry_sub_list in grouper_list(to_revoke_entry_list, 20):
-            for entry in to_revoke_entry_sub_list:
-                msgs = entry.pop("_msgs")
-                for msg in msgs:
-                    logger.show(msg)
+        revoke_entry_to_permit_ids = dict()
+        for entry in to_revoke_entry_list:
+            for msg in entry.pop("_msgs"):
+                logger.show(msg)
+            revoke_entry_to_permit_ids[entry["Id"]] = (
+                entry.pop("_permit_ids"), entry.pop("_swap_permit_ids"),
+            )
 
-            if dry_run is False:
-                self.lf_client.batch_revoke_permissions(
-                    CatalogId=self.account_id,
-                    Entries=to_revoke_entry_sub_list
-                )
+        if dry_run is False:
+            for entry_id in self._batch_call_with_retry(
+                self.lf_client.batch_revoke_permissions,
+                to_revoke_entry_list,
+            ):
+                # failed downgrade keeps the permission with grant option
+                permit_ids, swap_permit_ids = revoke_entry_to_permit_ids[entry_id]
+                failed_revoke_permit_ids.update(permit_ids)
+                failed_grant_permit_ids.update(swap_permit_ids)
 
         logger.enable_verbose = True
+        return failed_grant_permit_ids, failed_revoke_permit_ids
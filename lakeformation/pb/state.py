@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+"""
+Normalized deployed playbook state format.
+
+In the format version 1, every data lake permission and LF tag attachment
+embeds the full principal and resource dict. The same table or IAM role is
+repeated thousands of times.
+
+In the format version 2, each principal, resource and permission is stored
+only once in the ``objects`` table, keyed by its id. Parent resource
+(the database of a table, the table of a column) is also stored by id.
+Data lake permissions and LF tag attachments only store the id references::
+
+    {
+        "format_version": 2,
+        "objects": {
+            "principals": {principal_id: principal_dict},
+            "resources": {resource_id: resource_dict},
+            "permissions": {permission_id: permission_dict},
+        },
+        "principals": [principal_id, ...],
+        "resources": [resource_id, ...],
+        "datalake_permissions": [[principal_id, resource_id, permission_id], ...],
+        "lf_tag_attachments": [[resource_id, tag_id], ...],
+        "lf_tag_policy_grants": [[principal_id, resource_type, [permission_id, ...], [tag_id, ...]], ...],
+        "partition_digests": {
+            "datalake_permissions": {principal_id: digest},
+            "lf_tag_attachments": {database_id: digest},
+        },
+    }
+
+``lf_tag_policy_grants`` is optional, see :mod:`lakeformation.pb.tag_policy`.
+``partition_digests`` is optional, see :class:`lakeformation.utils.PartitionIndex`.
+"""
+
+from typing import Dict, Optional
+
+from ..principal import Principal
+from ..permission import Permission
+from ..resource import Resource, Table, Column
+from ..registry import Registry
+
+STATE_FORMAT_VERSION = 2
+
+
+class RefEncoder:
+    """
+    Collect principal, resource and permission into the ``objects`` table,
+    and returns the id reference.
+    """
+
+    def __init__(self):
+        self.principals: Dict[str, dict] = dict()
+        self.resources: Dict[str, dict] = dict()
+        self.permissions: Dict[str, dict] = dict()
+
+    def principal(self, principal: Principal) -> str:
+        id_ = principal.id
+        if id_ not in self.principals:
+            self.principals[id_] = principal.serialize()
+        return id_
+
+    def resource(self, resource: Resource) -> str:
+        id_ = resource.id
+        if id_ not in self.resources:
+            data = resource.serialize()
+            if resource.object_type == Table.object_type:
+                data["database"] = self.resource(resource.database)
+            elif resource.object_type == Column.object_type:
+                data["table"] = self.resource(resource.table)
+            self.resources[id_] = data
+        return id_
+
+    def permission(self, permission: Permission) -> str:
+        id_ = permission.id
+        if id_ not in self.permissions:
+            self.permissions[id_] = permission.serialize()
+        return id_
+
+    def to_dict(self) -> dict:
+        return {
+            "principals": self.principals,
+            "resources": self.resources,
+            "permissions": self.permissions,
+        }
+
+
+class RefDecoder:
+    """
+    Resolve id reference to principal, resource and permission object from
+    the ``objects`` table. Each id is deserialized only once, the same id
+    always resolves to the same instance. Objects are created by the
+    :class:`~lakeformation.registry.Registry`, the repeated strings are shared.
+
+    If the registry skips the validation, the data is trusted, the key of
+    the ``objects`` table is used as the memoized id of the object instead
+    of computing it again.
+    """
+
+    def __init__(self, objects: dict, registry: Optional[Registry] = None):
+        if registry is None:
+            registry = Registry()
+        self.registry = registry
+        self.principal_data: Dict[str, dict] = objects.get("principals", dict())
+        self.resource_data: Dict[str, dict] = objects.get("resources", dict())
+        self.permission_data: Dict[str, dict] = objects.get("permissions", dict())
+        self.principals: Dict[str, Principal] = dict()
+        self.resources: Dict[str, Resource] = dict()
+        self.permissions: Dict[str, Permission] = dict()
+
+    def principal(self, id_: str) -> Principal:
+        try:
+            return self.principals[id_]
+        except KeyError:
+            principal = self.registry.principal(self.principal_data[id_])
+            if self.registry.skip_validation:
+                principal._id = id_
+            self.principals[id_] = principal
+            return principal
+
+    def resource(self, id_: str) -> Resource:
+        try:
+            return self.resources[id_]
+        except KeyError:
+            data = self.resource_data[id_]
+            if data["object_type"] == Table.object_type:
+                resource = self.registry.table(
+                    name=data["name"],
+                    database=self.resource(data["database"]),
+                    _playbook_id=data["_playbook_id"],
+                )
+            elif data["object_type"] == Column.object_type:
+                resource = self.registry.column(
+                    name=data["name"],
+                    table=self.resource(data["table"]),
+                    _playbook_id=data["_playbook_id"],
+                )
+            else:
+                resource = self.registry.resource(data)
+            if self.registry.skip_validation:
+                resource._id = id_
+            self.resources[id_] = resource
+            return resource
+
+    def permission(self, id_: str) -> Permission:
+        try:
+            return self.permissions[id_]
+        except KeyError:
+            permission = self.registry.permission(self.permission_data[id_])
+            self.permissions[id_] = permission
+            return permission
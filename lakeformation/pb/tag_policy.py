@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+Multi-value LF tag expression for the ``LFTagPolicy`` grant.
+
+The data lake permissions on the LF tags of the same key, for the same
+principal, resource type and permissions, are merged into one
+:class:`LfTagPolicyGrant`, which is one batch grant / revoke entry with
+many ``TagValues``.
+
+Lake Formation stores the grant by the exact expression, a grant on
+``pii in [y, n]`` can only be revoked by the same expression. So the
+grants that are actually sent are recorded in the deployed playbook file,
+see :attr:`~lakeformation.pb.playbook.Playbook.lf_tag_policy_grants`.
+When the values change, the new expression is granted and the old one is
+revoked, there is no access gap because grant goes first.
+"""
+
+from typing import List, Dict, Iterable
+
+from ..principal import Principal
+from ..permission import Permission, get_permission_bit, from_mask
+from ..resource import LfTag
+from ..constant import DELIMITER
+from .mask import PermissionMaskIndex
+
+
+class LfTagPolicyGrant:
+    """
+    A principal is granted the ``permissions`` of ``resource_type`` on the
+    expression ``tags[0].key in [tag.value for tag in tags]``.
+    All permissions have the same resource type, all tags have the same key.
+    """
+    __slots__ = ("principal", "resource_type", "permissions", "tags", "_id")
+
+    def __init__(
+        self,
+        principal: Principal,
+        resource_type: str,
+        permissions: List[Permission],
+        tags: List[LfTag],
+    ):
+        self.principal = principal
+        self.resource_type = resource_type
+        self.permissions = permissions
+        self.tags = sorted(tags, key=lambda tag: tag.value)
+        self._id = None
+
+    @property
+    def id(self) -> str:
+        if self._id is None:
+            self._id = DELIMITER.join([
+                self.principal.id,
+                self.resource_type,
+                self.key,
+                ",".join(sorted([permission.id for permission in self.permissions])),
+                ",".join([tag.value for tag in self.tags]),
+            ])
+        return self._id
+
+    @property
+    def key(self) -> str:
+        return self.tags[0].key
+
+    @property
+    def permit_ids(self) -> List[str]:
+        """
+        The :class:`~lakeformation.pb.asso.DataLakePermission` id covered
+        by this grant.
+        """
+        return [
+            DELIMITER.join([self.principal.id, tag.id, permission.id])
+            for tag in self.tags
+            for permission in self.permissions
+        ]
+
+    def batch_grant_remove_permission_arg_value(self) -> dict:
+        return dict(
+            CatalogId=self.tags[0].catalog_id,
+            ResourceType=self.resource_type,
+            Expression=[
+                dict(
+                    TagKey=self.key,
+                    TagValues=[tag.value for tag in self.tags],
+                ),
+            ]
+        )
+
+
+def get_lf_tag_policy_grants(
+    masks: PermissionMaskIndex,
+    principal_ids: Iterable[str],
+    merge: bool = True,
+) -> Dict[str, Dict[str, LfTagPolicyGrant]]:
+    """
+    Group the permissions on LF tags of the given principals into
+    :class:`LfTagPolicyGrant`.
+
+    :param merge: if False, one grant per tag value, this is how it is
+        granted before the multi-value expression is introduced.
+
+    :return: principal id -> grant id -> grant
+    """
+    grants = dict()
+    for principal_id in principal_ids:
+        # (catalog id, key, resource type, mask) -> [principal, tags, permissions]
+        groups = dict()
+        for principal, resource, mask in masks.pairs.get(principal_id, dict()).values():
+            if resource.object_type != LfTag.object_type:
+                continue
+            by_resource_type: Dict[str, List[Permission]] = dict()
+            for permission in from_mask(mask):
+                try:
+                    by_resource_type[permission.resource_type].append(permission)
+                except KeyError:
+                    by_resource_type[permission.resource_type] = [permission, ]
+            for resource_type, permission_list in by_resource_type.items():
+                type_mask = 0
+                for permission in permission_list:
+                    type_mask |= get_permission_bit(permission)
+                if merge:
+                    key = (resource.catalog_id, resource.key, resource_type, type_mask)
+                else:
+                    key = (resource.id, resource_type)
+                try:
+                    groups[key][1].append(resource)
+                except KeyError:
+                    groups[key] = [principal, [resource, ], permission_list]
+        if len(groups):
+            grants[principal_id] = dict()
+            for principal, tags, permission_list in groups.values():
+                grant = LfTagPolicyGrant(
+                    principal=principal,
+                    resource_type=permission_list[0].resource_type,
+                    permissions=permission_list,
+                    tags=tags,
+                )
+                grants[principal_id][grant.id] = grant
+    return grants
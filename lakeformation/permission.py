@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
 import enum
+import threading
+from typing import List, Dict, Iterable
 
 import attr
 from attrs_mate import AttrsClass
@@ -18,6 +20,9 @@ class Permission(HashableAbc, SerializableAbc):
     permission: str = AttrsClass.ib_str(nullable=False, hash=False)
     grantable: str = AttrsClass.ib_bool(nullable=False, hash=False)
 
+    def _get_id(self) -> str:
+        return self.identifier
+
     @property
     def id(self):
         return self.identifier
@@ -281,3 +286,52 @@ class PermissionEnum(enum.Enum):
         id_list = [permission.value.identifier for permission in cls]
         if len(id_list) != len(set(id_list)):  # pragma: no cover
             raise ValueError
+
+
+# Each permission is represented by one bit, so a set of permissions on the
+# same (principal, resource) pair is one int, the set operations are bitwise.
+# Permissions in ``PermissionEnum`` get the bit by their declaration order,
+# custom permissions get the next free bit when first seen.
+_bit_permission_list: List[Permission] = list()
+_permission_bit_mapper: Dict[str, int] = dict()
+_bit_lock = threading.Lock()
+
+
+def get_permission_bit(permission: Permission) -> int:
+    """
+    Returns the bit that represents this permission.
+    """
+    try:
+        return _permission_bit_mapper[permission.identifier]
+    except KeyError:
+        with _bit_lock:
+            if permission.identifier not in _permission_bit_mapper:
+                _permission_bit_mapper[permission.identifier] = 1 << len(_bit_permission_list)
+                _bit_permission_list.append(permission)
+        return _permission_bit_mapper[permission.identifier]
+
+
+for _permission in PermissionEnum:
+    get_permission_bit(_permission.value)
+
+
+def to_mask(permissions: Iterable[Permission]) -> int:
+    """
+    Convert permissions to the bitmask.
+    """
+    mask = 0
+    for permission in permissions:
+        mask |= get_permission_bit(permission)
+    return mask
+
+
+def from_mask(mask: int) -> List[Permission]:
+    """
+    Convert the bitmask to permissions, in the bit order.
+    """
+    permission_list = list()
+    while mask:
+        low_bit = mask & -mask
+        permission_list.append(_bit_permission_list[low_bit.bit_length() - 1])
+        mask ^= low_bit
+    return permission_list
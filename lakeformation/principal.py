@@ -14,26 +14,31 @@ class Principal(HashableAbc, RenderableAbc, SerializableAbc, PlaybookManaged):
     """
     Principal Model.
     """
+    __slots__ = ()
 
 
 class Iam(Principal):
+    __slots__ = ("_arn", "_playbook_id")
+
     _prefix: str = None
+    _id_fields = ("arn",)
 
     def __init__(
         self,
         arn: str,
         _playbook_id: Optional[str] = None,
+        _skip_validation: bool = False,
     ):
-        self.arn = arn
-        self.validate()
+        self._arn = arn
+        if _skip_validation is not True:
+            self.validate()
         self._playbook_id = _playbook_id  # IAM object is never playbook managed
 
     def validate(self):
         validate_attr_type(self, "arn", self.arn, str)
         validate_iam_arn(self.arn)
 
-    @property
-    def id(self):
+    def _get_id(self) -> str:
         return self.arn
 
     @property
@@ -62,38 +67,47 @@ class Iam(Principal):
 
 
 class IamRole(Iam):
+    __slots__ = ()
+
     object_type: str = "IamRole"
     _prefix: str = "role"
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'IamRole':
+    def deserialize(cls, data: dict, _skip_validation: bool = False) -> 'IamRole':
         return cls(
             arn=data["arn"],
             _playbook_id=data["_playbook_id"],
+            _skip_validation=_skip_validation,
         )
 
 
 class IamUser(Iam):
+    __slots__ = ()
+
     object_type: str = "IamUser"
     _prefix: str = "user"
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'IamUser':
+    def deserialize(cls, data: dict, _skip_validation: bool = False) -> 'IamUser':
         return cls(
             arn=data["arn"],
             _playbook_id=data["_playbook_id"],
+            _skip_validation=_skip_validation,
         )
 
 
 class IamGroup(Iam):
+    __slots__ = ()
+
     object_type: str = "IamGroup"
     _prefix: str = "group"
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'IamGroup':
+    def deserialize(cls, data: dict, _skip_validation: bool = False) -> 'IamGroup':
         return cls(
             arn=data["arn"],
             _playbook_id=data["_playbook_id"],
+            _skip_validation=_skip_validation,
         )
 
 
@@ -103,16 +117,19 @@ class SamlPrincipal(Principal):
 
 class ExternalAccount(Principal):
     object_type = "ExternalAccount"
+    _id_fields = ("account_id",)
 
     def __init__(
         self,
         account_id: str,
         pb: 'Playbook' = None,
-        _playbook_id: Optional[str] = None
+        _playbook_id: Optional[str] = None,
+        _skip_validation: bool = False,
     ):
-        self.account_id = account_id
+        self._account_id = account_id
         self._playbook_id = _playbook_id
-        self.validate()
+        if _skip_validation is not True:
+            self.validate()
         if pb is None:
             self._playbook_id = None
         else:
@@ -124,8 +141,7 @@ class ExternalAccount(Principal):
         validate_attr_type(self, "account_id", self.account_id, str)
         validate_account_id(self.account_id)
 
-    @property
-    def id(self):
+    def _get_id(self) -> str:
         return self.account_id
 
     @property
@@ -143,10 +159,11 @@ class ExternalAccount(Principal):
         )
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'ExternalAccount':
+    def deserialize(cls, data: dict, _skip_validation: bool = False) -> 'ExternalAccount':
         return cls(
             account_id=data["account_id"],
             _playbook_id=data["_playbook_id"],
+            _skip_validation=_skip_validation,
         )
 
 
@@ -158,10 +175,12 @@ _principal_type_mapper = {
 }
 
 
-def deserialize_principal(data: dict) -> Union[
+def deserialize_principal(data: dict, _skip_validation: bool = False) -> Union[
     IamRole,
     IamUser,
     IamGroup,
     ExternalAccount,
 ]:
-    return _principal_type_mapper[data["object_type"]].deserialize(data)
+    return _principal_type_mapper[data["object_type"]].deserialize(
+        data, _skip_validation=_skip_validation,
+    )
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""
+Canonicalizing (flyweight) registry for principal, resource and permission.
+
+A serialized column embeds its table, which embeds its database. Without
+the registry, deserializing thousands of column level permissions creates
+thousands of equal ``Database`` and ``Table`` objects, each of them holds
+its own copy of the catalog id, region and name strings.
+
+The registry resolves equal objects to one shared instance, and the
+repeated strings to one shared str object. Shared instance also makes the
+``==`` check cheap, because the memoized ``id`` of the same object is the
+same str object.
+
+Equality follows the ``id`` of the object, the ``_playbook_id`` is not part
+of the identity. The first registered instance wins.
+
+For the data that is written by this library, for example the deployed
+playbook file, use ``Registry(skip_validation=True)``, the objects are
+created by the trusted fast path that skips the per object validation.
+"""
+
+from typing import Dict, Tuple, Optional, Any
+
+from .abstract import HashableAbc
+from .principal import Principal, deserialize_principal
+from .permission import Permission, PermissionEnum
+from .resource import Resource, Database, Table, Column, deserialize_resource
+
+_permission_mapper: Dict[str, Permission] = {
+    permission.value.identifier: permission.value
+    for permission in PermissionEnum
+}
+
+
+class Registry:
+    """
+    Flyweight registry. Use one registry per deserialization or discovery.
+
+    :param skip_validation: if True, the objects are created with
+        ``_skip_validation=True``, only use it for trusted data.
+    """
+
+    def __init__(self, skip_validation: bool = False):
+        self.strings: Dict[str, str] = dict()
+        self.objects: Dict[Tuple[Any, ...], HashableAbc] = dict()
+        self.skip_validation = skip_validation
+
+    def intern(self, s: Optional[str]) -> Optional[str]:
+        """
+        Returns the shared str object equal to ``s``.
+        """
+        if s is None:
+            return s
+        return self.strings.setdefault(s, s)
+
+    def add(self, obj: HashableAbc) -> HashableAbc:
+        """
+        Returns the registered instance equal to ``obj``, or register ``obj``
+        if it is the first one.
+        """
+        return self.objects.setdefault((obj.object_type, obj.id), obj)
+
+    def database(
+        self,
+        catalog_id: str,
+        region: str,
+        name: str,
+        _playbook_id: Optional[str] = None,
+    ) -> Database:
+        key = (Database.object_type, catalog_id, region, name)
+        try:
+            return self.objects[key]
+        except KeyError:
+            database = Database(
+                catalog_id=self.intern(catalog_id),
+                region=self.intern(region),
+                name=self.intern(name),
+                _playbook_id=_playbook_id,
+                _skip_validation=self.skip_validation,
+            )
+            self.objects[key] = database
+            return database
+
+    def table(
+        self,
+        name: str,
+        database: Database,
+        _playbook_id: Optional[str] = None,
+    ) -> Table:
+        key = (Table.object_type, database.id, name)
+        try:
+            return self.objects[key]
+        except KeyError:
+            table = Table(
+                name=self.intern(name),
+                database=database,
+                _playbook_id=_playbook_id,
+                _skip_validation=self.skip_validation,
+            )
+            self.objects[key] = table
+            return table
+
+    def column(
+        self,
+        name: str,
+        table: Table,
+        _playbook_id: Optional[str] = None,
+    ) -> Column:
+        key = (Column.object_type, table.id, name)
+        try:
+            return self.objects[key]
+        except KeyError:
+            column = Column(
+                name=self.intern(name),
+                table=table,
+                _playbook_id=_playbook_id,
+                _skip_validation=self.skip_validation,
+            )
+            self.objects[key] = column
+            return column
+
+    def resource(self, data: dict) -> Resource:
+        """
+        Canonical version of :func:`~lakeformation.resource.deserialize_resource`.
+        The nested database of a table and table of a column are also
+        resolved by this registry.
+        """
+        object_type = data["object_type"]
+        if object_type == Database.object_type:
+            return self.database(
+                catalog_id=data["catalog_id"],
+                region=data["region"],
+                name=data["name"],
+                _playbook_id=data["_playbook_id"],
+            )
+        elif object_type == Table.object_type:
+            return self.table(
+                name=data["name"],
+                database=self.resource(data["database"]),
+                _playbook_id=data["_playbook_id"],
+            )
+        elif object_type == Column.object_type:
+            return self.column(
+                name=data["name"],
+                table=self.resource(data["table"]),
+                _playbook_id=data["_playbook_id"],
+            )
+        else:
+            return self.add(deserialize_resource(
+                data, _skip_validation=self.skip_validation,
+            ))
+
+    def principal(self, data: dict) -> Principal:
+        """
+        Canonical version of :func:`~lakeformation.principal.deserialize_principal`.
+        """
+        return self.add(deserialize_principal(
+            data, _skip_validation=self.skip_validation,
+        ))
+
+    def permission(self, data: dict) -> Permission:
+        """
+        Canonical version of :meth:`~lakeformation.permission.Permission.deserialize`,
+        resolves to the member value of ``PermissionEnum`` if possible.
+        """
+        key = (Permission.__name__, data["identifier"])
+        try:
+            return self.objects[key]
+        except KeyError:
+            permission = _permission_mapper.get(data["identifier"])
+            if (permission is None) or (permission.serialize() != data):
+                permission = Permission.deserialize(data)
+            self.objects[key] = permission
+            return permission
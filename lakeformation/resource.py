@@ -26,6 +26,8 @@ if TYPE_CHECKING:  # pragma: no cover
 
 
 class Resource(HashableAbc, RenderableAbc, SerializableAbc, PlaybookManaged):
+    __slots__ = ()
+
     @property
     def get_add_remove_lf_tags_arg_name(self) -> str:
         """
@@ -60,11 +62,20 @@ class Resource(HashableAbc, RenderableAbc, SerializableAbc, PlaybookManaged):
 
 
 class NonLfTagResource(Resource):
-    pass
+    __slots__ = ()
 
 
 class Database(NonLfTagResource):
+    """
+    Glue Catalog Database.
+
+    The ``t`` Box of tables is created on first access, most of the databases
+    loaded from the deployed playbook never use it.
+    """
+    __slots__ = ("_catalog_id", "_region", "_name", "_playbook_id", "_t")
+
     object_type: str = "Database"
+    _id_fields = ("catalog_id", "region", "name")
 
     def __init__(
         self,
@@ -72,14 +83,22 @@ class Database(NonLfTagResource):
         region: str,
         name: str,
         _playbook_id: Optional[str] = None,
+        _skip_validation: bool = False,
     ):
-        self.catalog_id = catalog_id
-        self.region = region
-        self.name = name
+        self._catalog_id = catalog_id
+        self._region = region
+        self._name = name
         self._playbook_id = _playbook_id
-        self.validate()
+        if _skip_validation is not True:
+            self.validate()
+
+        self._t: Optional[Dict[str, Table]] = None
 
-        self.t: Dict[str, Table] = Box()
+    @property
+    def t(self) -> Dict[str, 'Table']:
+        if self._t is None:
+            self._t = Box()
+        return self._t
 
     def validate(self):
         validate_attr_type(self, "catalog_id", self.catalog_id, str)
@@ -98,8 +117,7 @@ class Database(NonLfTagResource):
     def __repr__(self):
         return f"{self.__class__.__name__}(catalog_id={self.catalog_id!r}, region={self.region!r}, name={self.name!r})"
 
-    @property
-    def id(self) -> str:
+    def _get_id(self) -> str:
         return self.var_name
 
     def serialize(self) -> dict:
@@ -112,12 +130,13 @@ class Database(NonLfTagResource):
         )
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'Database':
+    def deserialize(cls, data: dict, _skip_validation: bool = False) -> 'Database':
         return cls(
             catalog_id=data["catalog_id"],
             region=data["region"],
             name=data["name"],
             _playbook_id=data["_playbook_id"],
+            _skip_validation=_skip_validation,
         )
 
     @property
@@ -146,20 +165,36 @@ class Database(NonLfTagResource):
 
 
 class Table(NonLfTagResource):
+    """
+    Glue Catalog Table.
+
+    The ``c`` Box of columns is created on first access.
+    """
+    __slots__ = ("_name", "_database", "_playbook_id", "_c")
+
     object_type: str = "Table"
+    _id_fields = ("name", "database")
 
     def __init__(
         self,
         name: str,
         database: Database,
         _playbook_id: Optional[str] = None,
+        _skip_validation: bool = False,
     ):
-        self.name = name
-        self.database = database
+        self._name = name
+        self._database = database
         self._playbook_id = _playbook_id
-        self.validate()
+        if _skip_validation is not True:
+            self.validate()
 
-        self.c: Dict[str, Column] = Box()
+        self._c: Optional[Dict[str, Column]] = None
+
+    @property
+    def c(self) -> Dict[str, 'Column']:
+        if self._c is None:
+            self._c = Box()
+        return self._c
 
     def validate(self):
         validate_attr_type(self, "name", self.name, str)
@@ -180,8 +215,7 @@ class Table(NonLfTagResource):
     def __repr__(self):
         return f"Table(database={self.database!r}, name={self.name!r})"
 
-    @property
-    def id(self) -> str:
+    def _get_id(self) -> str:
         return self.var_name
 
     def serialize(self) -> dict:
@@ -193,11 +227,12 @@ class Table(NonLfTagResource):
         )
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'Table':
+    def deserialize(cls, data: dict, _skip_validation: bool = False) -> 'Table':
         return cls(
             name=data["name"],
-            database=Database.deserialize(data["database"]),
+            database=Database.deserialize(data["database"], _skip_validation=_skip_validation),
             _playbook_id=data["_playbook_id"],
+            _skip_validation=_skip_validation,
         )
 
     @property
@@ -226,20 +261,45 @@ class Table(NonLfTagResource):
             Name=self.name,
         )
 
+    def batch_grant_remove_permission_columns_arg_value(
+        self,
+        column_names: List[str],
+    ) -> dict:
+        """
+        The ``TableWithColumns`` argument value for many columns of this
+        table in one batch grant / revoke entry.
+
+        Always use ``ColumnNames``. ``ColumnWildcard`` is not used, because
+        :attr:`Table.c` only has the columns declared in the playbook, a
+        wildcard would also cover the other columns, and Lake Formation can
+        only revoke a grant with the exact same shape.
+        """
+        return dict(
+            CatalogId=self.catalog_id,
+            DatabaseName=self.database.name,
+            Name=self.name,
+            ColumnNames=list(column_names),
+        )
+
 
 class Column(NonLfTagResource):
+    __slots__ = ("_name", "_table", "_playbook_id")
+
     object_type: str = "Column"
+    _id_fields = ("name", "table")
 
     def __init__(
         self,
         name: str,
         table: Table,
         _playbook_id: Optional[str] = None,
+        _skip_validation: bool = False,
     ):
-        self.name = name
-        self.table = table
+        self._name = name
+        self._table = table
         self._playbook_id = _playbook_id
-        self.validate()
+        if _skip_validation is not True:
+            self.validate()
 
     def validate(self):
         validate_attr_type(self, "name", self.name, str)
@@ -260,8 +320,7 @@ class Column(NonLfTagResource):
     def __repr__(self):
         return f'Column(table={self.table!r}, name={self.name!r})'
 
-    @property
-    def id(self) -> str:
+    def _get_id(self) -> str:
         return self.var_name
 
     def serialize(self) -> dict:
@@ -273,11 +332,12 @@ class Column(NonLfTagResource):
         )
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'Column':
+    def deserialize(cls, data: dict, _skip_validation: bool = False) -> 'Column':
         return cls(
             name=data["name"],
-            table=Table.deserialize(data["table"]),
+            table=Table.deserialize(data["table"], _skip_validation=_skip_validation),
             _playbook_id=data["_playbook_id"],
+            _skip_validation=_skip_validation,
         )
 
     @property
@@ -314,6 +374,7 @@ class DataLakeLocation(NonLfTagResource):
 
     """
     object_type: str = "DataLakeLocation"
+    _id_fields = ("catalog_id", "resource_arn")
 
     def __init__(
         self,
@@ -322,9 +383,10 @@ class DataLakeLocation(NonLfTagResource):
         role_arn: str = None,
         pb: 'Playbook' = None,
         _playbook_id: Optional[str] = None,
+        _skip_validation: bool = False,
     ):
-        self.catalog_id = catalog_id
-        self.resource_arn = resource_arn
+        self._catalog_id = catalog_id
+        self._resource_arn = resource_arn
         self.role_arn = role_arn
         if role_arn is None:
             self.use_service_link_role = True
@@ -336,7 +398,8 @@ class DataLakeLocation(NonLfTagResource):
             pb.add_dl_location(self)
             self._playbook_id = pb.playbook_id
         self.pb = pb
-        self.validate()
+        if _skip_validation is not True:
+            self.validate()
 
     def validate(self):
         validate_attr_type(self, "catalog_id", self.catalog_id, str)
@@ -356,8 +419,7 @@ class DataLakeLocation(NonLfTagResource):
     def __repr__(self):
         return f"{self.__class__.__name__}(catalog_id={self.catalog_id!r}, resource_arn={self.resource_arn!r}, role_arn={self.role_arn!r})"
 
-    @property
-    def id(self) -> str:
+    def _get_id(self) -> str:
         return self.var_name
 
     def serialize(self) -> dict:
@@ -370,12 +432,13 @@ class DataLakeLocation(NonLfTagResource):
         )
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'DataLakeLocation':
+    def deserialize(cls, data: dict, _skip_validation: bool = False) -> 'DataLakeLocation':
         return cls(
             catalog_id=data["catalog_id"],
             resource_arn=data["resource_arn"],
             role_arn=data["role_arn"],
             _playbook_id=data["_playbook_id"],
+            _skip_validation=_skip_validation,
         )
 
     @property
@@ -397,6 +460,7 @@ class DataCellsFilter(NonLfTagResource):
 
     """
     object_type: str = "DataCellsFilter"
+    _id_fields = ("catalog_id", "filter_name")
 
     def __init__(
         self,
@@ -409,9 +473,10 @@ class DataCellsFilter(NonLfTagResource):
         exclude_columns: List[str] = None,
         pb: 'Playbook' = None,
         _playbook_id: Optional[str] = None,
+        _skip_validation: bool = False,
     ):
-        self.filter_name = filter_name
-        self.catalog_id = catalog_id
+        self._filter_name = filter_name
+        self._catalog_id = catalog_id
         self.database_name = database_name
         self.table_name = table_name
         self.row_filter_expression = row_filter_expression
@@ -423,7 +488,8 @@ class DataCellsFilter(NonLfTagResource):
             pb.add_data_filter(self)
             self._playbook_id = pb.playbook_id
         self.pb = pb
-        self.validate()
+        if _skip_validation is not True:
+            self.validate()
 
     def validate(self):
         validate_attr_type(self, "filter_name", self.filter_name, str)
@@ -445,8 +511,7 @@ class DataCellsFilter(NonLfTagResource):
     def __repr__(self):
         return f"{self.__class__.__name__}(filter_name={self.filter_name!r}, catalog_id={self.catalog_id!r}, database_name={self.database_name!r}, table_name={self.table_name!r}, row_filter_expression={self.row_filter_expression!r}, include_columns={self.include_columns!r}, exclude_columns={self.exclude_columns!r})"
 
-    @property
-    def id(self) -> str:
+    def _get_id(self) -> str:
         return self.var_name
 
     def serialize(self) -> dict:
@@ -463,7 +528,7 @@ class DataCellsFilter(NonLfTagResource):
         )
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'DataCellsFilter':
+    def deserialize(cls, data: dict, _skip_validation: bool = False) -> 'DataCellsFilter':
         return cls(
             filter_name=data["filter_name"],
             catalog_id=data["catalog_id"],
@@ -473,6 +538,7 @@ class DataCellsFilter(NonLfTagResource):
             include_columns=data["include_columns"],
             exclude_columns=data["exclude_columns"],
             _playbook_id=data["_playbook_id"],
+            _skip_validation=_skip_validation,
         )
 
     @property
@@ -492,7 +558,10 @@ class DataCellsFilter(NonLfTagResource):
 
 
 class LfTag(Resource):
+    __slots__ = ("catalog_id", "_key", "_value", "_playbook_id", "pb")
+
     object_type: str = "LfTag"
+    _id_fields = ("key", "value")
 
     def __init__(
         self,
@@ -501,11 +570,13 @@ class LfTag(Resource):
         value: str,
         pb: 'Playbook' = None,
         _playbook_id: Optional[str] = None,
+        _skip_validation: bool = False,
     ):
         self.catalog_id = catalog_id
-        self.key = key
-        self.value = value
-        self.validate()
+        self._key = key
+        self._value = value
+        if _skip_validation is not True:
+            self.validate()
 
         if pb is None:
             self._playbook_id = None
@@ -520,8 +591,7 @@ class LfTag(Resource):
         validate_attr_type(self, "value", self.value, str)
         validate_account_id(self.catalog_id)
 
-    @property
-    def id(self):
+    def _get_id(self) -> str:
         return f"tag_{self.key}_{self.value}"
 
     @property
@@ -541,12 +611,13 @@ class LfTag(Resource):
         )
 
     @classmethod
-    def deserialize(cls, data: dict) -> 'LfTag':
+    def deserialize(cls, data: dict, _skip_validation: bool = False) -> 'LfTag':
         return cls(
             catalog_id=data["catalog_id"],
             key=data["key"],
             value=data["value"],
             _playbook_id=data["_playbook_id"],
+            _skip_validation=_skip_validation,
         )
 
     @property
@@ -579,7 +650,7 @@ _resource_type_mapper = {
 }
 
 
-def deserialize_resource(data: dict) -> Union[
+def deserialize_resource(data: dict, _skip_validation: bool = False) -> Union[
     Database,
     Table,
     Column,
@@ -587,4 +658,6 @@ def deserialize_resource(data: dict) -> Union[
     DataCellsFilter,
     LfTag,
 ]:
-    return _resource_type_mapper[data["object_type"]].deserialize(data)
+    return _resource_type_mapper[data["object_type"]].deserialize(
+        data, _skip_validation=_skip_validation,
+    )
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import json
+import threading
 from typing import List, Union
 
 import boto3
@@ -141,6 +142,82 @@ class Objects:
         )
 
 
+class FakeLfClient:
+    """
+    A fake boto3 lakeformation client that records all API calls in order.
+    It is thread safe.
+
+    :param fail_func: a function takes the api name and a batch entry,
+        returns an error code if this entry should be reported in ``Failures``,
+        otherwise returns None. For ``add_lf_tags_to_resource`` and
+        ``remove_lf_tags_from_resource``, the entry is a dict of the
+        ``Resource`` and one item of ``LFTags`` as ``LFTag``.
+    """
+
+    def __init__(self, fail_func=None):
+        self.calls: List[tuple] = list()
+        self.fail_func = fail_func
+        self._lock = threading.Lock()
+
+    def _record(self, api: str, kwargs: dict) -> dict:
+        with self._lock:
+            self.calls.append((api, kwargs))
+        return dict()
+
+    def get_calls(self, api: str) -> List[dict]:
+        return [kwargs for name, kwargs in self.calls if name == api]
+
+    def create_lf_tag(self, **kwargs):
+        return self._record("create_lf_tag", kwargs)
+
+    def update_lf_tag(self, **kwargs):
+        return self._record("update_lf_tag", kwargs)
+
+    def delete_lf_tag(self, **kwargs):
+        return self._record("delete_lf_tag", kwargs)
+
+    def _lf_tags(self, api: str, kwargs: dict) -> dict:
+        self._record(api, kwargs)
+        failures = list()
+        if self.fail_func is not None:
+            with self._lock:
+                for lf_tag in kwargs["LFTags"]:
+                    entry = dict(Resource=kwargs["Resource"], LFTag=lf_tag)
+                    error_code = self.fail_func(api, entry)
+                    if error_code is not None:
+                        failures.append(dict(
+                            LFTag=lf_tag,
+                            Error=dict(ErrorCode=error_code, ErrorMessage=error_code),
+                        ))
+        return dict(Failures=failures)
+
+    def add_lf_tags_to_resource(self, **kwargs):
+        return self._lf_tags("add_lf_tags_to_resource", kwargs)
+
+    def remove_lf_tags_from_resource(self, **kwargs):
+        return self._lf_tags("remove_lf_tags_from_resource", kwargs)
+
+    def _batch(self, api: str, kwargs: dict) -> dict:
+        self._record(api, kwargs)
+        failures = list()
+        if self.fail_func is not None:
+            with self._lock:
+                for entry in kwargs["Entries"]:
+                    error_code = self.fail_func(api, entry)
+                    if error_code is not None:
+                        failures.append(dict(
+                            RequestEntry=entry,
+                            Error=dict(ErrorCode=error_code, ErrorMessage=error_code),
+                        ))
+        return dict(Failures=failures)
+
+    def batch_grant_permissions(self, **kwargs):
+        return self._batch("batch_grant_permissions", kwargs)
+
+    def batch_revoke_permissions(self, **kwargs):
+        return self._batch("batch_revoke_permissions", kwargs)
+
+
 class AWS:
     def __init__(self):
         self.boto_ses = boto3.session.Session()
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 
 import re
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from ordered_set import OrderedSet
 from datetime import datetime, timezone
-from typing import List, Set, Tuple, Dict, Iterable, Any
+from typing import List, Set, Tuple, Dict, Iterable, Callable, Any
 
 var_name_escape = {
     "-": "_",
@@ -75,6 +78,148 @@ def get_diff_and_inter(
     return s1.difference(s2), s2.difference(s1), s1.intersection(s2)
 
 
+#: the partition digest is the sum of the id hashes modulo this number
+_DIGEST_MODULUS = 1 << 128
+
+
+def _hash_id(id_: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(id_.encode("utf-8"), digest_size=16).digest(),
+        "big",
+    )
+
+
+class PartitionIndex:
+    """
+    Group object ids into partitions, and maintain a digest of the ids
+    for each partition, like a two level Merkle tree.
+
+    If two :class:`PartitionIndex` have the same digest for a partition,
+    the ids in this partition are the same, it can be skipped when diffing.
+    The digest is the number of ids and the sum of the hashes of the ids,
+    so it doesn't depend on the order. It is computed lazily on first use,
+    after that it is updated in place when an id is added or removed.
+    """
+
+    def __init__(self):
+        self.members: Dict[str, Dict[str, None]] = dict()
+        # partition key -> sum of the id hashes, only for computed partitions
+        self._sums: Dict[str, int] = dict()
+
+    def add(self, key: str, id_: str):
+        try:
+            members = self.members[key]
+        except KeyError:
+            members = dict()
+            self.members[key] = members
+        if id_ in members:
+            return
+        members[id_] = None
+        if key in self._sums:
+            self._sums[key] = (self._sums[key] + _hash_id(id_)) % _DIGEST_MODULUS
+
+    def add_many(self, key: str, ids: Iterable[str]):
+        try:
+            members = self.members[key]
+        except KeyError:
+            members = dict()
+            self.members[key] = members
+        if key in self._sums:
+            total = self._sums[key]
+            for id_ in ids:
+                if id_ not in members:
+                    members[id_] = None
+                    total += _hash_id(id_)
+            self._sums[key] = total % _DIGEST_MODULUS
+        else:
+            for id_ in ids:
+                members[id_] = None
+
+    def remove(self, key: str, id_: str):
+        ids = self.members[key]
+        del ids[id_]
+        if len(ids) == 0:
+            del self.members[key]
+            self._sums.pop(key, None)
+        elif key in self._sums:
+            self._sums[key] = (self._sums[key] - _hash_id(id_)) % _DIGEST_MODULUS
+
+    def digest(self, key: str) -> str:
+        try:
+            members = self.members[key]
+        except KeyError:
+            return f"0-{0:032x}"
+        try:
+            total = self._sums[key]
+        except KeyError:
+            blake2b, from_bytes = hashlib.blake2b, int.from_bytes
+            total = sum([
+                from_bytes(blake2b(id_.encode("utf-8"), digest_size=16).digest(), "big")
+                for id_ in members
+            ]) % _DIGEST_MODULUS
+            self._sums[key] = total
+        return f"{len(members)}-{total:032x}"
+
+    def digests(self) -> Dict[str, str]:
+        return {key: self.digest(key) for key in self.members}
+
+    def seed_digests(self, digests: Dict[str, str]):
+        """
+        Use the digests stored in the deployed playbook file, instead of
+        hashing all the loaded ids. It is called after the ids are loaded.
+        A digest is ignored if its number of ids doesn't match the loaded
+        partition, or it is not in the format of :meth:`PartitionIndex.digest`.
+        """
+        for key, digest in digests.items():
+            try:
+                members = self.members[key]
+                count, total = digest.split("-")
+                if int(count) == len(members):
+                    self._sums[key] = int(total, 16)
+            except (KeyError, ValueError, AttributeError):
+                pass
+
+def get_changed_partition_keys(
+    idx1: PartitionIndex,
+    idx2: PartitionIndex,
+) -> List[str]:
+    """
+    Returns the partition keys that only exists in one of the index, or
+    whose digest are different.
+    """
+    keys = list()
+    for key in idx1.members:
+        if (key not in idx2.members) or (idx1.digest(key) != idx2.digest(key)):
+            keys.append(key)
+    for key in idx2.members:
+        if key not in idx1.members:
+            keys.append(key)
+    return keys
+
+
+def get_partitioned_diff(
+    idx1: PartitionIndex,
+    idx2: PartitionIndex,
+) -> Tuple[OrderedSet, OrderedSet]:
+    """
+    Similar to :func:`get_diff_and_inter`, but only compare the ids in the
+    partitions whose digest are different. The cost grows with the size of
+    the change instead of the total number of ids.
+
+    Returns two set data structure
+
+    1. to add object id set
+    2. to delete object id set
+    """
+    to_add, to_delete = OrderedSet(), OrderedSet()
+    for key in get_changed_partition_keys(idx1, idx2):
+        ids1 = idx1.members.get(key, dict())
+        ids2 = idx2.members.get(key, dict())
+        to_add.update([id_ for id_ in ids1 if id_ not in ids2])
+        to_delete.update([id_ for id_ in ids2 if id_ not in ids1])
+    return to_add, to_delete
+
+
 def grouper_list(iterable: Iterable, n: int) -> List[list]:
     """
     Evenly divide list into fixed-length piece, no filled value if chunk
@@ -98,6 +243,40 @@ def grouper_list(iterable: Iterable, n: int) -> List[list]:
         yield chunk
 
 
+def imap_concurrently(
+    func: Callable,
+    iterable: Iterable,
+    max_workers: int = 1,
+) -> Iterable[Any]:
+    """
+    Lazily apply ``func`` to each item of ``iterable`` with a thread pool, and
+    yield the results in the same order as the input. It is designed for
+    IO bound tasks like AWS API calls.
+
+    At most ``max_workers * 2`` items are submitted ahead of the one being
+    consumed, so the memory usage is bounded even if the input is huge.
+    If ``max_workers`` is 1, no thread pool is created and it works exactly
+    like the built-in ``map``.
+
+    Example::
+
+        >>> list(imap_concurrently(lambda x: x * x, range(5), max_workers=4))
+        [0, 1, 4, 9, 16]
+    """
+    if max_workers <= 1:
+        yield from map(func, iterable)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = deque()
+        for item in iterable:
+            futures.append(executor.submit(func, item))
+            if len(futures) >= max_workers * 2:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+
 iam_arn_pattern = re.compile("^arn:aws:iam::\d{12}:(role|user|group)/.+")
 account_id_pattern = re.compile("\d{12}")
 
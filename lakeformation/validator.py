@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from typing import Type
+from typing import Type, Iterable, List
 
 from .exc import ValidationError
 
@@ -13,3 +13,20 @@ def validate_attr_type(
 ):
     if not isinstance(value, tp):
         raise ValidationError.from_validate_attr_type(inst, attr, value, tp)
+
+
+def validate_items_type(
+    inst,
+    attr: str,
+    values: Iterable,
+    tp: Type,
+) -> List:
+    """
+    Validate the type of each item in a collection once, and returns the
+    items as a list.
+    """
+    values = list(values)
+    for value in values:
+        if not isinstance(value, tp):
+            raise ValidationError.from_validate_attr_type(inst, attr, value, tp)
+    return values
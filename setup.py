@@ -164,6 +164,12 @@ if __name__ == "__main__":
     except:
         print("'requirements-doc.txt' not found!")
 
+    # optional codecs of the deployed playbook file, see lakeformation.pb.codec
+    EXTRA_REQUIRE["orjson"] = ["orjson"]
+    EXTRA_REQUIRE["msgpack"] = ["msgpack"]
+    EXTRA_REQUIRE["zstd"] = ["zstandard"]
+    EXTRA_REQUIRE["codec"] = ["orjson", "msgpack", "zstandard"]
+
     setup(
         name=PKG_NAME,
         description=SHORT_DESCRIPTION,
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from lakeformation.pb.codec import (
+    JsonCodec, OrjsonCodec, MsgpackCodec,
+    GzipCompressor, ZstdCompressor, CompressedCodec,
+    get_codec, get_codec_by_path,
+)
+from lakeformation.pb.playbook import Playbook
+from lakeformation.permission import PermissionEnum
+from lakeformation.tests import Objects, aws_account_id, aws_region
+
+obj = Objects()
+
+
+def make_data() -> dict:
+    pb = Playbook(_skip_validation=True)
+    pb.account_id = aws_account_id
+    pb.region = aws_region
+    pb.grant(obj.iam_user_alice, obj.col_amz_user_id, [PermissionEnum.Select.value, ])
+    pb.attach(obj.col_amz_user_password, obj.tag_regular_n)
+    return pb.serialize()
+
+
+def test_get_codec():
+    assert isinstance(get_codec(".json"), JsonCodec)
+    assert isinstance(get_codec("msgpack"), MsgpackCodec)
+    codec = get_codec(".orjson.zst")
+    assert isinstance(codec, CompressedCodec)
+    assert isinstance(codec.codec, OrjsonCodec)
+    assert isinstance(codec.compressor, ZstdCompressor)
+    assert codec.ext == ".orjson.zst"
+
+    codec = get_codec_by_path("/tmp/deployed-111122223333-us-east-1.json.gz")
+    assert isinstance(codec.codec, JsonCodec)
+    assert isinstance(codec.compressor, GzipCompressor)
+    assert isinstance(get_codec_by_path("deployed-111122223333-us-east-1.json"), JsonCodec)
+
+    with pytest.raises(ValueError):
+        get_codec(".yml")
+
+
+@pytest.mark.parametrize(
+    "ext,module",
+    [
+        (".json", None),
+        (".json.gz", None),
+        (".orjson", "orjson"),
+        (".msgpack", "msgpack"),
+        (".msgpack.zst", "zstandard"),
+    ],
+)
+def test_round_trip(ext, module):
+    if module is not None:
+        pytest.importorskip(module)
+    if ext == ".msgpack.zst":
+        pytest.importorskip("msgpack")
+    data = make_data()
+    codec = get_codec(ext)
+    assert codec.loads(codec.dumps(data)) == data
+
+
+def test_playbook_deployed_pb_ext(tmp_path):
+    pb = Playbook(workspace_dir=tmp_path, deployed_pb_ext=".json.gz", _skip_validation=True)
+    pb.account_id = aws_account_id
+    pb.region = aws_region
+    assert pb.deployed_pb_file.name == f"deployed-{aws_account_id}-{aws_region}.json.gz"
+
+    pb.load_deployed_playbook()  # create an empty one
+    assert pb.deployed_pb_file.exists()
+
+    pb.grant(obj.iam_user_alice, obj.col_amz_user_id, [PermissionEnum.Select.value, ])
+    pb.write_deployed_playbook(pb)
+    pb.load_deployed_playbook()
+    assert list(pb.deployed_pb.datalake_permissions) == list(pb.datalake_permissions)
+
+    # switch to json, the .json.gz file is loaded, then removed once the
+    # .json file is written
+    pb1 = Playbook(workspace_dir=tmp_path, _skip_validation=True)
+    pb1.account_id = aws_account_id
+    pb1.region = aws_region
+    pb1.load_deployed_playbook()
+    assert list(pb1.deployed_pb.datalake_permissions) == list(pb.datalake_permissions)
+    pb1.grant(obj.iam_user_alice, obj.col_amz_user_password, [PermissionEnum.Select.value, ])
+    pb1.write_deployed_playbook(pb1)
+    assert pb1.deployed_pb_file.exists()
+    assert not pb.deployed_pb_file.exists()
+
+    # switch back, the newer .json file is loaded, not a stale .json.gz
+    pb.load_deployed_playbook()
+    assert list(pb.deployed_pb.datalake_permissions) == list(pb1.datalake_permissions)
+    pb.write_deployed_playbook(pb.deployed_pb)
+    assert not pb1.deployed_pb_file.exists()
+
+    # the fingerprint file is not a deployed playbook file
+    pb.deployed_pb_fingerprint_file.write_text("fingerprint")
+    pb.write_deployed_playbook(pb.deployed_pb)
+    assert pb.deployed_pb_fingerprint_file.exists()
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from lakeformation.principal import IamRole
+from lakeformation.resource import Database, Table
+from lakeformation.permission import PermissionEnum, to_mask
+from lakeformation.pb.asso import DataLakePermission
+from lakeformation.pb.mask import (
+    PermissionMaskIndex, get_mask_diff, get_grant_option_change,
+    get_implied_mask, get_implied_by_mask, get_implying_mask,
+)
+from lakeformation.tests import aws_account_id, aws_region
+
+role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+db = Database(catalog_id=aws_account_id, region=aws_region, name="db")
+tb1 = Table(name="tb1", database=db)
+tb2 = Table(name="tb2", database=db)
+
+Select = PermissionEnum.Select.value
+Insert = PermissionEnum.Insert.value
+Delete = PermissionEnum.Delete.value
+
+
+def new_index(grants: list) -> PermissionMaskIndex:
+    idx = PermissionMaskIndex()
+    for resource, permissions in grants:
+        for permission in permissions:
+            idx.add(DataLakePermission(principal=role, resource=resource, permission=permission))
+    return idx
+
+
+def test_permission_mask_index():
+    idx = new_index([(tb1, [Select, Insert]), (tb2, [Select])])
+    assert idx.get_mask(role.id, tb1.id) == to_mask([Select, Insert])
+    assert idx.get_mask(role.id, tb2.id) == to_mask([Select])
+    assert idx.get_mask(role.id, db.id) == 0
+
+    idx.remove(DataLakePermission(principal=role, resource=tb1, permission=Select))
+    assert idx.get_mask(role.id, tb1.id) == to_mask([Insert])
+    idx.remove(DataLakePermission(principal=role, resource=tb2, permission=Select))
+    assert tb2.id not in idx.pairs[role.id]
+
+
+def test_get_mask_diff():
+    idx1 = new_index([(tb1, [Select, Delete])])
+    idx2 = new_index([(tb1, [Select, Insert]), (tb2, [Select])])
+    assert get_mask_diff(idx1, idx2, [role.id]) == [
+        (role, tb1, to_mask([Delete]), to_mask([Insert])),
+        (role, tb2, 0, to_mask([Select])),
+    ]
+    assert get_mask_diff(idx1, idx1, [role.id]) == []
+    assert get_mask_diff(idx1, idx2, []) == []
+
+
+def test_get_grant_option_change():
+    SelectGrantable = PermissionEnum.SelectGrantable.value
+    InsertGrantable = PermissionEnum.InsertGrantable.value
+    Associate = PermissionEnum.Associate.value
+    AssociateGrantable = PermissionEnum.AssociateGrantable.value
+
+    # upgrade Select, downgrade Insert, Delete is a regular revoke
+    assert get_grant_option_change(
+        to_mask([SelectGrantable, Insert]),
+        to_mask([Select, InsertGrantable, Delete]),
+    ) == (
+        to_mask([SelectGrantable]),
+        to_mask([InsertGrantable, Delete]),
+        to_mask([Select]),
+        to_mask([Insert]),
+    )
+
+    # same in the API call, nothing to do
+    assert get_grant_option_change(
+        to_mask([AssociateGrantable]),
+        to_mask([Associate]),
+    ) == (0, 0, 0, 0)
+
+    assert get_grant_option_change(to_mask([Select]), 0) == (to_mask([Select]), 0, 0, 0)
+
+    # Select kept by an earlier upgrade is not revoked while SelectGrantable is wanted
+    assert get_grant_option_change(
+        0, to_mask([Select]), to_mask([SelectGrantable]),
+    ) == (0, 0, to_mask([Select]), 0)
+    # it is revoked with SelectGrantable
+    assert get_grant_option_change(
+        0, to_mask([Select, SelectGrantable]), 0,
+    ) == (0, to_mask([Select, SelectGrantable]), 0, 0)
+
+
+def test_get_implied_mask():
+    SuperTable = PermissionEnum.SuperTable.value
+    SuperTableGrantable = PermissionEnum.SuperTableGrantable.value
+    SelectGrantable = PermissionEnum.SelectGrantable.value
+    mask = to_mask([Select, SuperTable, SelectGrantable, Insert])
+    assert get_implied_mask(mask) == to_mask([Select, Insert])
+    assert get_implying_mask(mask) == to_mask([SuperTable])
+
+    mask = to_mask([SuperTableGrantable, SelectGrantable, Select])
+    assert get_implied_mask(mask) == to_mask([SelectGrantable])
+    assert get_implied_mask(to_mask([Select, Insert])) == 0
+    assert get_implying_mask(to_mask([SuperTable])) == 0
+
+    # not in the mask, still implied
+    assert get_implied_by_mask(to_mask([SuperTable])) & to_mask([Select, Insert]) == to_mask([Select, Insert])
+    assert get_implied_by_mask(to_mask([SuperTable])) & to_mask([SelectGrantable]) == 0
+    assert get_implied_by_mask(to_mask([Select, Insert])) == 0
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
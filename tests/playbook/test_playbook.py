@@ -6,10 +6,14 @@ from lakeformation.pb.playbook import (
     Playbook, DataLakePermission, LfTagAttachment,
 )
 from lakeformation.resource import (
+    Database, Table, Column,
     DataLakeLocation, DataCellsFilter, LfTag,
 )
+from lakeformation.principal import IamRole
+from lakeformation.boto_utils import BotoCaller
+from lakeformation.exc import ValidationError
 from lakeformation.permission import PermissionEnum
-from lakeformation.tests import Objects, aws_account_id, aws_region
+from lakeformation.tests import Objects, FakeLfClient, aws_account_id, aws_region
 
 dir_here = Path(__file__).absolute().parent
 
@@ -103,6 +107,874 @@ class TestPlaybook:
             dl_permission=list(pb.datalake_permissions.values())[0]
         )
 
+    def test_partition_digests(self):
+        obj = Objects()
+        pb = Playbook(_skip_validation=True)
+        pb.account_id = aws_account_id
+        pb.region = aws_region
+        pb.attach(obj.db_amz, obj.tag_admin_y)
+        pb.grant(obj.iam_user_alice, obj.db_amz, [PermissionEnum.SuperDatabase.value])
+        digests = pb.dl_permission_partitions.digests()
+
+        # the stored digests are trusted by the trusted load only
+        data = pb.serialize()
+        assert data["partition_digests"]["datalake_permissions"] == digests
+        stale = {obj.iam_user_alice.id: f"1-{1:032x}"}
+        data["partition_digests"]["datalake_permissions"] = stale
+        pb1 = Playbook.deserialize(data, _skip_validation=True)
+        assert pb1.dl_permission_partitions.digests() == stale
+        pb1 = Playbook.deserialize(data)
+        assert pb1.dl_permission_partitions.digests() == digests
+
+        # ignored if the number of ids doesn't match, or not in the format
+        for digest in [f"2-{1:032x}", "stale"]:
+            data["partition_digests"]["datalake_permissions"] = {obj.iam_user_alice.id: digest}
+            pb1 = Playbook.deserialize(data, _skip_validation=True)
+            assert pb1.dl_permission_partitions.digests() == digests
+
+    def test_tag_index(self):
+        pb = new_playbook()
+        tag_admin_y = LfTag(catalog_id=aws_account_id, key="admin", value="y", pb=pb)
+        tag_admin_n = LfTag(catalog_id=aws_account_id, key="admin", value="n", pb=pb)
+        tag_pii_y = LfTag(catalog_id=aws_account_id, key="pii", value="y", pb=pb)
+        loc = DataLakeLocation(catalog_id=aws_account_id, resource_arn="s3://my-bucket", pb=pb)
+        ft = DataCellsFilter(
+            filter_name="my_filter",
+            catalog_id=aws_account_id,
+            database_name="db", table_name="tb",
+            row_filter_expression="name='alice'",
+            include_columns=["name", ],
+            pb=pb,
+        )
+        pb.attach(new_tables(1)[0], tag_pii_y)
+
+        for pb1 in [
+            pb,
+            Playbook.deserialize(pb.serialize()),
+            Playbook.deserialize(pb.serialize(), _skip_validation=True),
+            pb.get_applied_playbook(),
+        ]:
+            assert list(pb1.tags) == [tag_admin_y.id, tag_admin_n.id, tag_pii_y.id]
+            assert pb1.tags[tag_admin_y.id] == tag_admin_y
+            assert list(pb1.dl_locations) == [loc.id]
+            assert list(pb1.data_filters) == [ft.id]
+            assert pb1.tag_mapper == {"admin": {"y", "n"}, "pii": {"y"}}
+
+    def test_grant_many_attach_many(self):
+        roles = [
+            IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/role_{i}")
+            for i in range(3)
+        ]
+        tables = new_tables(4)
+        tag_1 = LfTag(catalog_id=aws_account_id, key="pii", value="y")
+        tag_2 = LfTag(catalog_id=aws_account_id, key="admin", value="y")
+        permissions = [PermissionEnum.Select.value, PermissionEnum.Insert.value]
+
+        pb1 = new_playbook()
+        for role in roles:
+            for resource in tables + [tag_1, ]:
+                pb1.grant(role, resource, permissions)
+        for tb in tables:
+            pb1.attach(tb, tag_1)
+            pb1.attach(tb, tag_2)
+
+        pb2 = new_playbook()
+        pb2.grant_many(iter(roles), tables + [tag_1, ], permissions)
+        pb2.attach_many(tables, (tag for tag in [tag_1, tag_2]))
+
+        assert list(pb2.datalake_permissions) == list(pb1.datalake_permissions)
+        assert list(pb2.lf_tag_attachments) == list(pb1.lf_tag_attachments)
+        for permit_id, dl_permission in pb2.datalake_permissions.items():
+            assert dl_permission.id == permit_id
+        assert pb2.dl_permission_partitions.digests() == pb1.dl_permission_partitions.digests()
+        assert pb2.lf_tag_attachment_partitions.digests() == pb1.lf_tag_attachment_partitions.digests()
+        assert pb2.dl_permission_masks.pairs == pb1.dl_permission_masks.pairs
+        assert tag_1.pb is pb2
+        assert tag_2.pb is pb2
+
+        # type is validated once per input collection
+        with pytest.raises(ValidationError):
+            pb2.grant_many(roles, [tables[0].database, ], [PermissionEnum.Select.value, "Delete"])
+        with pytest.raises(ValidationError):
+            pb2.attach_many([tag_1, ], [tag_2, ])
+        assert len(pb2.datalake_permissions) == len(pb1.datalake_permissions)
+
+    def test_grant_many_attach_many_duplicate(self):
+        roles = [
+            IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/role_{i}")
+            for i in range(2)
+        ]
+        tables = new_tables(3)
+        tag = LfTag(catalog_id=aws_account_id, key="pii", value="y")
+        permissions = [PermissionEnum.Select.value, ]
+
+        pb = new_playbook()
+        # the second principal already has it, found after the first one
+        pb.grant(roles[1], tables[2], permissions)
+        pb.attach(tables[2], tag)
+
+        def snapshot() -> tuple:
+            return (
+                list(pb.datalake_permissions),
+                pb.dl_permission_partitions.digests(),
+                {
+                    principal_id: {
+                        resource_id: pair[2]
+                        for resource_id, pair in by_resource.items()
+                    }
+                    for principal_id, by_resource in pb.dl_permission_masks.pairs.items()
+                },
+                list(pb.lf_tag_attachments),
+                pb.lf_tag_attachment_partitions.digests(),
+            )
+
+        before = snapshot()
+        with pytest.raises(ValueError):
+            pb.grant_many(roles, tables, permissions)
+        # repeated in the inputs
+        with pytest.raises(ValueError):
+            pb.grant_many(roles[:1], [tables[0], tables[0]], permissions)
+        with pytest.raises(ValueError):
+            pb.attach_many(tables, [tag, ])
+        with pytest.raises(ValueError):
+            pb.attach_many([tables[0], tables[0]], [tag, ])
+        assert snapshot() == before
+
+    def test_grant_many_empty(self):
+        role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+        tb = new_tables(1)[0]
+        permissions = [PermissionEnum.Select.value, ]
+
+        pb = new_playbook()
+        fingerprint = pb.get_fingerprint()
+        pb.grant_many([role, ], [tb, ], [])
+        pb.grant_many([role, ], [], permissions)
+        pb.grant_many([], [tb, ], permissions)
+        assert pb.datalake_permissions == {}
+        assert pb.dl_permission_partitions.members == {}
+        assert pb.dl_permission_masks.pairs == {}
+        assert pb.get_fingerprint() == fingerprint
+
+    def test_deserialize_v1(self):
+        """
+        The legacy format version 1 is transparently upgraded.
+        """
+        obj = Objects()
+        pb = new_playbook()
+        pb.add_tag(obj.tag_admin_y)
+        pb.attach(obj.col_amz_user_password, obj.tag_admin_y)
+        pb.grant(obj.iam_user_alice, obj.tag_admin_y, [PermissionEnum.SuperDatabase.value, ])
+        pb.grant(obj.iam_role_ec2_web_app, obj.col_amz_user_id, [PermissionEnum.Select.value, ])
+
+        data_v1 = {
+            "account_id": pb.account_id,
+            "region": pb.region,
+            "principals": {},
+            "resources": {
+                id_: res.serialize()
+                for id_, res in pb.resources.items()
+            },
+            "datalake_permissions": {
+                id_: dl_permission.serialize()
+                for id_, dl_permission in pb.datalake_permissions.items()
+            },
+            "lf_tag_attachments": {
+                id_: lf_tag_attachment.serialize()
+                for id_, lf_tag_attachment in pb.lf_tag_attachments.items()
+            },
+        }
+        pb_v1 = Playbook.deserialize(data_v1)
+        pb_v2 = Playbook.deserialize(pb.serialize())
+        for pb1 in [pb_v1, pb_v2]:
+            assert list(pb1.resources) == list(pb.resources)
+            assert list(pb1.datalake_permissions) == list(pb.datalake_permissions)
+            assert list(pb1.lf_tag_attachments) == list(pb.lf_tag_attachments)
+
+        # v2 format store each object once, and restore shared instances
+        data = pb.serialize()
+        assert data["format_version"] == 2
+        assert data["datalake_permissions"][1] == [
+            obj.iam_role_ec2_web_app.id,
+            obj.col_amz_user_id.id,
+            PermissionEnum.Select.value.id,
+        ]
+        assert data["objects"]["resources"][obj.col_amz_user_id.id]["table"] == obj.tb_amz_user.id
+        col_id = list(pb_v2.datalake_permissions.values())[1].resource
+        col_password = list(pb_v2.lf_tag_attachments.values())[0].resource
+        assert col_id.table is col_password.table
+        assert pb_v2.resources[obj.tag_admin_y.id].pb is pb_v2
+
+
+def new_playbook(**kwargs) -> Playbook:
+    pb = Playbook(_skip_validation=True, **kwargs)
+    pb.account_id = aws_account_id
+    pb.region = aws_region
+    pb.lf_client = FakeLfClient()
+    return pb
+
+
+def new_tables(n: int) -> list:
+    db = Database(catalog_id=aws_account_id, region=aws_region, name="db")
+    return [Table(name=f"tb_{i}", database=db) for i in range(n)]
+
+
+class TestApplyDlPermission:
+    def test_concurrent_batch(self):
+        role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+        tables = new_tables(10)
+
+        deployed_pb = new_playbook()
+        for tb in tables[:4]:
+            deployed_pb.grant(role, tb, [PermissionEnum.Select.value, ])
+
+        pb = new_playbook(max_workers=4, batch_size=2)
+        pb.deployed_pb = deployed_pb
+        for tb in tables[4:]:
+            pb.grant(role, tb, [PermissionEnum.Select.value, ])
+        pb.apply_dl_permission(verbose=False)
+
+        apis = [api for api, _ in pb.lf_client.calls]
+        assert apis == ["batch_grant_permissions"] * 3 + ["batch_revoke_permissions"] * 2
+
+        granted = [
+            entry["Resource"]["Table"]["Name"]
+            for kwargs in pb.lf_client.get_calls("batch_grant_permissions")
+            for entry in kwargs["Entries"]
+        ]
+        assert sorted(granted) == [tb.name for tb in tables[4:]]
+
+        with pytest.raises(ValueError):
+            Playbook(_skip_validation=True, batch_size=21)
+
+    def test_mask_diff(self):
+        role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+        tb = new_tables(1)[0]
+
+        deployed_pb = new_playbook()
+        tag = LfTag(catalog_id=aws_account_id, key="pii", value="y", pb=deployed_pb)
+        deployed_pb.grant(role, tb, [PermissionEnum.Select.value, PermissionEnum.Insert.value])
+
+        pb = new_playbook()
+        pb.deployed_pb = deployed_pb
+        tag = LfTag(catalog_id=aws_account_id, key="pii", value="y", pb=pb)
+        pb.grant(role, tb, [PermissionEnum.Select.value, PermissionEnum.Delete.value])
+        pb.grant(role, tag, [PermissionEnum.DescribeDatabase.value, PermissionEnum.Select.value])
+        failed_grant_ids, failed_revoke_ids = pb.apply_dl_permission(verbose=False)
+
+        # one entry per pair and permission resource type
+        granted = [
+            (list(entry["Resource"]), entry.get("Permissions"))
+            for kwargs in pb.lf_client.get_calls("batch_grant_permissions")
+            for entry in kwargs["Entries"]
+        ]
+        assert granted == [
+            (["Table"], ["DELETE"]),
+            (["LFTagPolicy"], ["DESCRIBE"]),
+            (["LFTagPolicy"], ["SELECT"]),
+        ]
+        revoked = [
+            (list(entry["Resource"]), entry.get("Permissions"))
+            for kwargs in pb.lf_client.get_calls("batch_revoke_permissions")
+            for entry in kwargs["Entries"]
+        ]
+        assert revoked == [(["Table"], ["INSERT"])]
+
+    def test_grant_option_change(self):
+        role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+        tables = new_tables(3)
+        loc = DataLakeLocation(catalog_id=aws_account_id, resource_arn="s3://my-bucket")
+
+        deployed_pb = new_playbook()
+        deployed_pb.grant(role, tables[0], [PermissionEnum.Select.value, ])
+        deployed_pb.grant(role, tables[1], [PermissionEnum.InsertGrantable.value, ])
+        deployed_pb.grant(role, tables[2], [PermissionEnum.Select.value, ])
+        deployed_pb.grant(role, loc, [PermissionEnum.DataLocationAccess.value, ])
+
+        # tb_2 upgrade fails
+        def fail_func(api, entry):
+            if entry["Resource"].get("Table", {}).get("Name") == "tb_2":
+                return "AccessDeniedException"
+
+        pb = new_playbook(max_retries=0)
+        pb.lf_client = FakeLfClient(fail_func=fail_func)
+        pb.deployed_pb = deployed_pb
+        pb.grant(role, tables[0], [PermissionEnum.SelectGrantable.value, ])
+        pb.grant(role, tables[1], [PermissionEnum.Insert.value, ])
+        pb.grant(role, tables[2], [PermissionEnum.SelectGrantable.value, ])
+        pb.grant(role, loc, [PermissionEnum.DataLocationAccessGrantable.value, ])
+        failed_grant_ids, failed_revoke_ids = pb.apply_dl_permission(verbose=False)
+
+        # upgrade is a grant of the grant option only, downgrade is a revoke
+        # of the grant option only, DataLocationAccess is not changed at all
+        granted = [
+            (entry["Resource"]["Table"]["Name"], entry)
+            for kwargs in pb.lf_client.get_calls("batch_grant_permissions")
+            for entry in kwargs["Entries"]
+        ]
+        assert [
+            (name, entry.get("Permissions"), entry.get("PermissionsWithGrantOption"))
+            for name, entry in granted
+        ] == [("tb_0", None, ["SELECT"]), ("tb_2", None, ["SELECT"])]
+        revoked = [
+            (entry["Resource"]["Table"]["Name"], entry)
+            for kwargs in pb.lf_client.get_calls("batch_revoke_permissions")
+            for entry in kwargs["Entries"]
+        ]
+        assert [
+            (name, entry.get("Permissions"), entry.get("PermissionsWithGrantOption"))
+            for name, entry in revoked
+        ] == [("tb_1", None, ["INSERT"])]
+
+        # the upgraded permission is still granted, it is kept, so is the
+        # deployed permission of a failed upgrade
+        assert list(failed_grant_ids) == [f"{role.id}____{tables[2].id}____SelectGrantable"]
+        assert list(failed_revoke_ids) == [
+            f"{role.id}____{tables[0].id}____Select",
+            f"{role.id}____{tables[2].id}____Select",
+        ]
+        applied_pb = pb.get_applied_playbook(failed_grant_ids, failed_revoke_ids)
+        assert list(applied_pb.datalake_permissions) == [
+            f"{role.id}____{tables[0].id}____SelectGrantable",
+            f"{role.id}____{tables[1].id}____Insert",
+            f"{role.id}____{loc.id}____DataLocationAccessGrantable",
+            f"{role.id}____{tables[0].id}____Select",
+            f"{role.id}____{tables[2].id}____Select",
+        ]
+
+    def test_grant_option_upgrade_then_remove(self):
+        role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+        tb = new_tables(1)[0]
+
+        def apply(permissions: list, deployed_pb: Playbook):
+            pb = new_playbook()
+            pb.deployed_pb = deployed_pb
+            if permissions:
+                pb.grant(role, tb, permissions)
+            failed_grant_ids, failed_revoke_ids = pb.apply_dl_permission(verbose=False)
+            return pb, pb.get_applied_playbook(failed_grant_ids, failed_revoke_ids)
+
+        def sent(pb: Playbook, api: str) -> list:
+            return [
+                (entry.get("Permissions"), entry.get("PermissionsWithGrantOption"))
+                for kwargs in pb.lf_client.get_calls(api)
+                for entry in kwargs["Entries"]
+            ]
+
+        # Select
+        pb, applied_pb = apply([PermissionEnum.Select.value, ], new_playbook())
+        assert sent(pb, "batch_grant_permissions") == [(["SELECT"], None)]
+
+        # SelectGrantable, in place, Select is still granted and kept
+        pb, applied_pb = apply([PermissionEnum.SelectGrantable.value, ], applied_pb)
+        assert sent(pb, "batch_grant_permissions") == [(None, ["SELECT"])]
+        assert sent(pb, "batch_revoke_permissions") == []
+        assert sorted(applied_pb.datalake_permissions) == [
+            f"{role.id}____{tb.id}____Select",
+            f"{role.id}____{tb.id}____SelectGrantable",
+        ]
+
+        # apply again, nothing to do, Select is still kept
+        pb, applied_pb = apply([PermissionEnum.SelectGrantable.value, ], applied_pb)
+        assert sent(pb, "batch_grant_permissions") == []
+        assert sent(pb, "batch_revoke_permissions") == []
+        assert len(applied_pb.datalake_permissions) == 2
+
+        # nothing, both Select and its grant option are revoked
+        pb, applied_pb = apply([], applied_pb)
+        assert sent(pb, "batch_revoke_permissions") == [(["SELECT"], ["SELECT"])]
+        assert len(applied_pb.datalake_permissions) == 0
+
+    def test_column_consolidation(self):
+        role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+        tb_1, tb_2 = new_tables(2)
+        columns_1 = [Column(name=f"col_{i}", table=tb_1) for i in range(300)]
+        # tb_2 knows the columns, still granted by column names
+        columns_2 = [Column(name=f"col_{i}", table=tb_2) for i in range(5)]
+        for column in columns_2:
+            tb_2.c[column.name] = column
+
+        deployed_tb_2 = new_tables(2)[1]
+        deployed_pb = new_playbook()
+        for column in columns_2[:3]:
+            column = Column(name=column.name, table=deployed_tb_2)
+            deployed_pb.grant(role, column, [PermissionEnum.Insert.value, ])
+
+        pb = new_playbook(batch_size=20)
+        pb.deployed_pb = deployed_pb
+        for column in columns_1:
+            pb.grant(role, column, [PermissionEnum.Select.value, ])
+        for column in columns_2[:4]:
+            pb.grant(role, column, [PermissionEnum.Select.value, ])
+        pb.grant(role, columns_2[4], [PermissionEnum.Select.value, PermissionEnum.Insert.value])
+        pb.apply_dl_permission(verbose=False)
+
+        # one entry per (principal, table, permissions), in one call
+        calls = pb.lf_client.get_calls("batch_grant_permissions")
+        assert len(calls) == 1
+        assert [
+            (entry["Resource"]["TableWithColumns"], entry["Permissions"])
+            for entry in calls[0]["Entries"]
+        ] == [
+            (
+                dict(
+                    CatalogId=aws_account_id, DatabaseName="db", Name="tb_0",
+                    ColumnNames=[column.name for column in columns_1],
+                ),
+                ["SELECT"],
+            ),
+            (
+                dict(
+                    CatalogId=aws_account_id, DatabaseName="db", Name="tb_1",
+                    ColumnNames=["col_0", "col_1", "col_2", "col_3"],
+                ),
+                ["SELECT"],
+            ),
+            (
+                dict(
+                    CatalogId=aws_account_id, DatabaseName="db", Name="tb_1",
+                    ColumnNames=["col_4"],
+                ),
+                ["SELECT", "INSERT"],
+            ),
+        ]
+
+        # revoke has the same shape as the grant
+        entries = pb.lf_client.get_calls("batch_revoke_permissions")[0]["Entries"]
+        assert [entry["Resource"]["TableWithColumns"] for entry in entries] == [
+            dict(
+                CatalogId=aws_account_id, DatabaseName="db", Name="tb_1",
+                ColumnNames=["col_0", "col_1", "col_2"],
+            ),
+        ]
+
+        # drop one column of a merged grant, only this column is revoked
+        applied_pb = pb.get_applied_playbook()
+        pb = new_playbook()
+        pb.deployed_pb = applied_pb
+        for column in columns_1:
+            pb.grant(role, column, [PermissionEnum.Select.value, ])
+        for column in columns_2[:3]:
+            pb.grant(role, column, [PermissionEnum.Select.value, ])
+        pb.grant(role, columns_2[4], [PermissionEnum.Select.value, PermissionEnum.Insert.value])
+        pb.apply_dl_permission(verbose=False)
+        assert pb.lf_client.get_calls("batch_grant_permissions") == []
+        entries = pb.lf_client.get_calls("batch_revoke_permissions")[0]["Entries"]
+        assert [
+            (entry["Resource"]["TableWithColumns"], entry["Permissions"])
+            for entry in entries
+        ] == [
+            (
+                dict(
+                    CatalogId=aws_account_id, DatabaseName="db", Name="tb_1",
+                    ColumnNames=["col_3"],
+                ),
+                ["SELECT"],
+            ),
+        ]
+
+    def test_retry_failed_entries(self):
+        role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+        tables = new_tables(6)
+
+        deployed_pb = new_playbook()
+        for tb in tables[:3]:
+            deployed_pb.grant(role, tb, [PermissionEnum.Select.value, ])
+
+        # tb_3 fails once then succeeds, tb_4 and tb_0 always fail
+        n_failures = {"tb_3": 1, "tb_4": 100, "tb_0": 100}
+
+        def fail_func(api, entry):
+            name = entry["Resource"]["Table"]["Name"]
+            if n_failures.get(name, 0) > 0:
+                n_failures[name] -= 1
+                return "InternalServiceException"
+
+        pb = new_playbook(batch_size=2, max_retries=2, caller=BotoCaller(base_delay=0))
+        pb.lf_client = FakeLfClient(fail_func=fail_func)
+        pb.deployed_pb = deployed_pb
+        for tb in tables[3:]:
+            pb.grant(role, tb, [PermissionEnum.Select.value, ])
+        failed_grant_ids, failed_revoke_ids = pb.apply_dl_permission(verbose=False)
+
+        # only failed entries are retried
+        granted = [
+            [entry["Resource"]["Table"]["Name"] for entry in kwargs["Entries"]]
+            for kwargs in pb.lf_client.get_calls("batch_grant_permissions")
+        ]
+        assert granted == [["tb_3", "tb_4"], ["tb_5"], ["tb_3", "tb_4"], ["tb_4"]]
+
+        assert list(failed_grant_ids) == [
+            f"{role.id}____{tables[4].id}____Select",
+        ]
+        assert list(failed_revoke_ids) == [
+            f"{role.id}____{tables[0].id}____Select",
+        ]
+
+        applied_pb = pb.get_applied_playbook(failed_grant_ids, failed_revoke_ids)
+        assert set(applied_pb.datalake_permissions) == {
+            f"{role.id}____{tables[i].id}____Select"
+            for i in [0, 3, 5]
+        }
+
+
+class TestApplyTags:
+    def test_concurrent_and_chunk(self):
+        deployed_pb = new_playbook()
+        for value in ["a", "b"]:
+            LfTag(catalog_id=aws_account_id, key="team", value=value, pb=deployed_pb)
+        LfTag(catalog_id=aws_account_id, key="legacy", value="y", pb=deployed_pb)
+        for i in range(1500):
+            LfTag(catalog_id=aws_account_id, key="project", value=f"p{i}", pb=deployed_pb)
+
+        pb = new_playbook(max_workers=4)
+        pb.deployed_pb = deployed_pb
+        for value in ["b", "c"]:
+            LfTag(catalog_id=aws_account_id, key="team", value=value, pb=pb)
+        for i in range(2500):
+            LfTag(catalog_id=aws_account_id, key="user", value=f"u{i}", pb=pb)
+        for i in range(1200, 3500):
+            LfTag(catalog_id=aws_account_id, key="project", value=f"p{i}", pb=pb)
+        pb.apply_tags(verbose=False)
+
+        # phases are in order: create, update, delete
+        apis = [api for api, _ in pb.lf_client.calls]
+        assert apis == ["create_lf_tag"] + ["update_lf_tag"] * 5 + ["delete_lf_tag"]
+
+        def get_calls(api: str, tag_key: str) -> list:
+            return [
+                {k: len(v) for k, v in kwargs.items() if k.startswith("TagValues")}
+                for kwargs in pb.lf_client.get_calls(api)
+                if kwargs["TagKey"] == tag_key
+            ]
+
+        # values more than the limit are split into chunks
+        assert get_calls("create_lf_tag", "user") == [{"TagValues": 1000}]
+        assert get_calls("update_lf_tag", "user") == [
+            {"TagValuesToAdd": 1000},
+            {"TagValuesToAdd": 500},
+        ]
+        assert get_calls("update_lf_tag", "project") == [
+            {"TagValuesToAdd": 1000, "TagValuesToDelete": 1000},
+            {"TagValuesToAdd": 1000, "TagValuesToDelete": 200},
+        ]
+        assert get_calls("update_lf_tag", "team") == [
+            {"TagValuesToAdd": 1, "TagValuesToDelete": 1},
+        ]
+        assert pb.lf_client.get_calls("delete_lf_tag")[0]["TagKey"] == "legacy"
+
+
+class TestApplyTagAttachment:
+    def test_coalesce(self):
+        tables = new_tables(2)
+        db = tables[0].database
+        columns = [
+            Column(name=f"col_{i}", table=tb)
+            for tb in tables
+            for i in range(3)
+        ]
+
+        deployed_pb = new_playbook()
+        tag_pii_y = LfTag(catalog_id=aws_account_id, key="pii", value="y", pb=deployed_pb)
+        tag_team_a = LfTag(catalog_id=aws_account_id, key="team", value="a", pb=deployed_pb)
+        deployed_pb.attach(db, tag_team_a)
+        deployed_pb.attach(tables[0], tag_team_a)
+
+        pb = new_playbook(max_workers=4)
+        pb.deployed_pb = deployed_pb
+        tag_pii_y = LfTag(catalog_id=aws_account_id, key="pii", value="y", pb=pb)
+        tag_team_a = LfTag(catalog_id=aws_account_id, key="team", value="a", pb=pb)
+        pb.attach(db, tag_team_a)
+        pb.attach(tables[1], tag_pii_y)
+        pb.attach(tables[1], tag_team_a)
+        for col in columns:
+            pb.attach(col, tag_pii_y)
+        pb.attach(columns[0], tag_team_a)
+        pb.apply_tag_attachment(verbose=False)
+
+        # one call per table and per group of columns with the same tags
+        # calls are sent concurrently, the order is not deterministic
+        add_calls = pb.lf_client.get_calls("add_lf_tags_to_resource")
+        assert sorted([
+            (list(kwargs["Resource"].values())[0], kwargs["LFTags"])
+            for kwargs in add_calls
+        ], key=repr) == sorted([
+            (
+                dict(CatalogId=aws_account_id, DatabaseName="db", Name="tb_1"),
+                [
+                    dict(CatalogId=aws_account_id, TagKey="pii", TagValues=["y"]),
+                    dict(CatalogId=aws_account_id, TagKey="team", TagValues=["a"]),
+                ],
+            ),
+            (
+                dict(CatalogId=aws_account_id, DatabaseName="db", Name="tb_0", ColumnNames=["col_0"]),
+                [
+                    dict(CatalogId=aws_account_id, TagKey="pii", TagValues=["y"]),
+                    dict(CatalogId=aws_account_id, TagKey="team", TagValues=["a"]),
+                ],
+            ),
+            (
+                dict(CatalogId=aws_account_id, DatabaseName="db", Name="tb_0", ColumnNames=["col_1", "col_2"]),
+                [
+                    dict(CatalogId=aws_account_id, TagKey="pii", TagValues=["y"]),
+                ],
+            ),
+            (
+                dict(CatalogId=aws_account_id, DatabaseName="db", Name="tb_1", ColumnNames=["col_0", "col_1", "col_2"]),
+                [
+                    dict(CatalogId=aws_account_id, TagKey="pii", TagValues=["y"]),
+                ],
+            ),
+        ], key=repr)
+        assert all("_attachments" not in kwargs for kwargs in add_calls)
+
+        remove_calls = pb.lf_client.get_calls("remove_lf_tags_from_resource")
+        assert [kwargs["Resource"] for kwargs in remove_calls] == [
+            dict(Table=dict(CatalogId=aws_account_id, DatabaseName="db", Name="tb_0")),
+        ]
+
+    def test_retry_failures(self):
+        tables = new_tables(3)
+
+        deployed_pb = new_playbook()
+        tag_team_a = LfTag(catalog_id=aws_account_id, key="team", value="a", pb=deployed_pb)
+        deployed_pb.attach(tables[0], tag_team_a)
+
+        # team on tb_1 fails once then succeeds, pii on tb_2 and tb_0 detach always fail
+        n_failures = {("tb_1", "team"): 1, ("tb_2", "pii"): 100, ("tb_0", "team"): 100}
+
+        def fail_func(api, entry):
+            key = (entry["Resource"]["Table"]["Name"], entry["LFTag"]["TagKey"])
+            if n_failures.get(key, 0) > 0:
+                n_failures[key] -= 1
+                return "ConcurrentModificationException"
+
+        pb = new_playbook(max_retries=2, caller=BotoCaller(base_delay=0))
+        pb.lf_client = FakeLfClient(fail_func=fail_func)
+        pb.deployed_pb = deployed_pb
+        tag_pii_y = LfTag(catalog_id=aws_account_id, key="pii", value="y", pb=pb)
+        tag_team_a = LfTag(catalog_id=aws_account_id, key="team", value="a", pb=pb)
+        for tb in tables[1:]:
+            pb.attach(tb, tag_pii_y)
+            pb.attach(tb, tag_team_a)
+        failed_add_ids, failed_remove_ids = pb.apply_tag_attachment(verbose=False)
+
+        # only the failed tags are retried
+        added = [
+            (kwargs["Resource"]["Table"]["Name"], [lf_tag["TagKey"] for lf_tag in kwargs["LFTags"]])
+            for kwargs in pb.lf_client.get_calls("add_lf_tags_to_resource")
+        ]
+        assert added == [
+            ("tb_1", ["pii", "team"]),
+            ("tb_2", ["pii", "team"]),
+            ("tb_1", ["team"]),
+            ("tb_2", ["pii"]),
+            ("tb_2", ["pii"]),
+        ]
+        assert list(failed_add_ids) == [f"{tables[2].id}____{tag_pii_y.id}"]
+        assert list(failed_remove_ids) == [f"{tables[0].id}____{tag_team_a.id}"]
+
+        applied_pb = pb.get_applied_playbook(
+            failed_add_attach_ids=failed_add_ids,
+            failed_remove_attach_ids=failed_remove_ids,
+        )
+        assert set(applied_pb.lf_tag_attachments) == {
+            f"{tables[1].id}____{tag_pii_y.id}",
+            f"{tables[1].id}____{tag_team_a.id}",
+            f"{tables[2].id}____{tag_team_a.id}",
+            f"{tables[0].id}____{tag_team_a.id}",
+        }
+
+
+class TestApply:
+    def test_fingerprint(self, tmp_path):
+        role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+        tables = new_tables(3)
+
+        def new_pb(n_table: int) -> Playbook:
+            pb = new_playbook(workspace_dir=tmp_path)
+            LfTag(catalog_id=aws_account_id, key="pii", value="y", pb=pb)
+            for tb in tables[:n_table]:
+                pb.grant(role, tb, [PermissionEnum.Select.value, ])
+            return pb
+
+        # insertion order does not matter
+        pb1, pb2 = new_pb(3), new_pb(3)
+        pb2.datalake_permissions = dict(reversed(list(pb2.datalake_permissions.items())))
+        assert pb1.get_fingerprint() == pb2.get_fingerprint()
+        assert pb1.get_fingerprint() != new_pb(2).get_fingerprint()
+
+        pb = new_pb(2)
+        pb.apply(verbose=False)
+        assert len(pb.lf_client.calls) == 2  # create tag, grant
+        assert pb.deployed_pb_fingerprint_file.read_text() == pb.get_fingerprint()
+
+        pb = new_pb(2)
+        pb.apply(verbose=False)
+        assert len(pb.lf_client.calls) == 0  # no change
+
+        pb = new_pb(2)
+        pb.apply(verbose=False, force=True)
+        assert len(pb.lf_client.calls) == 0  # diff, nothing to apply
+
+        pb = new_pb(3)
+        pb.apply(verbose=False)
+        assert len(pb.lf_client.calls) == 1
+
+        # fingerprint is not stored if anything failed
+        pb = new_pb(1)
+        pb.lf_client = FakeLfClient(fail_func=lambda api, entry: "AccessDeniedException")
+        pb.max_retries = 0
+        pb.apply(verbose=False)
+        assert pb.deployed_pb_fingerprint_file.exists() is False
+
+    def test_implied_permissions(self, tmp_path):
+        role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+        tb = new_tables(1)[0]
+        loc = DataLakeLocation(catalog_id=aws_account_id, resource_arn="s3://my-bucket")
+
+        def new_pb(table_permissions: list) -> Playbook:
+            pb = new_playbook(workspace_dir=tmp_path)
+            pb.grant(role, tb.database, [
+                PermissionEnum.SuperDatabase.value,
+                PermissionEnum.CreateDatabase.value,
+                PermissionEnum.DescribeDatabase.value,
+                PermissionEnum.DescribeDatabaseGrantable.value,
+            ])
+            pb.grant(role, tb, table_permissions)
+            pb.grant(role, loc, [
+                PermissionEnum.DataLocationAccess.value,
+                PermissionEnum.DataLocationAccessGrantable.value,
+            ])
+            return pb
+
+        def get_entries(pb: Playbook, api: str) -> list:
+            return [
+                (entry.get("Permissions"), entry.get("PermissionsWithGrantOption"))
+                for kwargs in pb.lf_client.get_calls(api)
+                for entry in kwargs["Entries"]
+            ]
+
+        pb = new_pb([
+            PermissionEnum.Select.value,
+            PermissionEnum.SuperTable.value,
+            PermissionEnum.Insert.value,
+        ])
+        permit_ids = list(pb.datalake_permissions)
+        # ALL does not imply CreateDatabase nor the grant option
+        assert [dl_permission.id for dl_permission in pb.get_implied_permissions()] == [
+            f"{role.id}____{tb.database.id}____DescribeDatabase",
+            f"{role.id}____{tb.id}____Select",
+            f"{role.id}____{tb.id}____Insert",
+            f"{role.id}____{loc.id}____DataLocationAccess",
+        ]
+        pb.apply(verbose=False)
+
+        # the playbook is not changed, the implied ones are not granted
+        assert list(pb.datalake_permissions) == permit_ids
+        assert get_entries(pb, "batch_grant_permissions") == [
+            (["CREATE_DATABASE", "ALL"], ["DESCRIBE"]),
+            (["ALL"], None),
+            (None, ["DATA_LOCATION_ACCESS"]),
+        ]
+        expected = [
+            f"{role.id}____{tb.database.id}____SuperDatabase",
+            f"{role.id}____{tb.database.id}____CreateDatabase",
+            f"{role.id}____{tb.database.id}____DescribeDatabaseGrantable",
+            f"{role.id}____{tb.id}____SuperTable",
+            f"{role.id}____{loc.id}____DataLocationAccessGrantable",
+        ]
+        pb.load_deployed_playbook()
+        assert list(pb.deployed_pb.datalake_permissions) == expected
+        # nothing failed, the fingerprint is stored
+        assert pb.deployed_pb_fingerprint_file.exists() is True
+
+        # the deployed state has the implied permission, it is not revoked
+        pb = new_pb([PermissionEnum.SuperTable.value, PermissionEnum.Select.value])
+        pb.deployed_pb = new_pb([PermissionEnum.SuperTable.value, PermissionEnum.Select.value])
+        failed_grant_ids, failed_revoke_ids = pb.apply_dl_permission(verbose=False)
+        assert pb.lf_client.calls == []
+
+        pb = new_pb([PermissionEnum.SuperTable.value, ])
+        pb.deployed_pb = new_pb([PermissionEnum.SuperTable.value, PermissionEnum.Select.value])
+        failed_grant_ids, failed_revoke_ids = pb.apply_dl_permission(verbose=False)
+        assert pb.lf_client.calls == []
+        applied_pb = pb.get_applied_playbook(failed_grant_ids, failed_revoke_ids)
+        assert f"{role.id}____{tb.id}____Select" in applied_pb.datalake_permissions
+
+        # the implying permission is removed, the implied one is granted
+        pb = new_pb([PermissionEnum.Select.value, ])
+        pb.deployed_pb = applied_pb
+        pb.apply_dl_permission(verbose=False)
+        assert get_entries(pb, "batch_revoke_permissions") == [(["ALL"], None)]
+        assert get_entries(pb, "batch_grant_permissions") == []
+
+        pb = new_pb([PermissionEnum.Select.value, ])
+        pb.deployed_pb = new_pb([PermissionEnum.SuperTable.value, ])
+        pb.apply_dl_permission(verbose=False)
+        assert get_entries(pb, "batch_revoke_permissions") == [(["ALL"], None)]
+        assert get_entries(pb, "batch_grant_permissions") == [(["SELECT"], None)]
+
+    def test_lf_tag_policy(self, tmp_path):
+        role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+
+        def new_pb(values: list, **kwargs) -> Playbook:
+            pb = new_playbook(workspace_dir=tmp_path, **kwargs)
+            for value in ["y", "n", "x", "z"]:
+                tag = LfTag(catalog_id=aws_account_id, key="pii", value=value, pb=pb)
+                if value in values:
+                    pb.grant(role, tag, [PermissionEnum.Select.value, ])
+            return pb
+
+        def get_expressions(pb: Playbook, api: str) -> list:
+            return [
+                entry["Resource"]["LFTagPolicy"]["Expression"][0]["TagValues"]
+                for kwargs in pb.lf_client.get_calls(api)
+                for entry in kwargs["Entries"]
+            ]
+
+        # the state without recorded grants, one grant per value is assumed
+        pb = new_pb(["y", "n"])
+        pb.deployed_pb = new_pb(["y", "x"])
+        pb.apply_dl_permission(verbose=False)
+        assert get_expressions(pb, "batch_grant_permissions") == [["n", "y"]]
+        assert get_expressions(pb, "batch_revoke_permissions") == [["y"], ["x"]]
+
+        pb = new_pb(["y", "n", "x"])
+        pb.apply(verbose=False)
+        assert get_expressions(pb, "batch_grant_permissions") == [["n", "x", "y"]]
+        pb.load_deployed_playbook()
+        assert [
+            grant.id
+            for grants in pb.deployed_pb.lf_tag_policy_grants.values()
+            for grant in grants.values()
+        ] == [f"{role.id}____TABLE____pii____Select____n,x,y"]
+
+        # values changed, grant the new expression, revoke the old one
+        pb = new_pb(["y", "n", "z"])
+        pb.apply(verbose=False)
+        assert get_expressions(pb, "batch_grant_permissions") == [["n", "y", "z"]]
+        assert get_expressions(pb, "batch_revoke_permissions") == [["n", "x", "y"]]
+
+        # failed grant keeps the old expression
+        pb = new_pb(["y"], max_retries=0)
+        pb.lf_client = FakeLfClient(
+            fail_func=lambda api, entry: "AccessDeniedException" if api == "batch_grant_permissions" else None
+        )
+        pb.apply(verbose=False)
+        pb.load_deployed_playbook()
+        assert list(pb.deployed_pb.lf_tag_policy_grants[role.id]) == [
+            f"{role.id}____TABLE____pii____Select____n,y,z",
+        ]
+        assert len(pb.deployed_pb.datalake_permissions) == 3
+
+        pb = new_pb(["y"])
+        pb.apply(verbose=False)
+        assert get_expressions(pb, "batch_grant_permissions") == [["y"]]
+        assert get_expressions(pb, "batch_revoke_permissions") == [["n", "y", "z"]]
+        pb = new_pb(["y"])
+        pb.apply(verbose=False, force=True)
+        assert len(pb.lf_client.get_calls("batch_grant_permissions")) == 0
+
 
 if __name__ == "__main__":
     import os
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from lakeformation.principal import IamRole
+from lakeformation.resource import LfTag
+from lakeformation.permission import PermissionEnum
+from lakeformation.pb.asso import DataLakePermission
+from lakeformation.pb.mask import PermissionMaskIndex
+from lakeformation.pb.tag_policy import get_lf_tag_policy_grants
+from lakeformation.tests import aws_account_id
+
+role = IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/analyst")
+tag_pii_y = LfTag(catalog_id=aws_account_id, key="pii", value="y")
+tag_pii_n = LfTag(catalog_id=aws_account_id, key="pii", value="n")
+tag_admin_y = LfTag(catalog_id=aws_account_id, key="admin", value="y")
+
+Select = PermissionEnum.Select.value
+DescribeDatabase = PermissionEnum.DescribeDatabase.value
+
+
+def test_get_lf_tag_policy_grants():
+    idx = PermissionMaskIndex()
+    for tag, permissions in [
+        (tag_pii_y, [Select, DescribeDatabase]),
+        (tag_pii_n, [Select]),
+        (tag_admin_y, [Select]),
+    ]:
+        for permission in permissions:
+            idx.add(DataLakePermission(principal=role, resource=tag, permission=permission))
+
+    grants = list(get_lf_tag_policy_grants(idx, [role.id])[role.id].values())
+    assert [
+        grant.batch_grant_remove_permission_arg_value()["Expression"]
+        for grant in grants
+    ] == [
+        [dict(TagKey="pii", TagValues=["y"])],
+        [dict(TagKey="pii", TagValues=["n", "y"])],
+        [dict(TagKey="admin", TagValues=["y"])],
+    ]
+    assert [grant.resource_type for grant in grants] == ["DATABASE", "TABLE", "TABLE"]
+    assert grants[1].permit_ids == [
+        f"{role.id}____{tag_pii_n.id}____Select",
+        f"{role.id}____{tag_pii_y.id}____Select",
+    ]
+    assert grants[1].id == f"{role.id}____TABLE____pii____Select____n,y"
+
+    # one grant per tag value
+    grants = get_lf_tag_policy_grants(idx, [role.id], merge=False)[role.id]
+    assert len(grants) == 4
+
+    assert get_lf_tag_policy_grants(idx, ["not_a_principal"]) == {}
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
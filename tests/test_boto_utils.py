@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from botocore.exceptions import (
+    EndpointConnectionError,
+    ReadTimeoutError,
+    ConnectionClosedError,
+)
+from lakeformation.boto_utils import (
+    list_recursively,
+    iter_recursively,
+    is_throttling_error,
+    is_retryable_error,
+    get_service_name,
+    AdaptiveLimiter,
+    BotoCaller,
+)
+
+
+class FakeClientError(Exception):
+    """
+    Simulate ``botocore.exceptions.ClientError``.
+    """
+
+    def __init__(self, code: str, status_code: int = 400):
+        super().__init__(code)
+        self.response = {
+            "Error": {"Code": code, "Message": code},
+            "ResponseMetadata": {"HTTPStatusCode": status_code},
+        }
+
+
+class FlakyApi:
+    """
+    Raise the given errors one by one, then succeed.
+    """
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.n_calls = 0
+
+    def __call__(self, **kwargs):
+        self.n_calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return kwargs
+
+
+class FakePaginator:
+    """
+    Simulate a boto3 paginator API like ``glue_client.get_databases``.
+    """
+
+    def __init__(self, n_items: int, page_size: int):
+        self.items = [dict(Name=f"item_{i}") for i in range(n_items)]
+        self.page_size = page_size
+        self.n_calls = 0
+
+    def get_items(self, MaxResults: int, NextToken: str = None) -> dict:
+        self.n_calls += 1
+        start = 0 if NextToken is None else int(NextToken)
+        end = start + self.page_size
+        response = dict(ItemList=self.items[start:end])
+        if end < len(self.items):
+            response["NextToken"] = str(end)
+        return response
+
+
+kwargs = dict(
+    default_kwargs=dict(MaxResults=1000),
+    next_token_arg_name="NextToken",
+    next_token_value_field="NextToken",
+    collection_value_field="ItemList",
+)
+
+
+def test_list_recursively():
+    paginator = FakePaginator(n_items=7, page_size=3)
+    lst = list_recursively(method=paginator.get_items, **kwargs)
+    assert lst == paginator.items
+    assert paginator.n_calls == 3
+
+    paginator = FakePaginator(n_items=0, page_size=3)
+    assert list_recursively(method=paginator.get_items, **kwargs) == []
+
+
+def test_iter_recursively():
+    paginator = FakePaginator(n_items=7, page_size=3)
+    iterator = iter_recursively(method=paginator.get_items, **kwargs)
+    assert paginator.n_calls == 0  # lazy, nothing is fetched yet
+
+    assert next(iterator) == dict(Name="item_0")
+    assert paginator.n_calls == 1  # only the first page is fetched
+
+    assert [dct["Name"] for dct in iterator] == [f"item_{i}" for i in range(1, 7)]
+    assert paginator.n_calls == 3
+
+
+def test_is_throttling_error():
+    assert is_throttling_error(FakeClientError("ThrottlingException")) is True
+    assert is_throttling_error(FakeClientError("AccessDeniedException")) is False
+    assert is_throttling_error(ValueError()) is False
+
+
+def test_is_retryable_error():
+    assert is_retryable_error(FakeClientError("ThrottlingException")) is True
+    assert is_retryable_error(FakeClientError("InternalServiceException", 500)) is True
+    # IAM
+    assert is_retryable_error(FakeClientError("ServiceFailure", 500)) is True
+    # unlisted code, but server side
+    assert is_retryable_error(FakeClientError("SomethingWentWrong", 503)) is True
+    assert is_retryable_error(FakeClientError("AccessDeniedException")) is False
+    assert is_retryable_error(ValueError()) is False
+    # the request never got a response
+    assert is_retryable_error(EndpointConnectionError(endpoint_url="https://lakeformation")) is True
+    assert is_retryable_error(ReadTimeoutError(endpoint_url="https://lakeformation")) is True
+    assert is_retryable_error(ConnectionClosedError(endpoint_url="https://lakeformation")) is True
+
+
+class TestAdaptiveLimiter:
+    def test_aimd(self):
+        limiter = AdaptiveLimiter(initial_limit=8, min_limit=1, max_limit=10)
+        limiter.on_throttle()
+        assert limiter.limit == 4
+        for _ in range(4):
+            limiter.on_success()
+        assert limiter.limit == 5
+        for _ in range(10):
+            limiter.on_throttle()
+        assert limiter.limit == 1
+        for _ in range(1000):
+            limiter.on_success()
+        assert limiter.limit == 10
+
+
+class TestBotoCaller:
+    def test_retry_throttling(self):
+        caller = BotoCaller(base_delay=0)
+        api = FlakyApi([
+            FakeClientError("ThrottlingException"),
+            FakeClientError("InternalServiceException"),
+        ])
+        assert caller.call(api, Name="a") == dict(Name="a")
+        assert api.n_calls == 3
+
+    def test_retry_connection_error(self):
+        caller = BotoCaller(base_delay=0)
+        api = FlakyApi([
+            EndpointConnectionError(endpoint_url="https://lakeformation"),
+            ReadTimeoutError(endpoint_url="https://lakeformation"),
+            FakeClientError("ServiceFailure", 500),
+        ])
+        assert caller.call(api, Name="a") == dict(Name="a")
+        assert api.n_calls == 4
+
+    def test_not_retryable(self):
+        caller = BotoCaller(base_delay=0)
+        api = FlakyApi([FakeClientError("AccessDeniedException")])
+        with pytest.raises(FakeClientError):
+            caller.call(api)
+        assert api.n_calls == 1
+
+    def test_max_attempts(self):
+        caller = BotoCaller(max_attempts=3, base_delay=0)
+        api = FlakyApi([FakeClientError("ThrottlingException")] * 5)
+        with pytest.raises(FakeClientError):
+            caller.call(api)
+        assert api.n_calls == 3
+
+    def test_limiter_per_service(self):
+        def new_client(service_name: str):
+            service_model = type("ServiceModel", (), dict(service_name=service_name))
+            meta = type("Meta", (), dict(service_model=service_model))
+            return type("Client", (), dict(meta=meta, get=lambda self, **kwargs: kwargs))()
+
+        glue_client = new_client("glue")
+        lf_client = new_client("lakeformation")
+        assert get_service_name(glue_client.get) == "glue"
+        assert get_service_name(FlakyApi([])) is None
+
+        caller = BotoCaller(base_delay=0)
+        assert caller.get_limiter(glue_client.get) is caller.get_limiter(new_client("glue").get)
+        assert caller.get_limiter(glue_client.get) is not caller.get_limiter(lf_client.get)
+
+        # throttling on one service does not slow down the other one
+        limit = caller.get_limiter(lf_client.get).limit
+        caller.get_limiter(glue_client.get).on_throttle()
+        assert caller.get_limiter(lf_client.get).limit == limit
+
+        # the given limiter is shared by all services
+        limiter = AdaptiveLimiter()
+        caller = BotoCaller(limiter=limiter)
+        assert caller.get_limiter(glue_client.get) is limiter
+        assert caller.get_limiter(lf_client.get) is limiter
+
+    def test_backoff_delay(self):
+        caller = BotoCaller(base_delay=1, max_delay=5)
+        for attempt in range(10):
+            assert 0 <= caller.get_backoff_delay(attempt) <= min(5, 2 ** attempt)
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
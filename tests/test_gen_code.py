@@ -8,8 +8,13 @@ import pytest
 
 import boto3
 from pathlib import Path
-from lakeformation import gen_resource, gen_principal
+from jinja2 import Template
+from lakeformation import gen_resource, gen_principal, IamRole, Database, Table, Column
+from lakeformation.gen_code import (
+    tpl_principal, tpl_resource, get_template, render_to_file, iter_database,
+)
 from lakeformation.runtime import IS_CI
+from lakeformation.tests import Objects, aws_account_id, aws_region
 
 dir_here = Path(__file__).absolute().parent
 
@@ -34,6 +39,102 @@ def test_gen_code():
     gen_principal(boto_ses=boto_ses, workspace_dir=str(dir_here))
 
 
+def test_render_to_file(tmp_path):
+    assert get_template(tpl_principal) is get_template(tpl_principal)
+    assert get_template(tpl_resource) is not get_template(tpl_principal)
+
+    obj = Objects()
+    iam_role_list = [
+        IamRole(arn=f"arn:aws:iam::{aws_account_id}:role/role_{i}")
+        for i in range(3)
+    ]
+    kwargs = dict(
+        iam_user_list=[obj.iam_user_alice, ],
+        iam_group_list=[],
+    )
+    expected = Template(
+        source=tpl_principal.read_text(encoding="utf-8"),
+    ).render(iam_role_list=iam_role_list, **kwargs)
+
+    output_path = Path(tmp_path, "principal.py")
+    render_to_file(
+        get_template(tpl_principal),
+        output_path,
+        iam_role_list=(iam_role for iam_role in iam_role_list),
+        **kwargs
+    )
+    assert output_path.read_text(encoding="utf-8") == expected
+    assert [p.name for p in tmp_path.iterdir()] == ["principal.py", ]
+
+
+class FakeGlueClient:
+    """
+    Simulate the ``get_databases`` and ``get_tables`` API of the glue client.
+    """
+
+    def __init__(self, n_database: int, n_table: int, n_column: int):
+        self.databases = [
+            dict(CatalogId=aws_account_id, Name=f"db_{i}")
+            for i in range(n_database)
+        ]
+        self.tables = [
+            dict(
+                Name=f"tb_{i}",
+                StorageDescriptor=dict(
+                    Columns=[dict(Name=f"col_{j}") for j in range(n_column)],
+                ),
+            )
+            for i in range(n_table)
+        ]
+
+    def get_databases(self, **kwargs) -> dict:
+        return dict(DatabaseList=self.databases)
+
+    def get_tables(self, **kwargs) -> dict:
+        return dict(TableList=self.tables)
+
+
+def test_iter_database_render_to_file(tmp_path):
+    glue_client = FakeGlueClient(n_database=5, n_table=3, n_column=4)
+
+    # non-streaming render of the full catalog
+    database_list = list()
+    for db_dct in glue_client.databases:
+        db = Database(catalog_id=db_dct["CatalogId"], region=aws_region, name=db_dct["Name"])
+        for tb_dct in glue_client.tables:
+            tb = Table(name=tb_dct["Name"], database=db)
+            for col_dct in tb_dct["StorageDescriptor"]["Columns"]:
+                tb.c[col_dct["Name"]] = Column(name=col_dct["Name"], table=tb)
+            db.t[tb.name] = tb
+        database_list.append(db)
+    expected = Template(
+        source=tpl_resource.read_text(encoding="utf-8"),
+    ).render(database_list=database_list)
+
+    output_path = Path(tmp_path, "resource.py")
+    render_to_file(
+        get_template(tpl_resource),
+        output_path,
+        database_list=iter_database(
+            glue_client,
+            account_id=aws_account_id,
+            region_name=aws_region,
+            max_workers=4,
+        ),
+    )
+    assert output_path.read_text(encoding="utf-8") == expected
+
+    # the tables and columns of a database are cleared when the next one
+    # is requested
+    db_iterator = iter_database(glue_client, aws_account_id, aws_region)
+    db = next(db_iterator)
+    tb = db.t["tb_0"]
+    assert list(tb.c) == ["col_0", "col_1", "col_2", "col_3"]
+    next(db_iterator)
+    assert len(db.t) == 0
+    assert len(tb.c) == 0
+
+
 if __name__ == "__main__":
     import os
 
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
 import pytest
-from lakeformation.permission import Permission, PermissionEnum
+from lakeformation.permission import (
+    Permission, PermissionEnum, get_permission_bit, to_mask, from_mask,
+)
 
 
 class TestPermission:
@@ -20,6 +22,38 @@ class TestPermission:
         ).serialize() == PermissionEnum.Select.value.serialize()
 
 
+def test_mask():
+    bits = [get_permission_bit(permission.value) for permission in PermissionEnum]
+    assert len(set(bits)) == len(bits)
+
+    permissions = [
+        PermissionEnum.Select.value,
+        PermissionEnum.SuperDatabase.value,
+        PermissionEnum.Insert.value,
+    ]
+    mask = to_mask(permissions)
+    assert from_mask(mask) == [
+        PermissionEnum.SuperDatabase.value,
+        PermissionEnum.Select.value,
+        PermissionEnum.Insert.value,
+    ]
+    assert from_mask(mask & ~to_mask([PermissionEnum.Select.value, ])) == [
+        PermissionEnum.SuperDatabase.value,
+        PermissionEnum.Insert.value,
+    ]
+    assert from_mask(0) == []
+
+    # custom permission get a new bit
+    custom = Permission(
+        identifier="CustomSelect",
+        resource_type="TABLE",
+        permission="SELECT",
+        grantable=False,
+    )
+    assert from_mask(to_mask([custom, ])) == [custom, ]
+    assert get_permission_bit(custom) not in bits
+
+
 if __name__ == "__main__":
     import os
 
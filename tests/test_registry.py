@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from lakeformation.registry import Registry
+from lakeformation.permission import PermissionEnum
+from lakeformation.pb.asso import DataLakePermission, LfTagAttachment
+from lakeformation.tests import Objects
+
+obj = Objects()
+
+
+def test_resource():
+    registry = Registry()
+    for res in obj.resource_list:
+        res1 = registry.resource(res.serialize())
+        res2 = registry.resource(res.serialize())
+        assert res1 == res
+        assert res1 is res2
+
+    col1 = registry.resource(obj.col_amz_user_id.serialize())
+    col2 = registry.resource(obj.col_amz_user_password.serialize())
+    assert col1 is not col2
+    assert col1.table is col2.table
+    assert col1.table.database is registry.resource(obj.db_amz.serialize())
+    assert col1.catalog_id is col2.catalog_id
+
+
+def test_principal_and_permission():
+    registry = Registry()
+    for principal in obj.principal_list:
+        p1 = registry.principal(principal.serialize())
+        assert p1 == principal
+        assert p1 is registry.principal(principal.serialize())
+
+    permission = PermissionEnum.Select.value
+    assert registry.permission(permission.serialize()) is permission
+
+
+def test_asso_deserialize():
+    registry = Registry()
+    expected = obj.dl_permission_iam_user_alice_tag_admin_y
+    dl_permission = DataLakePermission.deserialize(expected.serialize(), registry=registry)
+    assert dl_permission == expected
+    assert dl_permission.principal is registry.principal(expected.principal.serialize())
+    assert dl_permission.resource is registry.resource(expected.resource.serialize())
+
+    for expected in [
+        obj.attachment_db_amz_tag_admin_y,
+        obj.attachment_col_amz_user_password_tag_regular_n,
+    ]:
+        attachment = LfTagAttachment.deserialize(expected.serialize(), registry=registry)
+        assert attachment == expected
+        assert attachment.tag is registry.resource(expected.tag.serialize())
+
+    col = registry.resource(obj.col_amz_user_password.serialize())
+    assert attachment.resource is col
+
+
+def test_skip_validation():
+    data = obj.tb_amz_user.serialize()
+    data["database"]["catalog_id"] = "invalid"
+    with pytest.raises(ValueError):
+        Registry().resource(data)
+    table = Registry(skip_validation=True).resource(data)
+    assert table.database.catalog_id == "invalid"
+
+    data = obj.iam_user_alice.serialize()
+    data["arn"] = "invalid"
+    with pytest.raises(ValueError):
+        Registry().principal(data)
+    assert Registry(skip_validation=True).principal(data).arn == "invalid"
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -7,6 +7,7 @@ from lakeformation.resource import (
     DataLakeLocation, DataCellsFilter, LfTag,
     deserialize_resource,
 )
+from lakeformation.abstract import HashableAbc
 from lakeformation.permission import PermissionEnum
 from lakeformation.pb.playbook import Playbook
 from lakeformation.pb.asso import DataLakePermission
@@ -29,6 +30,54 @@ def test_hash():
     assert obj1.db_amz != obj1.tb_amz_user
 
 
+def test_id_cache():
+    db = Database(catalog_id="111122223333", region="us-east-1", name="amz")
+    tb = Table(name="user", database=db)
+    assert tb.id == "tb_111122223333_us_east_1_amz_user"
+    assert tb.id is tb.id  # memoized
+
+    # re-assigning an identifying field resets the memoized id
+    tb.name = "order"
+    assert tb.id == "tb_111122223333_us_east_1_amz_order"
+    col = Column(name="id", table=tb)
+    assert col.id == "col_111122223333_us_east_1_amz_order_id"
+    col.table = Table(name="user", database=db)
+    assert col.id == "col_111122223333_us_east_1_amz_user_id"
+    loc = DataLakeLocation(catalog_id="111122223333", resource_arn="s3://bucket-a")
+    _ = loc.id
+    loc.resource_arn = "s3://bucket-b"
+    assert loc.id == DataLakeLocation(catalog_id="111122223333", resource_arn="s3://bucket-b").id
+    # not an identifying field
+    tb._playbook_id = "pb"
+    assert tb.id == "tb_111122223333_us_east_1_amz_order"
+
+    # _get_id is abstract
+    class NoId(HashableAbc):
+        pass
+
+    with pytest.raises(TypeError):
+        NoId()
+
+
+def test_slots():
+    db = Database(catalog_id="111122223333", region="us-east-1", name="amz")
+    tb = Table(name="user", database=db)
+    col = Column(name="id", table=tb)
+    tag = LfTag(catalog_id="111122223333", key="admin", value="y")
+    for res in [db, tb, col, tag]:
+        assert not hasattr(res, "__dict__")
+        with pytest.raises(AttributeError):
+            res.not_a_field = None
+
+    # the tables / columns Box is created on first access
+    assert db._t is None
+    db.t.user = tb
+    assert db.t.user is tb
+    assert tb._c is None
+    tb.c["id"] = col
+    assert tb.c.id is col
+
+
 def test_property():
     assert obj.db_amz.catalog_id == obj.tb_amz_user.catalog_id
     assert obj.db_amz.catalog_id == obj.col_amz_user_id.catalog_id
@@ -83,6 +132,22 @@ class TestResource:
         _ = obj.data_filter.batch_grant_remove_permission_arg_name
         _ = obj.data_filter.batch_grant_remove_permission_arg_value()
 
+    def test_batch_grant_remove_permission_columns_arg_value(self):
+        db = Database(catalog_id="111122223333", region="us-east-1", name="amz")
+        tb = Table(name="user", database=db)
+        assert tb.batch_grant_remove_permission_columns_arg_value(["a", "b"]) == dict(
+            CatalogId="111122223333", DatabaseName="amz", Name="user",
+            ColumnNames=["a", "b"],
+        )
+
+        # never use ColumnWildcard, even if Table.c knows the other columns
+        for name in ["a", "b", "c", "d"]:
+            tb.c[name] = Column(name=name, table=tb)
+        assert tb.batch_grant_remove_permission_columns_arg_value(["a", "b", "c"]) == dict(
+            CatalogId="111122223333", DatabaseName="amz", Name="user",
+            ColumnNames=["a", "b", "c"],
+        )
+
 
 class TestDataLakeLocation:
     def test_init(self):
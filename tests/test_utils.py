@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 
+import time
+import random
 import pytest
 from datetime import timezone
 from lakeformation.utils import (
     to_var_name,
     get_local_and_utc_now,
     get_diff_and_inter,
+    PartitionIndex,
+    get_partitioned_diff,
     grouper_list,
+    imap_concurrently,
     validate_iam_arn,
     validate_account_id,
 )
@@ -41,11 +46,60 @@ def test_get_diff_and_inter():
     assert s3 == {"b", }
 
 
+def test_get_partitioned_diff():
+    idx1 = PartitionIndex()
+    idx2 = PartitionIndex()
+    for key, id_ in [("p1", "a"), ("p1", "b"), ("p2", "c"), ("p3", "d")]:
+        idx1.add(key, id_)
+    for key, id_ in [("p1", "b"), ("p1", "a"), ("p2", "e"), ("p4", "f")]:
+        idx2.add(key, id_)
+
+    assert idx1.digest("p1") == idx2.digest("p1")  # insertion order does not matter
+    assert idx1.digest("p2") != idx2.digest("p2")
+
+    to_add, to_delete = get_partitioned_diff(idx1, idx2)
+    assert list(to_add) == ["c", "d"]
+    assert list(to_delete) == ["e", "f"]
+
+    # digest is updated in place on change
+    idx2.remove("p2", "e")
+    idx2.add("p2", "c")
+    idx2.add("p2", "c")
+    assert idx1.digest("p2") == idx2.digest("p2")
+    idx2.add_many("p1", ["a", "g"])
+    idx2.remove("p1", "g")
+    assert idx1.digest("p1") == idx2.digest("p1")
+    idx2.remove("p4", "f")
+    assert "p4" not in idx2.members
+
+    # seeded digests are trusted if the number of ids matches
+    idx3 = PartitionIndex()
+    idx3.add("p1", "x")
+    idx3.add("p1", "y")
+    idx3.seed_digests(idx1.digests())
+    assert idx3.digest("p1") == idx1.digest("p1")
+    assert "p2" not in idx3.digests()
+    idx3.remove("p1", "x")
+    idx3.seed_digests({"p1": idx1.digest("p1")})
+    assert idx3.digest("p1") != idx1.digest("p1")
+
+
 def test_grouper_list():
     l = [1, 2, 3, 4, 5, 6, 7]
     assert list(grouper_list(l, 3)) == [[1, 2, 3], [4, 5, 6], [7, ]]
 
 
+def test_imap_concurrently():
+    def square(x):
+        time.sleep(random.random() * 0.01)  # finish in random order
+        return x * x
+
+    expected = [x * x for x in range(50)]
+    assert list(imap_concurrently(square, range(50))) == expected
+    assert list(imap_concurrently(square, range(50), max_workers=8)) == expected
+    assert list(imap_concurrently(square, [], max_workers=8)) == []
+
+
 def test_validate_iam_arn():
     for principal in obj.iam_list:
         validate_iam_arn(principal.arn)